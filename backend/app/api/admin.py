@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import hmac
+import os
+
+from app.services.key_rotation import key_rotation
+from app.timing import PROFILE_DIR
+
+# Без токена административные ручки выключены
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    # Заголовки приходят декодированными из latin-1; compare_digest падает на не-ASCII str, байты сравнивает всегда
+    return bool(ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token.encode("latin-1"), ADMIN_TOKEN.encode())
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if not admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/key-rotation")
+def key_rotation_progress():
+    return key_rotation.progress()
+
+@router.post("/key-rotation", status_code=202)
+def start_key_rotation():
+    try:
+        key_rotation.start()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return key_rotation.progress()
+
+@router.delete("/key-rotation")
+def stop_key_rotation():
+    key_rotation.stop(wait=False)
+    return key_rotation.progress()
+
+@router.get("/profiles")
+def list_profiles():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted((name for name in os.listdir(PROFILE_DIR) if name.endswith(".folded")), reverse=True)
+
+@router.get("/profiles/{name}", response_class=PlainTextResponse)
+def get_profile(name: str):
+    """Стеки запроса в folded-формате: flamegraph.pl или speedscope строят из них flame graph"""
+    path = os.path.join(PROFILE_DIR, os.path.basename(name))
+    if not name.endswith(".folded") or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path) as f:
+        return f.read()
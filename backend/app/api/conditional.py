@@ -0,0 +1,60 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.revision import CollectionRevision
+
+UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+async def bump_revision(db: AsyncSession, model) -> int:
+    """Увеличивает ревизию коллекции в текущей транзакции и возвращает новое значение.
+
+    Вызывается до commit вместе с записью: строка ревизии остается заблокированной
+    до конца транзакции, так что параллельные записи получают номера в порядке commit.
+    """
+    insert = UPSERTS[db.bind.dialect.name]
+    statement = insert(CollectionRevision).values(name=model.__tablename__, revision=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[CollectionRevision.name],
+        set_={"revision": CollectionRevision.revision + 1},
+    ).returning(CollectionRevision.revision)
+    return (await db.execute(statement)).scalar_one()
+
+
+async def collection_etag(db: AsyncSession, model, *params) -> str:
+    # Версия коллекции без скана таблицы: счетчик изменений (чтение по первичному ключу)
+    # и последний updated_at (по индексу), плюс параметры запроса - у разных страниц
+    # и фильтров разные ETag
+    revision = (
+        select(CollectionRevision.revision)
+        .where(CollectionRevision.name == model.__tablename__)
+        .scalar_subquery()
+    )
+    revision, last_modified = (
+        await db.execute(select(revision, func.max(model.updated_at)))
+    ).one()
+    return make_etag(revision or 0, last_modified, *params)
+
+
+def make_etag(revision: int, last_modified: Optional[datetime], *params) -> str:
+    raw = repr((revision, last_modified.isoformat() if last_modified else None, params))
+    return f'W/"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match сравнивается слабо: W/ не учитываем
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
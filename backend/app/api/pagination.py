@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_revision_cursor(revision: int, row_id: int) -> str:
+    raw = json.dumps([revision, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_revision_cursor(cursor: str) -> Optional[Tuple[int, int]]:
+    """(ревизия, id); None - курсор старого формата (updated_at, id), синхронизация с начала"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        revision, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(revision, str):
+            datetime.fromisoformat(revision)
+            return None
+        return int(revision), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
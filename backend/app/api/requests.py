@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.conditional import bump_revision, collection_etag, etag_matches, not_modified
+from app.api.pagination import decode_cursor, encode_cursor
 from app.database import get_db
 from app.models.request import AccessRequest
 from datetime import datetime
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/requests", tags=["requests"])
 
-# Pydantic   
+# Pydantic модели для запросов
 class CreateRequest(BaseModel):
     user_id: str = "current_user"
-    user_name: str = " "
+    user_name: str = "Текущий пользователь"
     secret_name: str
     description: str
     duration: int = 7
@@ -31,13 +34,75 @@ class RequestResponse(BaseModel):
     class Config:
         from_attributes = True
 
-@router.get("/", response_model=List[RequestResponse])
-def get_requests(db: Session = Depends(get_db)):
-    requests = db.query(AccessRequest).order_by(AccessRequest.created_at.desc()).all()
-    return requests
+class RequestPage(BaseModel):
+    items: List[RequestResponse]
+    next_cursor: Optional[str] = None
+
+async def list_requests(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    user_id: Optional[str] = None,
+    secret_name: Optional[str] = None,
+) -> RequestPage:
+    query = (
+        select(AccessRequest)
+        .order_by(AccessRequest.created_at.desc(), AccessRequest.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        created_at, request_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(AccessRequest.created_at, AccessRequest.id) < (created_at, request_id)
+        )
+    if status:
+        query = query.where(AccessRequest.status == status)
+    if user_id:
+        query = query.where(AccessRequest.user_id == user_id)
+    if secret_name:
+        query = query.where(AccessRequest.secret_name == secret_name)
+    requests = (await db.execute(query)).scalars().all()
+    next_cursor = None
+    if len(requests) > limit:
+        last = requests[limit - 1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return RequestPage(items=requests[:limit], next_cursor=next_cursor)
+
+@router.get("/", response_model=RequestPage)
+async def get_requests(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    user_id: Optional[str] = None,
+    secret_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    etag = await collection_etag(db, AccessRequest, limit, cursor, status, user_id, secret_name)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return await list_requests(db, limit, cursor, status, user_id, secret_name)
+
+@router.get("/pending", response_model=RequestPage)
+async def get_pending_requests(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    etag = await collection_etag(db, AccessRequest, limit, cursor, "pending")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    # Очередь согласующего: только pending, по индексу (status, created_at)
+    return await list_requests(db, limit, cursor, status="pending")
 
 @router.post("/", response_model=RequestResponse)
-def create_request(request: CreateRequest, db: Session = Depends(get_db)):
+async def create_request(request: CreateRequest, db: AsyncSession = Depends(get_db)):
     db_request = AccessRequest(
         user_id=request.user_id,
         user_name=request.user_name,
@@ -47,28 +112,31 @@ def create_request(request: CreateRequest, db: Session = Depends(get_db)):
         type=request.type
     )
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    await bump_revision(db, AccessRequest)
+    await db.commit()
+    await db.refresh(db_request)
     return db_request
 
 @router.post("/{request_id}/approve")
-def approve_request(request_id: int, db: Session = Depends(get_db)):
-    request = db.query(AccessRequest).filter(AccessRequest.id == request_id).first()
+async def approve_request(request_id: int, db: AsyncSession = Depends(get_db)):
+    request = await db.get(AccessRequest, request_id)
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     request.status = "approved"
     request.approved = True
     request.approved_at = datetime.utcnow()
-    db.commit()
+    await bump_revision(db, AccessRequest)
+    await db.commit()
     return {"message": "Request approved"}
 
 @router.post("/{request_id}/reject")
-def reject_request(request_id: int, db: Session = Depends(get_db)):
-    request = db.query(AccessRequest).filter(AccessRequest.id == request_id).first()
+async def reject_request(request_id: int, db: AsyncSession = Depends(get_db)):
+    request = await db.get(AccessRequest, request_id)
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     request.status = "rejected"
     request.approved = False
     request.rejected_at = datetime.utcnow()
-    db.commit()
+    await bump_revision(db, AccessRequest)
+    await db.commit()
     return {"message": "Request rejected"}
\ No newline at end of file
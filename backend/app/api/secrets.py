@@ -1,18 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.conditional import bump_revision, collection_etag, etag_matches, not_modified
+from app.api.pagination import decode_revision_cursor, encode_revision_cursor
 from app.database import get_db
 from app.models.secret import Secret
-from app.services.openbao_service import OpenBaoService
-from cryptography.fernet import Fernet
+from app.services.openbao_service import OpenBaoMirror, OpenBaoService
+from app.services.keyring import keyring
+from app.services.secret_cache import secret_cache
+from cryptography.fernet import InvalidToken
+import asyncio
+import json
 import os
-from pydantic import BaseModel
-from typing import List
+import tempfile
+from pydantic import BaseModel, Field, ValidationError
+from datetime import datetime
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/secrets", tags=["secrets"])
-fernet_key = os.getenv("FERNET_KEY", Fernet.generate_key())
-cipher = Fernet(fernet_key)
 
-# Pydantic 
+IMPORT_BATCH_SIZE = int(os.getenv("SECRET_IMPORT_BATCH_SIZE", "500"))
+IMPORT_MIRROR_CONCURRENCY = int(os.getenv("SECRET_IMPORT_MIRROR_CONCURRENCY", "16"))
+IMPORT_MAX_LINE_BYTES = 1 << 20
+
+# Pydantic модели
 class SecretResponse(BaseModel):
     id: int
     name: str
@@ -22,6 +36,18 @@ class SecretResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class SecretPage(BaseModel):
+    items: List[SecretResponse]
+    next_cursor: Optional[str] = None
+
+class SecretChange(SecretResponse):
+    updated_at: datetime
+
+class SecretChangesPage(BaseModel):
+    items: List[SecretChange]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
 class CreateSecret(BaseModel):
     name: str
     description: str
@@ -30,43 +56,292 @@ class CreateSecret(BaseModel):
     password: str
     host: str = ""
 
-@router.get("/", response_model=List[SecretResponse])
-def get_secrets(db: Session = Depends(get_db)):
-    secrets = db.query(Secret).all()
-    return secrets
+class BatchGetRequest(BaseModel):
+    names: List[str] = Field(..., min_length=1, max_length=500)
+
+class BatchGetItem(BaseModel):
+    name: str
+    secret: Optional[dict] = None
+    error: Optional[str] = None
+
+class BatchGetResponse(BaseModel):
+    items: List[BatchGetItem]
+
+def secret_payload(secret: Secret) -> dict:
+    decrypted_password = keyring.decrypt(secret.password.encode(), secret.key_id, secret.algorithm).decode()
+    return {
+        "name": secret.name,
+        "description": secret.description,
+        "type": secret.type,
+        "username": secret.username,
+        "password": decrypted_password,
+        "host": secret.host
+    }
+
+@router.get("/", response_model=SecretPage)
+async def get_secrets(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    secret_type: Optional[str] = Query(None, alias="type"),
+    prefix: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    etag = await collection_etag(db, Secret, limit, cursor, secret_type, prefix)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    # Keyset-пагинация по уникальному name: каждая страница - диапазон по индексу,
+    # стоимость не зависит от глубины курсора и размера таблицы
+    query = select(Secret).order_by(Secret.name).limit(limit + 1)
+    if cursor is not None:
+        query = query.where(Secret.name > cursor)
+    if secret_type:
+        query = query.where(Secret.type == secret_type)
+    if prefix:
+        query = query.where(
+            Secret.name >= prefix,
+            Secret.name.startswith(prefix, autoescape=True),
+        )
+    secrets = (await db.execute(query)).scalars().all()
+    next_cursor = secrets[limit - 1].name if len(secrets) > limit else None
+    return SecretPage(items=secrets[:limit], next_cursor=next_cursor)
+
+@router.get("/changes", response_model=SecretChangesPage)
+async def get_secret_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+):
+    # Изменения после курсора клиента в порядке (revision, id); next_cursor
+    # возвращается всегда - с него клиент начнет следующую синхронизацию.
+    # revision выдается под блокировкой счетчика коллекции, поэтому строки видны
+    # в порядке номеров: транзакция, закоммиченная позже, не окажется позади курсора
+    query = (
+        select(Secret)
+        .order_by(Secret.revision, Secret.id)
+        .limit(limit + 1)
+    )
+    position = decode_revision_cursor(since) if since is not None else None
+    if position is not None:
+        query = query.where(tuple_(Secret.revision, Secret.id) > position)
+    secrets = (await db.execute(query)).scalars().all()
+    has_more = len(secrets) > limit
+    secrets = secrets[:limit]
+    if secrets:
+        next_cursor = encode_revision_cursor(secrets[-1].revision, secrets[-1].id)
+    else:
+        next_cursor = since if position is not None else None
+    return SecretChangesPage(items=secrets, next_cursor=next_cursor, has_more=has_more)
 
 @router.post("/")
-def create_secret(secret: CreateSecret, db: Session = Depends(get_db)):
-    encrypted_password = cipher.encrypt(secret.password.encode()).decode()
+async def create_secret(secret: CreateSecret, db: AsyncSession = Depends(get_db)):
+    algorithm, key_id, encrypted_password = keyring.encrypt(secret.password.encode())
     db_secret = Secret(
         name=secret.name,
         description=secret.description,
         type=secret.type,
         username=secret.username,
-        password=encrypted_password,
+        password=encrypted_password.decode(),
+        key_id=key_id,
+        algorithm=algorithm,
         host=secret.host
     )
+    db_secret.revision = await bump_revision(db, Secret)
     db.add(db_secret)
-    db.commit()
-    db.refresh(db_secret)
-    #   OpenBao
-    OpenBaoService.save_secret(secret.name, secret.username, secret.password, secret.host)
+    await db.commit()
+    await db.refresh(db_secret)
+    secret_cache.invalidate(secret.name)
+    # Отправка в OpenBao
+    await OpenBaoService.save_secret(secret.name, secret.username, secret.password, secret.host)
     return {"message": "Secret saved", "secret_id": db_secret.id}
 
+@router.post("/batch-get", response_model=BatchGetResponse)
+async def batch_get_secrets(request: BatchGetRequest, db: AsyncSession = Depends(get_db)):
+    names = list(dict.fromkeys(request.names))
+    payloads = {}
+    errors = {}
+    # Один IN-запрос на всю пачку вместо запроса на каждое имя
+    secrets = (await db.execute(select(Secret).where(Secret.name.in_(names)))).scalars().all()
+    for secret in secrets:
+        try:
+            payload = secret_cache.get(secret.name, secret.version)
+            if payload is None:
+                payload = secret_payload(secret)
+                secret_cache.put(secret.name, secret.version, payload)
+            payloads[secret.name] = payload
+        except InvalidToken:
+            errors[secret.name] = "Secret cannot be decrypted"
+    # Промахи добираем из OpenBao параллельно; конкуренцию ограничивает сам OpenBaoService
+    missing = [name for name in names if name not in payloads and name not in errors]
+    # return_exceptions: сбой или битый ответ по одному имени - ошибка этого элемента, а не всей пачки
+    fetched = await asyncio.gather(*(OpenBaoService.get_secret(name) for name in missing), return_exceptions=True)
+    for name, secret_data in zip(missing, fetched):
+        if isinstance(secret_data, BaseException) and not isinstance(secret_data, Exception):
+            raise secret_data
+        if isinstance(secret_data, Exception) or (secret_data and not isinstance(secret_data, dict)):
+            errors[name] = "Secret storage error"
+        elif secret_data:
+            payloads[name] = secret_data
+        else:
+            errors[name] = "Secret not found"
+    return BatchGetResponse(items=[
+        BatchGetItem(name=name, secret=payloads.get(name), error=errors.get(name))
+        for name in request.names
+    ])
+
+class ImportResults:
+    """Построчный отчет импорта; копится во временном файле, а не в памяти."""
+
+    def __init__(self):
+        self.file = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        self.counts = {"created": 0, "failed": 0, "mirror_failed": 0}
+        # Причина, по которой импорт оборвался; пишется в итоговую строку отчета
+        self.error: Optional[str] = None
+
+    def write(self, line_no: int, name: Optional[str], status: str, error: Optional[str] = None):
+        record = {"line": line_no, "name": name, "status": status}
+        if error:
+            record["error"] = error
+        self.file.write(json.dumps(record, ensure_ascii=False).encode() + b"\n")
+        self.counts[status] = self.counts.get(status, 0) + 1
+
+    def stream(self):
+        summary = {"summary": self.counts}
+        if self.error:
+            summary["error"] = self.error
+        self.file.write(json.dumps(summary).encode() + b"\n")
+        self.file.seek(0)
+        try:
+            while chunk := self.file.read(64 * 1024):
+                yield chunk
+        finally:
+            self.file.close()
+
+async def iter_ndjson(request: Request):
+    buffer = b""
+    line_no = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line
+        if len(buffer) > IMPORT_MAX_LINE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Line {line_no + 1} is too long")
+    if buffer:
+        yield line_no + 1, buffer
+
+def encrypt_import_rows(accepted) -> list:
+    rows = []
+    for _, item in accepted:
+        algorithm, key_id, token = keyring.encrypt(item.password.encode())
+        rows.append({
+            "name": item.name,
+            "description": item.description,
+            "type": item.type,
+            "username": item.username,
+            "password": token.decode(),
+            "key_id": key_id,
+            "algorithm": algorithm,
+            "host": item.host,
+        })
+    return rows
+
+async def insert_secret_batch(db: AsyncSession, batch):
+    names = [item.name for _, item in batch]
+    existing = set((await db.execute(select(Secret.name).where(Secret.name.in_(names)))).scalars())
+    accepted = []
+    rejected = []
+    seen = set()
+    for line_no, item in batch:
+        if item.name in existing:
+            rejected.append((line_no, item, "Secret already exists"))
+        elif item.name in seen:
+            rejected.append((line_no, item, "Duplicate name in import"))
+        else:
+            seen.add(item.name)
+            accepted.append((line_no, item))
+    # Шифрование пачки - CPU-работа, уводим ее с event loop
+    rows = await run_in_threadpool(encrypt_import_rows, accepted)
+    if rows:
+        # executemany одной транзакцией на пачку
+        try:
+            revision = await bump_revision(db, Secret)
+            await db.execute(insert(Secret), [dict(row, revision=revision) for row in rows])
+            await db.commit()
+        except IntegrityError:
+            # Имена заняли параллельно с нами - пачка откатывается целиком
+            await db.rollback()
+            rejected.extend((line_no, item, "Secret already exists") for line_no, item in accepted)
+            accepted = []
+    return accepted, rejected
+
+@router.post("/import")
+async def import_secrets(request: Request, db: AsyncSession = Depends(get_db)):
+    results = ImportResults()
+    mirror = OpenBaoMirror(
+        IMPORT_MIRROR_CONCURRENCY,
+        on_failure=lambda line_no, name: results.write(line_no, name, "mirror_failed"),
+    )
+
+    async def flush(batch):
+        accepted, rejected = await insert_secret_batch(db, batch)
+        for line_no, item, error in rejected:
+            results.write(line_no, item.name, "failed", error)
+        for line_no, item in accepted:
+            results.write(line_no, item.name, "created")
+            await mirror.put(line_no, item.name, item.username, item.password, item.host)
+
+    batch = []
+    status_code = 200
+    try:
+        try:
+            async for line_no, line in iter_ndjson(request):
+                if not line.strip():
+                    continue
+                try:
+                    batch.append((line_no, CreateSecret.model_validate_json(line)))
+                except ValidationError as e:
+                    error = e.errors(include_url=False)[0]
+                    field = ".".join(str(part) for part in error["loc"])
+                    results.write(line_no, None, "failed", f"{field}: {error['msg']}" if field else error["msg"])
+                    continue
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    await flush(batch)
+                    batch = []
+            if batch:
+                await flush(batch)
+        finally:
+            # Сначала дожидаемся зеркалирования: его on_failure пишет в отчет
+            await mirror.close()
+    except HTTPException as e:
+        # Поток оборван (413): закоммиченные пачки остаются в базе, отчет о них
+        # отдаем, а строки недописанной пачки помечаем как не импортированные
+        status_code = e.status_code
+        results.error = e.detail
+        for line_no, item in batch:
+            results.write(line_no, item.name, "failed", f"Import aborted: {e.detail}")
+    except BaseException:
+        results.file.close()
+        raise
+    return StreamingResponse(results.stream(), status_code=status_code, media_type="application/x-ndjson")
+
 @router.get("/{name}")
-def get_secret(name: str, db: Session = Depends(get_db)):
-    secret = db.query(Secret).filter(Secret.name == name).first()
+async def get_secret(name: str, db: AsyncSession = Depends(get_db)):
+    if secret_cache.enabled:
+        # Версию сверяем с базой: запись могла пройти через другой воркер
+        version = (await db.execute(select(Secret.version).where(Secret.name == name))).scalar()
+        cached = secret_cache.get(name, version) if version is not None else None
+        if cached is not None:
+            return cached
+    secret = (await db.execute(select(Secret).where(Secret.name == name))).scalars().first()
     if not secret:
-        secret_data = OpenBaoService.get_secret(name)
+        secret_data = await OpenBaoService.get_secret(name)
         if not secret_data:
             raise HTTPException(status_code=404, detail="Secret not found")
         return secret_data
-    decrypted_password = cipher.decrypt(secret.password.encode()).decode()
-    return {
-        "name": secret.name,
-        "description": secret.description,
-        "type": secret.type,
-        "username": secret.username,
-        "password": decrypted_password,
-        "host": secret.host
-    }
\ No newline at end of file
+    payload = secret_payload(secret)
+    secret_cache.put(secret.name, secret.version, payload)
+    return payload
\ No newline at end of file
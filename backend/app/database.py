@@ -1,16 +1,136 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
 import os
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.metrics import DB_QUERY_DURATION, REGISTRY
+from app.timing import add_phase
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://user:password@db:5432/secrets")
 
-engine = create_engine(DATABASE_URL)
+# Асинхронные драйверы для того же URL: asyncpg в проде, aiosqlite для тестов
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DB_POOL_WAIT = REGISTRY.histogram("db_pool_wait_seconds", "Wait for a free pooled connection",
+                                  ("pool",), POOL_WAIT_BUCKETS)
+DB_POOL_TIMEOUTS = REGISTRY.counter("db_pool_timeouts_total", "Pool checkouts that timed out", ("pool",))
+
+class TimedPoolMixin:
+    """Меряет ожидание свободного соединения в пуле."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts.inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.wait_seconds.observe(elapsed)
+            add_phase("db-pool", elapsed)
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    wait_seconds = DB_POOL_WAIT.labels("sync")
+    timeouts = DB_POOL_TIMEOUTS.labels("sync")
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    wait_seconds = DB_POOL_WAIT.labels("async")
+    timeouts = DB_POOL_TIMEOUTS.labels("async")
+
+def engine_options(url: str, poolclass) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite живет в одном соединении - пул не настраиваем
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+# Синхронный движок остается для create_all, бенчмарков и фоновых задач
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, TimedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, TimedAsyncQueuePool)
+)
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK", "WITH"}
+
+def time_queries(sync_engine, label: str):
+    """Время выполнения каждого SQL-запроса по типу операции"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        words = statement[:32].split(None, 1)
+        operation = words[0].upper() if words else ""
+        DB_QUERY_DURATION.labels(label, operation if operation in SQL_OPERATIONS else "OTHER").observe(elapsed)
+        add_phase("db", elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        # Упавший запрос не доходит до after_cursor_execute - снимаем его отметку
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+time_queries(engine, "sync")
+time_queries(async_engine.sync_engine, "async")
+
+# expire_on_commit=False: после commit атрибуты не должны лениво догружаться вне await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def pool_stats(pool) -> dict:
+    stats = {"status": pool.status()}
+    if isinstance(pool, TimedPoolMixin):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=DB_MAX_OVERFLOW,
+            timeouts=pool.timeouts.value,
+            wait_seconds=pool.wait_seconds.snapshot(),
+        )
+    return stats
@@ -1,28 +1,70 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import secrets, requests
-from app.database import Base, engine
+from fastapi.middleware.gzip import GZipMiddleware
+from app.api import admin, secrets, requests
+from app.database import async_engine, engine, pool_stats
+from app.migrations import upgrade
+from app.metrics import render, start_multiprocess_flush
+from app.middleware import MetricsMiddleware, TimingMiddleware, timing_middleware_needed
+from app.services.auth_service import AUTH_VERIFY_MODE, AuthService
+from app.services.key_rotation import key_rotation
+from app.services.openbao_service import OpenBaoService
+from app.services.secret_cache import secret_cache
 
-Base.metadata.create_all(bind=engine)
+# Новые таблицы, а также колонки и индексы, добавленные в модели позже
+upgrade(engine)
 
 app = FastAPI(title="Secret Management System")
 
-#  CORS  SPA
+# Настройка CORS для SPA
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000"],  #   
+    allow_origins=["http://localhost:3000"],  # Адрес вашего фронтенда
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Списки секретов и синхронизация хорошо жмутся
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+# Последним - снаружи: в латентность входит и сжатие ответа
+app.add_middleware(MetricsMiddleware)
+if timing_middleware_needed():
+    app.add_middleware(TimingMiddleware)
 
 app.include_router(secrets.router)
 app.include_router(requests.router)
+app.include_router(admin.router)
+
+@app.on_event("startup")
+def startup():
+    start_multiprocess_flush()
+    if AUTH_VERIFY_MODE == "jwks":
+        # Ключи Keycloak загружаем до первого запроса, дальше их обновляет фоновый поток
+        AuthService.jwks.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Ротация продолжит с последней пачки при следующем запуске
+    key_rotation.stop()
+    await OpenBaoService.close()
+    await async_engine.dispose()
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/metrics/db-pool")
+def db_pool_metrics():
+    return {"async": pool_stats(async_engine.pool), "sync": pool_stats(engine.pool)}
+
+@app.get("/metrics/secret-cache")
+def secret_cache_metrics():
+    return secret_cache.stats()
+
 @app.get("/")
 def root():
     return {"message": "Secret Management System API"}
\ No newline at end of file
@@ -0,0 +1,269 @@
+import atexit
+import bisect
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Каталог для снимков метрик воркеров uvicorn; без него /metrics показывает только свой процесс
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, как у Prometheus (кумулятивные le)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def state(self) -> Tuple[list, float]:
+        """Некумулятивные счетчики корзин (последняя - +Inf) и сумма"""
+        with self._lock:
+            return list(self._counts), self._sum
+
+    def snapshot(self) -> dict:
+        counts, total = self.state()
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = cumulative + counts[-1]
+        return {"buckets": buckets, "count": buckets["+Inf"], "sum": total}
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+class Gauge(Counter):
+    def dec(self, amount: int = 1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        self._value = value
+
+class Family:
+    """Метрика с метками: по серии (Counter/Gauge/Histogram) на набор значений меток.
+
+    Серия ищется в dict без блокировки; блокировка берется только при
+    создании новой серии.
+    """
+
+    def __init__(self, name: str, kind: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Optional[Tuple[float, ...]] = None):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) if buckets else None
+        self._series: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.get(values)
+                if series is None:
+                    series = self._new_series()
+                    self._series[values] = series
+        return series
+
+    def _new_series(self):
+        if self.kind == "histogram":
+            return Histogram(self.buckets)
+        return Gauge() if self.kind == "gauge" else Counter()
+
+    def snapshot(self) -> dict:
+        series = []
+        for values, metric in list(self._series.items()):
+            data = list(metric.state()) if self.kind == "histogram" else metric.value
+            series.append([list(values), data])
+        return {"kind": self.kind, "help": self.help, "labelnames": list(self.labelnames),
+                "buckets": list(self.buckets) if self.buckets else None, "series": series}
+
+class Registry:
+    def __init__(self):
+        self._families: Dict[str, Family] = {}
+
+    def _register(self, family: Family) -> Family:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} is already registered")
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Family:
+        return self._register(Family(name, "counter", help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames=()) -> Family:
+        return self._register(Family(name, "gauge", help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Family:
+        return self._register(Family(name, "histogram", help_text, labelnames, buckets))
+
+    def snapshot(self) -> dict:
+        return {name: family.snapshot() for name, family in self._families.items()}
+
+REGISTRY = Registry()
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        pass
+    return True
+
+def write_snapshot(directory: Optional[str] = None):
+    """Снимок метрик процесса в <pid>.json; запись атомарная через rename"""
+    path = os.path.join(directory or METRICS_MULTIPROC_DIR, f"{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(REGISTRY.snapshot(), f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+def merge_snapshots(snapshots) -> dict:
+    """Складывает снимки процессов: счетчики и гистограммы суммируются всегда,
+    gauge - только у живых процессов (in-flight умершего воркера уже не в полете)"""
+    merged = {}
+    for alive, snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, dict(family, series={}))
+            if family["kind"] == "gauge" and not alive:
+                continue
+            for values, data in family["series"]:
+                key = tuple(values)
+                current = target["series"].get(key)
+                if current is None:
+                    target["series"][key] = data
+                elif family["kind"] == "histogram":
+                    target["series"][key] = [[a + b for a, b in zip(current[0], data[0])], current[1] + data[1]]
+                else:
+                    target["series"][key] = current + data
+    for family in merged.values():
+        family["series"] = [[list(key), data] for key, data in family["series"].items()]
+    return merged
+
+def collect() -> dict:
+    if not METRICS_MULTIPROC_DIR:
+        return REGISTRY.snapshot()
+    write_snapshot()
+    snapshots = []
+    for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, "*.json")):
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            # Битый или исчезнувший снимок - пропускаем этот воркер, а не весь /metrics
+            logger.warning("Skipping metrics snapshot %s: %s", path, e)
+            continue
+        pid = int(os.path.splitext(os.path.basename(path))[0])
+        snapshots.append((pid == os.getpid() or _pid_alive(pid), snapshot))
+    return merge_snapshots(snapshots)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+def render(snapshot: Optional[dict] = None) -> str:
+    """Текстовый формат Prometheus 0.0.4"""
+    snapshot = collect() if snapshot is None else snapshot
+    lines = []
+    for name, family in sorted(snapshot.items()):
+        names = family["labelnames"]
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['kind']}")
+        for values, data in sorted(family["series"], key=lambda item: item[0]):
+            if family["kind"] != "histogram":
+                lines.append(f"{name}{_labels(names, values)} {_number(data)}")
+                continue
+            counts, total = data
+            cumulative = 0
+            for bound, count in zip(family["buckets"], counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{_labels(names, values, le)} {cumulative}")
+            cumulative += counts[-1]
+            le = 'le="+Inf"'
+            lines.append(f"{name}_bucket{_labels(names, values, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(names, values)} {_number(float(total))}")
+            lines.append(f"{name}_count{_labels(names, values)} {cumulative}")
+    lines.append("")
+    return "\n".join(lines)
+
+_flush_thread: Optional[threading.Thread] = None
+
+def start_multiprocess_flush():
+    """Периодически сбрасывает снимок процесса, чтобы /metrics любого воркера видел остальных"""
+    global _flush_thread
+    if not METRICS_MULTIPROC_DIR or _flush_thread is not None:
+        return
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+
+    def flush_loop():
+        while True:
+            time.sleep(METRICS_FLUSH_INTERVAL)
+            try:
+                write_snapshot()
+            except OSError as e:
+                logger.warning("Metrics snapshot failed: %s", e)
+
+    _flush_thread = threading.Thread(target=flush_loop, name="metrics-flush", daemon=True)
+    _flush_thread.start()
+    write_snapshot()
+    atexit.register(write_snapshot)
+
+# Общие метрики сервиса
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by route and status",
+                                 ("method", "route", "status"))
+HTTP_DURATION = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency",
+                                   ("method", "route"))
+HTTP_IN_PROGRESS = REGISTRY.gauge("http_requests_in_progress", "HTTP requests being served", ("method",))
+DB_QUERY_DURATION = REGISTRY.histogram("db_query_duration_seconds", "SQL statement execution time",
+                                       ("engine", "operation"))
+CIPHER_DURATION = REGISTRY.histogram("cipher_operation_duration_seconds", "Secret encryption and decryption time",
+                                     ("algorithm", "operation"), FAST_BUCKETS)
+OPENBAO_DURATION = REGISTRY.histogram("openbao_request_duration_seconds",
+                                      "OpenBao calls including retries", ("method", "status"))
+AUTH_DURATION = REGISTRY.histogram("auth_request_duration_seconds", "Keycloak userinfo and JWKS calls",
+                                   ("endpoint", "status"))
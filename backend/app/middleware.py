@@ -0,0 +1,122 @@
+import os
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app.api.admin import admin_token_valid
+from app.metrics import HTTP_DURATION, HTTP_IN_PROGRESS, HTTP_REQUESTS
+from app.timing import StackSampler, finish_phases, server_timing, start_phases
+
+# Server-Timing на каждом ответе; без флага - только на запросах с X-Admin-Token
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+# Профилировать каждый запрос (по одному за раз); без флага - по X-Profile с X-Admin-Token
+REQUEST_PROFILING = os.getenv("REQUEST_PROFILING", "false").lower() in ("1", "true", "yes")
+# Server-Timing и профиль по заголовкам X-Admin-Token/X-Profile; наличия ADMIN_TOKEN для этого мало
+ADMIN_TIMING_ENABLED = os.getenv("ADMIN_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+class MetricsMiddleware:
+    """Число запросов, латентность и запросы в полете.
+
+    Чистый ASGI без BaseHTTPMiddleware: тело ответа не буферизуется, а время
+    считается до отправки последнего куска, включая потоковые ответы.
+    Метка route - шаблон (/api/secrets/{name}), его кладет в scope роутер
+    FastAPI; поэтому запросы в полете считаются по методу - до роутинга
+    маршрут еще неизвестен, а сопоставлять его заранее дороже самого учета.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = scope.get("route")
+            route = route.path if route is not None else UNMATCHED_ROUTE
+            HTTP_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, status).inc()
+
+def timing_middleware_needed() -> bool:
+    """Без флагов middleware не ставится, и add_phase сводится к чтению ContextVar"""
+    return SERVER_TIMING_ENABLED or REQUEST_PROFILING or ADMIN_TIMING_ENABLED
+
+class TimingMiddleware:
+    """Разбивка запроса по фазам (db, db-pool, cipher, openbao, auth) в заголовке
+    Server-Timing и, по запросу, профиль стеков этого запроса.
+
+    Профиль сохраняется в PROFILE_DIR, имя файла возвращается в X-Profile-File;
+    забрать его можно через GET /api/admin/profiles/{name}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        admin = profile_requested = False
+        if ADMIN_TIMING_ENABLED:
+            for name, value in scope["headers"]:
+                if name == b"x-admin-token":
+                    admin = admin_token_valid(value.decode("latin-1"))
+                elif name == b"x-profile":
+                    profile_requested = value not in (b"", b"0", b"false")
+        profile = REQUEST_PROFILING or (admin and profile_requested)
+        if not (SERVER_TIMING_ENABLED or admin or profile):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler() if profile else None
+        if sampler is not None and not sampler.start():
+            # Уже идет профилирование другого запроса
+            sampler = None
+        token, phases = start_phases()
+        started = time.perf_counter()
+        profile_file = None
+        label = f"{scope['method']}-{scope['path']}"
+
+        def finish_profile() -> str:
+            # join потока сэмплера и запись файла - вне цикла событий
+            sampler.stop()
+            return sampler.save(label)
+
+        async def send_with_timing(message):
+            nonlocal profile_file
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(phases, total).encode()))
+                if sampler is not None:
+                    profile_file = await run_in_threadpool(finish_profile)
+                    headers.append((b"x-profile-file", profile_file.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            finish_phases(token)
+            if sampler is not None and profile_file is None:
+                # Ответ так и не начался (исключение) - профиль все равно сохраняем
+                await run_in_threadpool(finish_profile)
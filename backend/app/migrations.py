@@ -0,0 +1,59 @@
+import logging
+
+from sqlalchemy import inspect, literal, text
+from sqlalchemy.schema import CreateIndex
+
+from app.database import Base, engine
+from app.models.request import AccessRequest  # noqa: F401 - регистрирует таблицу в metadata
+from app.models.revision import CollectionRevision  # noqa: F401
+from app.models.secret import Secret  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# Чем заполнить добавленную колонку в старых строках, если у нее нет константного default
+BACKFILL = {
+    ("secrets", "updated_at"): "created_at",
+    ("access_requests", "updated_at"): "created_at",
+}
+
+def upgrade(bind=engine):
+    """Приводит схему к моделям: create_all создает новые таблицы, а колонки и
+    индексы, появившиеся в моделях позже, добавляются в существующие таблицы.
+
+    Идемпотентно; вызывается при старте приложения и вручную:
+        python -m app.migrations
+    """
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        postgres = conn.dialect.name == "postgresql"
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    add_column(conn, table, column, if_not_exists=postgres)
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    # IF NOT EXISTS: воркеры uvicorn стартуют одновременно
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+                    logger.info("Created index %s", index.name)
+
+def add_column(conn, table, column, if_not_exists: bool = False):
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {'IF NOT EXISTS ' if if_not_exists else ''}"
+    ddl += f"{column.name} {column.type.compile(dialect=conn.dialect)}"
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if default is not None:
+        value = literal(default).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        ddl += f" DEFAULT {value}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+    conn.execute(text(ddl))
+    source = BACKFILL.get((table.name, column.name))
+    if source is not None:
+        conn.execute(text(f"UPDATE {table.name} SET {column.name} = {source} WHERE {column.name} IS NULL"))
+    logger.info("Added column %s.%s", table.name, column.name)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    upgrade()
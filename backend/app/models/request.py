@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Index
 from datetime import datetime
 from app.database import Base
 
@@ -7,7 +7,7 @@ class AccessRequest(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, nullable=False)
-    user_name = Column(String, nullable=False, default=" ")
+    user_name = Column(String, nullable=False, default="Текущий пользователь")
     secret_name = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     status = Column(String, default="pending")  # pending, approved, rejected
@@ -15,5 +15,15 @@ class AccessRequest(Base):
     type = Column(String, default="database")  # database, api, ssh
     approved = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     approved_at = Column(DateTime, nullable=True)
-    rejected_at = Column(DateTime, nullable=True)
\ No newline at end of file
+    rejected_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Очереди листаются по (created_at, id) desc внутри фильтра - индекс отдает
+        # страницу без сортировки и без скана истории
+        Index("ix_access_requests_created", "created_at", "id"),
+        Index("ix_access_requests_status_created", "status", "created_at", "id"),
+        Index("ix_access_requests_user_created", "user_id", "created_at", "id"),
+        Index("ix_access_requests_secret_created", "secret_name", "created_at", "id"),
+    )
\ No newline at end of file
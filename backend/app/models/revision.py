@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, Column, String
+from app.database import Base
+
+class CollectionRevision(Base):
+    """Счетчик изменений коллекции (по строке на таблицу).
+
+    Увеличивается в той же транзакции, что и запись; блокировка строки
+    выстраивает пишущие транзакции в очередь, поэтому ревизии становятся
+    видны читателям строго по возрастанию.
+    """
+    __tablename__ = "collection_revisions"
+
+    name = Column(String(64), primary_key=True)
+    revision = Column(BigInteger, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Text, Index
 from datetime import datetime
 from app.database import Base
 
@@ -11,5 +11,25 @@ class Secret(Base):
     type = Column(String, default="database")  # database, api, ssh
     username = Column(String, nullable=False)
     password = Column(String, nullable=False)
+    # Ключ, которым зашифрован password; NULL - строка старше кольца ключей
+    key_id = Column(String(32), nullable=True)
+    # Алгоритм шифрования password; NULL - fernet (строки до появления тега)
+    algorithm = Column(String(16), nullable=True)
     host = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Растет при каждом изменении строки через ORM; по ней сверяется кэш расшифрованных значений.
+    # Перешифрование ключей версию не меняет - расшифрованное значение то же
+    version = Column(Integer, nullable=False, default=1)
+    # Ревизия коллекции на момент записи (collection_revisions); по ней листается /changes
+    revision = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        # Листинг с фильтром по типу идет по диапазону (type, name) без сортировки
+        Index("ix_secrets_type_name", "type", "name"),
+        # max(updated_at) для ETag листинга
+        Index("ix_secrets_updated", "updated_at", "id"),
+        # Инкрементальная синхронизация клиентов листает изменения по (revision, id)
+        Index("ix_secrets_revision", "revision", "id"),
+    )
+    __mapper_args__ = {"version_id_col": version}
\ No newline at end of file
@@ -1,15 +1,195 @@
-import requests
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import requests
+from jose import jwt, JWTError
+
+from app.metrics import AUTH_DURATION
+from app.timing import add_phase
 
 KEYCLOAK_URL = os.getenv("KEYCLOAK_URL", "http://keycloak:8080")
 REALM = "master"
 CLIENT_ID = "secret-client"
 
-class AuthService:
+# userinfo - каждый промах кэша идет в Keycloak; jwks - подпись проверяется локально
+AUTH_VERIFY_MODE = os.getenv("AUTH_VERIFY_MODE", "userinfo")
+AUTH_AUDIENCE = os.getenv("AUTH_AUDIENCE")
+AUTH_TIMEOUT = float(os.getenv("AUTH_TIMEOUT", "5.0"))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+JWKS_REFRESH_INTERVAL = float(os.getenv("JWKS_REFRESH_INTERVAL", "300"))
+# iss в токенах - внешний адрес Keycloak; если сервис ходит в него по другому адресу, задайте явно
+AUTH_ISSUER = os.getenv("AUTH_ISSUER", f"{KEYCLOAK_URL}/realms/{REALM}")
+
+USERINFO_URL = f"{KEYCLOAK_URL}/realms/{REALM}/protocol/openid-connect/userinfo"
+JWKS_URL = f"{KEYCLOAK_URL}/realms/{REALM}/protocol/openid-connect/certs"
+
+class TokenCache:
+    """LRU-кэш результатов проверки токенов с TTL, не переживающим exp токена."""
+
+    def __init__(self, max_size: int = TOKEN_CACHE_MAX_SIZE, ttl: float = TOKEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
     @staticmethod
-    def validate_token(token: str):
+    def key(token: str) -> str:
+        # Сами токены в памяти не держим
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str):
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, claims: dict):
+        expires_at = time.time() + self.ttl
+        exp = claims.get("exp") or _unverified_exp(token)
+        if exp:
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= time.time():
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+class JWKSCache:
+    """Ключи Keycloak для локальной проверки JWT с фоновым обновлением."""
+
+    def __init__(self, url: str = JWKS_URL, refresh_interval: float = JWKS_REFRESH_INTERVAL):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def refresh(self) -> bool:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = requests.get(self.url, timeout=AUTH_TIMEOUT)
+            status = str(response.status_code)
+            response.raise_for_status()
+            keys = {key["kid"]: key for key in response.json().get("keys", [])}
+        except (requests.RequestException, ValueError, KeyError):
+            return False
+        finally:
+            elapsed = time.perf_counter() - started
+            AUTH_DURATION.labels("jwks", status).observe(elapsed)
+            add_phase("auth", elapsed)
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = time.time()
+        return True
+
+    def get_key(self, kid: str) -> Optional[dict]:
+        with self._lock:
+            key = self._keys.get(kid)
+            stale = time.time() - self._fetched_at > 30
+        # Неизвестный kid - ключи могли только что ротировать; не чаще раза в 30 с
+        if key is None and stale and self.refresh():
+            with self._lock:
+                key = self._keys.get(kid)
+        return key
+
+    def start(self):
+        """Первая загрузка ключей (блокирующая) и запуск фонового обновления; вызывается на старте"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._refresh_loop, name="jwks-refresh", daemon=True)
+        self.refresh()
+        self._thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            self.refresh()
+
+def _unverified_exp(token: str):
+    try:
+        return jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return None
+
+class AuthService:
+    cache = TokenCache()
+    jwks = JWKSCache()
+    _session = requests.Session()
+
+    @classmethod
+    def validate_token(cls, token: str):
+        claims = cls.cache.get(token)
+        if claims is not None:
+            return claims
+        if AUTH_VERIFY_MODE == "jwks":
+            claims = cls._verify_locally(token)
+        else:
+            claims = cls._fetch_userinfo(token)
+        if claims is not None:
+            cls.cache.put(token, claims)
+        return claims
+
+    @classmethod
+    def _fetch_userinfo(cls, token: str):
         headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(f"{KEYCLOAK_URL}/realms/{REALM}/protocol/openid-connect/userinfo", headers=headers)
+        started = time.perf_counter()
+        try:
+            response = cls._session.get(USERINFO_URL, headers=headers, timeout=AUTH_TIMEOUT)
+        except requests.RequestException:
+            response = None
+        elapsed = time.perf_counter() - started
+        status = str(response.status_code) if response is not None else "error"
+        AUTH_DURATION.labels("userinfo", status).observe(elapsed)
+        add_phase("auth", elapsed)
+        if response is None:
+            return None
         if response.status_code == 200:
             return response.json()
         return None
+
+    @classmethod
+    def _verify_locally(cls, token: str):
+        # Ключи загружены на старте приложения (jwks.start); неизвестный kid подгружается в get_key
+        try:
+            header = jwt.get_unverified_header(token)
+            key = cls.jwks.get_key(header.get("kid"))
+            if key is None:
+                return None
+            return jwt.decode(
+                token,
+                key,
+                algorithms=[key.get("alg", "RS256")],
+                audience=AUTH_AUDIENCE,
+                issuer=AUTH_ISSUER,
+                options={"verify_aud": AUTH_AUDIENCE is not None},
+            )
+        except JWTError:
+            return None
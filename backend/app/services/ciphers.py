@@ -0,0 +1,65 @@
+import base64
+import binascii
+import os
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+FERNET = "fernet"
+AES_GCM = "aes-gcm"
+
+class Cipher:
+    """Шифр для значения секрета. Токен - ASCII bytes, он хранится в строковой колонке."""
+
+    algorithm = ""
+
+    def encrypt(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decrypt(self, token: bytes) -> bytes:
+        """Неверный ключ или поврежденный токен - InvalidToken для любого алгоритма"""
+        raise NotImplementedError
+
+class FernetCipher(Cipher):
+    """AES-128-CBC + HMAC-SHA256, токен в base64 с версией и временем"""
+
+    algorithm = FERNET
+
+    def __init__(self, key: bytes):
+        self._fernet = Fernet(key)
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._fernet.encrypt(data)
+
+    def decrypt(self, token: bytes) -> bytes:
+        return self._fernet.decrypt(token)
+
+class AesGcmCipher(Cipher):
+    """AES-256-GCM: nonce (12 байт) + шифротекст + тег (16 байт), в base64.
+
+    Ключ выводится HKDF из того же ключа кольца, что и у Fernet, так что
+    отдельного хранения ключей для GCM не нужно.
+    """
+
+    algorithm = AES_GCM
+    NONCE_SIZE = 12
+
+    def __init__(self, key: bytes):
+        hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"secret-management/aes-gcm")
+        self._aead = AESGCM(hkdf.derive(base64.urlsafe_b64decode(key)))
+
+    def encrypt(self, data: bytes) -> bytes:
+        nonce = os.urandom(self.NONCE_SIZE)
+        return base64.urlsafe_b64encode(nonce + self._aead.encrypt(nonce, data, None))
+
+    def decrypt(self, token: bytes) -> bytes:
+        try:
+            raw = base64.urlsafe_b64decode(token)
+            return self._aead.decrypt(raw[:self.NONCE_SIZE], raw[self.NONCE_SIZE:], None)
+        except (InvalidTag, binascii.Error, ValueError):
+            raise InvalidToken
+
+CIPHERS = {FERNET: FernetCipher, AES_GCM: AesGcmCipher}
@@ -0,0 +1,265 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from sqlalchemy import and_, bindparam, func, or_, select, update
+
+from app.database import SessionLocal
+from app.models.secret import Secret
+from app.services.ciphers import FERNET
+from app.services.keyring import KeyRing, init_rotation_worker, keyring, rotate_rows
+
+logger = logging.getLogger(__name__)
+
+KEY_ROTATION_BATCH_SIZE = int(os.getenv("KEY_ROTATION_BATCH_SIZE", "500"))
+KEY_ROTATION_MIN_BATCH = int(os.getenv("KEY_ROTATION_MIN_BATCH", "50"))
+KEY_ROTATION_MAX_BATCH = int(os.getenv("KEY_ROTATION_MAX_BATCH", "5000"))
+KEY_ROTATION_WORKERS = int(os.getenv("KEY_ROTATION_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Бюджет латентности чтения секрета, пока идет ротация
+KEY_ROTATION_READ_BUDGET_MS = float(os.getenv("KEY_ROTATION_READ_BUDGET_MS", "20"))
+KEY_ROTATION_MAX_PAUSE = float(os.getenv("KEY_ROTATION_MAX_PAUSE", "5"))
+KEY_ROTATION_CHECKPOINT = os.getenv("KEY_ROTATION_CHECKPOINT", "key_rotation.json")
+
+# Сглаживание замеров латентности чтения
+PROBE_SMOOTHING = 0.3
+
+class KeyRotationJob:
+    """Перешифровывает Secret.password основным ключом и алгоритмом кольца.
+
+    Строки с чужим key_id или алгоритмом берутся пачками по возрастанию id (keyset, без
+    OFFSET), расшифровываются и шифруются заново в пуле процессов и пишутся
+    одним UPDATE на пачку. UPDATE условный (password не изменился), поэтому
+    параллельная запись секрета не затирается, а updated_at и version не
+    меняются - клиенты не перекачивают секреты из-за ротации.
+
+    После каждой пачки замеряется чтение одного секрета. Пока оно укладывается
+    в бюджет, пачка растет, а пауза сокращается; при выходе за бюджет пачка
+    уменьшается вдвое, пауза удваивается. Последний обработанный id
+    сохраняется в файл: перезапущенная задача продолжает с него.
+    """
+
+    def __init__(self, ring: KeyRing = keyring, session_factory=SessionLocal,
+                 batch_size: int = KEY_ROTATION_BATCH_SIZE, workers: int = KEY_ROTATION_WORKERS,
+                 read_budget_ms: float = KEY_ROTATION_READ_BUDGET_MS,
+                 checkpoint_path: Optional[str] = KEY_ROTATION_CHECKPOINT):
+        self.ring = ring
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.workers = workers
+        self.read_budget = read_budget_ms / 1000
+        self.checkpoint_path = checkpoint_path
+        self.pause = 0.0
+        self.read_latency = 0.0
+        self.status = "idle"
+        self.error: Optional[str] = None
+        self.total = 0
+        self.last_id = 0
+        self.rotated = 0
+        self.skipped = 0
+        self.failed_ids = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                raise RuntimeError("Key rotation is already running")
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="key-rotation", daemon=True)
+            self._thread.start()
+
+    def stop(self, wait: bool = True):
+        """Останавливает задачу после текущей пачки; прогресс остается в файле"""
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def progress(self) -> dict:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        done = self.rotated + self.skipped + len(self.failed_ids)
+        return {
+            "status": self.status,
+            "key_id": self.ring.primary_id,
+            "algorithm": self.ring.algorithm,
+            "total": self.total,
+            "rotated": self.rotated,
+            "skipped": self.skipped,
+            "failed": len(self.failed_ids),
+            "failed_ids": self.failed_ids[:100],
+            "last_id": self.last_id,
+            "percent": round(done * 100 / self.total, 1) if self.total else 100.0,
+            "rows_per_second": round(self.rotated / elapsed, 1) if elapsed else 0.0,
+            "batch_size": self.batch_size,
+            "pause_seconds": round(self.pause, 3),
+            "read_latency_ms": round(self.read_latency * 1000, 2),
+            "read_budget_ms": self.read_budget * 1000,
+            "error": self.error,
+        }
+
+    def run(self):
+        self.status = "running"
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._load_checkpoint()
+        pool = None
+        if self.workers > 1:
+            # spawn: fork из процесса с потоками uvicorn и пулом соединений небезопасен
+            pool = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_rotation_worker,
+                initargs=(self.ring.keys, self.ring.algorithm),
+            )
+        try:
+            self.total = self._count_remaining() + self.rotated + self.skipped + len(self.failed_ids)
+            while not self._stop.is_set():
+                rows = self._next_batch()
+                if not rows:
+                    self.status = "completed"
+                    break
+                self._apply(self._rotate(rows, pool))
+                self.last_id = rows[-1][0]
+                self._save_checkpoint()
+                self._throttle(rows[-1][0])
+            else:
+                self.status = "stopped"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            logger.exception("Key rotation failed after id %s", self.last_id)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            self.finished_at = time.time()
+        if self.status == "completed":
+            logger.info("Key rotation finished: %d rotated, %d undecryptable", self.rotated, len(self.failed_ids))
+        return self.progress()
+
+    def _pending(self):
+        if self.ring.algorithm == FERNET:
+            other_algorithm = and_(Secret.algorithm.isnot(None), Secret.algorithm != FERNET)
+        else:
+            other_algorithm = or_(Secret.algorithm.is_(None), Secret.algorithm != self.ring.algorithm)
+        return or_(Secret.key_id.is_(None), Secret.key_id != self.ring.primary_id, other_algorithm)
+
+    def _count_remaining(self) -> int:
+        with self.session_factory() as db:
+            query = select(func.count()).select_from(Secret).where(self._pending(), Secret.id > self.last_id)
+            return db.execute(query).scalar_one()
+
+    def _next_batch(self):
+        query = (
+            select(Secret.id, Secret.password, Secret.key_id, Secret.algorithm)
+            .where(Secret.id > self.last_id, self._pending())
+            .order_by(Secret.id)
+            .limit(self.batch_size)
+        )
+        with self.session_factory() as db:
+            return [tuple(row) for row in db.execute(query)]
+
+    def _rotate(self, rows, pool):
+        if pool is None:
+            return rotate_rows(rows, self.ring)
+        size = -(-len(rows) // self.workers)
+        chunks = [rows[i:i + size] for i in range(0, len(rows), size)]
+        return [item for chunk in pool.map(rotate_rows, chunks) for item in chunk]
+
+    def _apply(self, results):
+        params = []
+        for row_id, old_token, new_token, new_key_id, new_algorithm in results:
+            if new_token is None:
+                self.failed_ids.append(row_id)
+            else:
+                params.append({"b_id": row_id, "b_old": old_token, "b_new": new_token,
+                               "b_key_id": new_key_id, "b_algorithm": new_algorithm})
+        if not params:
+            return
+        statement = (
+            update(Secret)
+            .where(Secret.id == bindparam("b_id"), Secret.password == bindparam("b_old"))
+            # Явное updated_at отключает onupdate: содержимое секрета не меняется
+            .values(password=bindparam("b_new"), key_id=bindparam("b_key_id"),
+                    algorithm=bindparam("b_algorithm"), updated_at=Secret.updated_at)
+        )
+        with self.session_factory() as db:
+            matched = db.connection().execute(statement, params).rowcount
+            db.commit()
+        # rowcount у executemany не все драйверы отдают; -1 - считаем, что прошли все
+        if matched is None or matched < 0:
+            matched = len(params)
+        self.rotated += matched
+        # Строку успели изменить - ее уже записали основным ключом
+        self.skipped += len(params) - matched
+
+    def _throttle(self, probe_id: int):
+        started = time.perf_counter()
+        with self.session_factory() as db:
+            db.execute(select(Secret.password, Secret.key_id).where(Secret.id == probe_id)).first()
+        latency = time.perf_counter() - started
+        if self.read_latency:
+            latency = PROBE_SMOOTHING * latency + (1 - PROBE_SMOOTHING) * self.read_latency
+        self.read_latency = latency
+
+        if latency > self.read_budget:
+            self.batch_size = max(KEY_ROTATION_MIN_BATCH, self.batch_size // 2)
+            self.pause = min(KEY_ROTATION_MAX_PAUSE, max(self.pause * 2, 0.05))
+        else:
+            self.batch_size = min(KEY_ROTATION_MAX_BATCH, self.batch_size + KEY_ROTATION_MIN_BATCH)
+            self.pause = self.pause / 2 if self.pause > 0.01 else 0.0
+        if self.pause:
+            self._stop.wait(self.pause)
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+        # Прогресс ротации к другому ключу или алгоритму не годится
+        if state.get("key_id") != self.ring.primary_id or state.get("algorithm", FERNET) != self.ring.algorithm:
+            return
+        self.last_id = state["last_id"]
+        self.rotated = state.get("rotated", 0)
+        self.skipped = state.get("skipped", 0)
+        self.failed_ids = state.get("failed_ids", [])
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        state = {
+            "key_id": self.ring.primary_id,
+            "algorithm": self.ring.algorithm,
+            "last_id": self.last_id,
+            "rotated": self.rotated,
+            "skipped": self.skipped,
+            "failed_ids": self.failed_ids,
+        }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+key_rotation = KeyRotationJob()
+
+if __name__ == "__main__":
+    # Запуск отдельным процессом: python -m app.services.key_rotation
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    key_rotation.start()
+    try:
+        while key_rotation.running:
+            time.sleep(5)
+            logger.info("%s", json.dumps(key_rotation.progress()))
+    except KeyboardInterrupt:
+        key_rotation.stop()
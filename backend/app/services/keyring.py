@@ -0,0 +1,155 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.metrics import CIPHER_DURATION
+from app.services.ciphers import CIPHERS, FERNET, Cipher
+from app.timing import add_phase
+
+logger = logging.getLogger(__name__)
+
+# Ключи через запятую, первый - основной (им шифруются новые строки)
+FERNET_KEYS = os.getenv("FERNET_KEYS", "")
+# Прежняя переменная с одним ключом остается рабочей
+FERNET_KEY = os.getenv("FERNET_KEY", "")
+# Абсолютный путь к файлу ключей; если файла нет, он создается с новым ключом,
+# и все воркеры берут ключи из него, а не генерируют свои
+FERNET_KEY_FILE = os.getenv("FERNET_KEY_FILE", "")
+# Алгоритм для новых строк: aes-gcm или fernet. Старые строки читаются по своему тегу
+SECRET_CIPHER = os.getenv("SECRET_CIPHER", "aes-gcm")
+
+def key_id(key: bytes) -> str:
+    """Короткий отпечаток ключа; хранится в строке рядом с шифротекстом"""
+    return hashlib.sha256(key).hexdigest()[:12]
+
+class KeyRing:
+    """Набор ключей с идентификаторами и алгоритмом шифрования новых строк.
+
+    Шифрует основным ключом, расшифровывает ключом и алгоритмом, записанными
+    в строке. Строки без тега алгоритма - Fernet; строки без key_id (до
+    появления ротации) расшифровываются перебором всех ключей, как MultiFernet.
+    """
+
+    def __init__(self, keys: List[bytes], algorithm: str = SECRET_CIPHER):
+        if not keys:
+            raise ValueError("Key ring needs at least one key")
+        if algorithm not in CIPHERS:
+            raise ValueError(f"Unknown cipher {algorithm!r}, expected one of {sorted(CIPHERS)}")
+        self.keys = list(keys)
+        self.algorithm = algorithm
+        self._keys = OrderedDict((key_id(key), key) for key in self.keys)
+        self.primary_id = next(iter(self._keys))
+        self._ciphers: Dict[Tuple[str, str], Cipher] = {}
+        self._primary = self.cipher(algorithm, self.primary_id)
+        self._encrypt_seconds = CIPHER_DURATION.labels(algorithm, "encrypt")
+
+    @property
+    def key_ids(self) -> List[str]:
+        return list(self._keys)
+
+    def cipher(self, algorithm: str, token_key_id: str) -> Cipher:
+        cipher = self._ciphers.get((algorithm, token_key_id))
+        if cipher is None:
+            cipher = CIPHERS[algorithm](self._keys[token_key_id])
+            self._ciphers[(algorithm, token_key_id)] = cipher
+        return cipher
+
+    def encrypt(self, data: bytes) -> Tuple[str, str, bytes]:
+        """(алгоритм, key_id, токен) - все три пишутся в строку"""
+        started = time.perf_counter()
+        token = self._primary.encrypt(data)
+        elapsed = time.perf_counter() - started
+        self._encrypt_seconds.observe(elapsed)
+        add_phase("cipher", elapsed)
+        return self.algorithm, self.primary_id, token
+
+    def decrypt(self, token: bytes, token_key_id: Optional[str] = None,
+                algorithm: Optional[str] = None) -> bytes:
+        algorithm = algorithm or FERNET
+        started = time.perf_counter()
+        try:
+            if token_key_id in self._keys:
+                return self.cipher(algorithm, token_key_id).decrypt(token)
+            for candidate in self._keys:
+                try:
+                    return self.cipher(algorithm, candidate).decrypt(token)
+                except InvalidToken:
+                    pass
+            raise InvalidToken
+        finally:
+            elapsed = time.perf_counter() - started
+            CIPHER_DURATION.labels(algorithm, "decrypt").observe(elapsed)
+            add_phase("cipher", elapsed)
+
+    def is_current(self, token_key_id: Optional[str], algorithm: Optional[str]) -> bool:
+        return token_key_id == self.primary_id and (algorithm or FERNET) == self.algorithm
+
+    def rotate(self, token: bytes, token_key_id: Optional[str] = None,
+               algorithm: Optional[str] = None) -> Tuple[str, str, bytes]:
+        """Перешифровывает токен основным ключом и текущим алгоритмом"""
+        return self.encrypt(self.decrypt(token, token_key_id, algorithm))
+
+    @classmethod
+    def from_env(cls) -> "KeyRing":
+        if FERNET_KEYS:
+            return cls([key.strip().encode() for key in FERNET_KEYS.split(",") if key.strip()])
+        if FERNET_KEY:
+            return cls([FERNET_KEY.encode()])
+        if not FERNET_KEY_FILE:
+            # Без ключа шифровать нечем, а случайный ключ сделал бы данные нечитаемыми после рестарта
+            raise RuntimeError("No encryption key configured: set FERNET_KEYS, FERNET_KEY or FERNET_KEY_FILE")
+        if not os.path.isabs(FERNET_KEY_FILE):
+            # Относительный путь зависит от каталога запуска - ключ тихо создался бы заново
+            raise RuntimeError(f"FERNET_KEY_FILE must be an absolute path, got {FERNET_KEY_FILE!r}")
+        return cls(load_key_file(FERNET_KEY_FILE))
+
+def load_key_file(path: str) -> List[bytes]:
+    """Ключи из файла, по одному на строку. Файла нет - создает его с новым ключом.
+
+    Файл пишется во временный и подставляется через link: при одновременном
+    старте воркеров создаст его только один, остальные прочитают его ключ.
+    """
+    if not os.path.exists(path):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".fernet-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(Fernet.generate_key() + b"\n")
+            try:
+                os.link(tmp_path, path)
+                logger.warning("Generated new Fernet key in %s", path)
+            except FileExistsError:
+                pass
+        finally:
+            os.unlink(tmp_path)
+    with open(path, "rb") as f:
+        return [line.strip() for line in f if line.strip()]
+
+keyring = KeyRing.from_env()
+
+# Воркеры пула процессов для массового перешифрования
+_worker_ring: Optional[KeyRing] = None
+
+def init_rotation_worker(keys: List[bytes], algorithm: str):
+    global _worker_ring
+    _worker_ring = KeyRing(keys, algorithm)
+
+def rotate_rows(rows: List[Tuple[int, str, Optional[str], Optional[str]]],
+                ring: Optional[KeyRing] = None) -> List[tuple]:
+    """(id, токен, key_id, алгоритм) -> (id, старый токен, новый токен или None, key_id, алгоритм)"""
+    ring = ring or _worker_ring or keyring
+    result = []
+    for row_id, token, token_key_id, algorithm in rows:
+        try:
+            new_algorithm, new_key_id, new_token = ring.rotate(token.encode(), token_key_id, algorithm)
+            result.append((row_id, token, new_token.decode(), new_key_id, new_algorithm))
+        except InvalidToken:
+            # Ни один ключ не подходит - строку пропускаем, ее id попадет в отчет
+            result.append((row_id, token, None, token_key_id, algorithm))
+    return result
@@ -1,18 +1,127 @@
-import requests
+import asyncio
 import os
+import random
+import time
+from typing import Optional
+from urllib.parse import quote
+
+import httpx
+
+from app.metrics import OPENBAO_DURATION
+from app.timing import add_phase
 
 OPENBAO_URL = os.getenv("OPENBAO_URL", "http://openbao:5000")
+OPENBAO_CONNECT_TIMEOUT = float(os.getenv("OPENBAO_CONNECT_TIMEOUT", "2.0"))
+OPENBAO_READ_TIMEOUT = float(os.getenv("OPENBAO_READ_TIMEOUT", "5.0"))
+OPENBAO_MAX_CONNECTIONS = int(os.getenv("OPENBAO_MAX_CONNECTIONS", "50"))
+OPENBAO_MAX_CONCURRENCY = int(os.getenv("OPENBAO_MAX_CONCURRENCY", "50"))
+OPENBAO_RETRIES = int(os.getenv("OPENBAO_RETRIES", "2"))
+OPENBAO_BACKOFF = float(os.getenv("OPENBAO_BACKOFF", "0.1"))
+
+RETRY_STATUSES = {502, 503, 504}
 
 class OpenBaoService:
-    @staticmethod
-    def get_secret(secret_name: str):
-        response = requests.get(f"{OPENBAO_URL}/secrets/{secret_name}")
-        if response.status_code == 200:
+    # Один пул keep-alive соединений и один семафор на процесс
+    _client: Optional[httpx.AsyncClient] = None
+    _semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                base_url=OPENBAO_URL,
+                timeout=httpx.Timeout(
+                    OPENBAO_READ_TIMEOUT,
+                    connect=OPENBAO_CONNECT_TIMEOUT,
+                    pool=OPENBAO_CONNECT_TIMEOUT,
+                ),
+                limits=httpx.Limits(
+                    max_connections=OPENBAO_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENBAO_MAX_CONNECTIONS,
+                ),
+            )
+            cls._semaphore = asyncio.Semaphore(OPENBAO_MAX_CONCURRENCY)
+        return cls._client
+
+    @classmethod
+    async def close(cls):
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @classmethod
+    async def _request(cls, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        response = await cls._request_with_retries(method, path, **kwargs)
+        status = str(response.status_code) if response is not None else "error"
+        elapsed = time.perf_counter() - started
+        OPENBAO_DURATION.labels(method, status).observe(elapsed)
+        add_phase("openbao", elapsed)
+        return response
+
+    @classmethod
+    async def _request_with_retries(cls, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        client = cls._get_client()
+        for attempt in range(OPENBAO_RETRIES + 1):
+            try:
+                async with cls._semaphore:
+                    response = await client.request(method, path, **kwargs)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+            except httpx.TransportError:
+                if attempt == OPENBAO_RETRIES:
+                    return None
+            if attempt == OPENBAO_RETRIES:
+                return response
+            # Экспоненциальная пауза с full jitter, чтобы воркеры не били OpenBao синхронно
+            await asyncio.sleep(random.uniform(0, OPENBAO_BACKOFF * 2 ** attempt))
+        return None
+
+    @classmethod
+    async def get_secret(cls, secret_name: str):
+        # Имя - один сегмент пути: "/", "?" и "#" экранируются, а "." и ".." httpx
+        # схлопнул бы в другой путь OpenBao
+        if secret_name in ("", ".", ".."):
+            return None
+        response = await cls._request("GET", f"/secrets/{quote(secret_name, safe='')}")
+        if response is not None and response.status_code == 200:
             return response.json()
         return None
 
-    @staticmethod
-    def save_secret(secret_name: str, username: str, password: str, host: str = ""):
+    @classmethod
+    async def save_secret(cls, secret_name: str, username: str, password: str, host: str = ""):
         data = {"name": secret_name, "username": username, "password": password, "host": host}
-        response = requests.post(f"{OPENBAO_URL}/secrets/", json=data)
-        return response.status_code == 200
+        response = await cls._request("POST", "/secrets/", json=data)
+        return response is not None and response.status_code == 200
+
+class OpenBaoMirror:
+    """Зеркалирование пачки секретов в OpenBao через ограниченную очередь."""
+
+    def __init__(self, concurrency: int, on_failure=None):
+        # Очередь ограничена: если OpenBao медленный, производитель ждет, а не копит память
+        self._queue = asyncio.Queue(maxsize=concurrency * 4)
+        self._on_failure = on_failure
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(concurrency)]
+        self.saved = 0
+        self.failed = 0
+
+    async def put(self, key, secret_name: str, username: str, password: str, host: str = ""):
+        await self._queue.put((key, secret_name, username, password, host))
+
+    async def close(self):
+        for _ in self._workers:
+            await self._queue.put(None)
+        await asyncio.gather(*self._workers)
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            key, secret_name, username, password, host = item
+            if await OpenBaoService.save_secret(secret_name, username, password, host):
+                self.saved += 1
+            else:
+                self.failed += 1
+                if self._on_failure is not None:
+                    self._on_failure(key, secret_name)
@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+SECRET_CACHE_ENABLED = os.getenv("SECRET_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+SECRET_CACHE_MAX_ENTRIES = int(os.getenv("SECRET_CACHE_MAX_ENTRIES", "1000"))
+SECRET_CACHE_TTL = float(os.getenv("SECRET_CACHE_TTL", "30"))
+
+class CachedSecret:
+    __slots__ = ("version", "expires_at", "fields", "password")
+
+    def __init__(self, version: int, expires_at: float, fields: dict, password: bytearray):
+        self.version = version
+        self.expires_at = expires_at
+        self.fields = fields
+        self.password = password
+
+    def wipe(self):
+        # Пароль хранится в bytearray, чтобы его можно было затереть на месте
+        self.password[:] = bytes(len(self.password))
+
+class SecretCache:
+    """LRU-кэш расшифрованных секретов с TTL, ключ - имя и версия строки."""
+
+    def __init__(self, enabled: bool, max_entries: int, ttl: float):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name: str, version: Optional[int] = None) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and (
+                entry.expires_at <= time.monotonic()
+                or (version is not None and entry.version != version)
+            ):
+                self._evict(name)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self.hits += 1
+            return dict(entry.fields, password=entry.password.decode())
+
+    def put(self, name: str, version: int, payload: dict):
+        if not self.enabled:
+            return
+        fields = {key: value for key, value in payload.items() if key != "password"}
+        entry = CachedSecret(
+            version,
+            time.monotonic() + self.ttl,
+            fields,
+            bytearray(payload["password"].encode()),
+        )
+        with self._lock:
+            if name in self._entries:
+                self._remove(name)
+            self._entries[name] = entry
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def invalidate(self, name: str):
+        with self._lock:
+            if name in self._entries:
+                self._remove(name)
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._entries):
+                self._remove(name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, name: str):
+        self._entries.pop(name).wipe()
+
+    def _evict(self, name: str):
+        self._remove(name)
+        self.evictions += 1
+
+secret_cache = SecretCache(SECRET_CACHE_ENABLED, SECRET_CACHE_MAX_ENTRIES, SECRET_CACHE_TTL)
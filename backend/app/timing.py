@@ -0,0 +1,119 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Фазы текущего запроса: имя -> [секунды, вызовы]. None - запрос не замеряется
+_phases: ContextVar[Optional[Dict[str, List]]] = ContextVar("request_phases", default=None)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000
+
+# Модули, в которых стоят на ожидании свободные потоки (Condition.wait, воркеры пулов)
+IDLE_MODULES = {"threading.py", "thread.py", "queue.py"}
+
+def add_phase(name: str, seconds: float):
+    """Добавляет время к фазе текущего запроса; вне замеряемого запроса ничего не делает"""
+    phases = _phases.get()
+    if phases is None:
+        return
+    entry = phases.get(name)
+    if entry is None:
+        phases[name] = [seconds, 1]
+    else:
+        entry[0] += seconds
+        entry[1] += 1
+
+@contextmanager
+def phase(name: str):
+    if _phases.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(name, time.perf_counter() - started)
+
+def start_phases() -> Tuple[Token, Dict[str, List]]:
+    phases = {}
+    return _phases.set(phases), phases
+
+def finish_phases(token: Token):
+    _phases.reset(token)
+
+def server_timing(phases: Dict[str, List], total: float) -> str:
+    """Значение заголовка Server-Timing; app - время вне замеренных фаз"""
+    parts = [f'{name};desc="{count} calls";dur={seconds * 1000:.2f}'
+             for name, (seconds, count) in phases.items()]
+    measured = sum(seconds for seconds, _ in phases.values())
+    parts.append(f"app;dur={max(total - measured, 0) * 1000:.2f}")
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+class StackSampler:
+    """Сэмплирующий профилировщик: раз в interval снимает стеки всех потоков
+    через sys._current_frames() и копит их в folded-формате для flamegraph.pl
+    и speedscope.
+
+    Потоки, простаивающие в ожидании работы (свободные воркеры пулов), пропускаются;
+    поток цикла событий пишется всегда - ожидание ввода-вывода тоже время запроса.
+    Профилировать одновременно можно только один запрос: стеки общие на процесс.
+    """
+
+    _busy = threading.Lock()
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread = threading.get_ident()
+
+    def start(self) -> bool:
+        if not self._busy.acquire(blocking=False):
+            return False
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._busy.release()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident != self._loop_thread and os.path.basename(frame.f_code.co_filename) in IDLE_MODULES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def save(self, label: str, directory: str = PROFILE_DIR) -> str:
+        """Пишет стеки в <directory>/<время>-<label>.folded и возвращает имя файла"""
+        os.makedirs(directory, exist_ok=True)
+        safe_label = "".join(ch if ch.isalnum() else "_" for ch in label).strip("_")[:80]
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{safe_label}.folded"
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(self.folded())
+        return name
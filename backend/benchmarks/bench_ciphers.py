@@ -0,0 +1,57 @@
+"""Fernet против AES-GCM: операций в секунду и размер шифротекста.
+
+Размер - то, что ложится в колонку secrets.password (токен в base64).
+Ключ один и тот же: AES-GCM выводит свой ключ из ключа кольца через HKDF.
+
+Запуск из каталога backend:
+    python benchmarks/bench_ciphers.py [--sizes 32,256,4096,65536] [--seconds 0.5]
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from cryptography.fernet import Fernet  # noqa: E402
+
+from app.services.ciphers import CIPHERS  # noqa: E402
+
+
+def ops_per_second(fn, arg, seconds):
+    # Пачками по 100 вызовов, чтобы не мерить perf_counter
+    calls = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while True:
+        for _ in range(100):
+            fn(arg)
+        calls += 100
+        now = time.perf_counter()
+        if now >= deadline:
+            return calls / (now - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="32,256,4096,65536")
+    parser.add_argument("--seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    key = Fernet.generate_key()
+    ciphers = {name: factory(key) for name, factory in CIPHERS.items()}
+    print(f"{'cipher':<8} {'payload':>8} {'encrypt/s':>11} {'decrypt/s':>11} {'stored':>8} {'overhead':>9}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        payload = os.urandom(size)
+        for name, cipher in ciphers.items():
+            token = cipher.encrypt(payload)
+            assert cipher.decrypt(token) == payload
+            encrypt = ops_per_second(cipher.encrypt, payload, args.seconds)
+            decrypt = ops_per_second(cipher.decrypt, token, args.seconds)
+            print(f"{name:<8} {size:>8} {encrypt:>11.0f} {decrypt:>11.0f} {len(token):>8} "
+                  f"{len(token) / size - 1:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Ротация ключа на N секретах: скорость перешифрования и латентность чтения.
+
+Секреты создаются под старым ключом (без key_id, как до кольца ключей),
+затем KeyRotationJob переводит их на новый ключ. Параллельно поток чтения
+достает случайные секреты и расшифровывает их, как GET /api/secrets/{name}.
+Сравниваются чтение без ротации, ротация без ограничения и ротация с
+бюджетом латентности.
+
+Запуск из каталога backend:
+    python benchmarks/bench_key_rotation.py [--rows 20000] [--workers 1] [--budget-ms 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BENCH_DIR = tempfile.mkdtemp(prefix="bench-rotation-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(BENCH_DIR, 'secrets.db')}"
+os.environ["FERNET_KEY_FILE"] = os.path.join(BENCH_DIR, "fernet.keys")
+
+from cryptography.fernet import Fernet  # noqa: E402
+from sqlalchemy import insert, select, update  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.secret import Secret  # noqa: E402
+from app.services.key_rotation import KeyRotationJob  # noqa: E402
+from app.services.keyring import KeyRing  # noqa: E402
+
+OLD_KEY = Fernet.generate_key()
+NEW_KEY = Fernet.generate_key()
+RING = KeyRing([NEW_KEY, OLD_KEY])
+
+
+def seed(rows):
+    Base.metadata.create_all(bind=engine)
+    old = Fernet(OLD_KEY)
+    with SessionLocal() as session:
+        session.execute(insert(Secret), [
+            {"name": f"svc-{i:06d}", "description": "bench", "type": "database",
+             "username": "user", "password": old.encrypt(b"p" * 32).decode(), "host": "db.local"}
+            for i in range(rows)
+        ])
+        session.commit()
+
+
+def reset():
+    # Все строки снова под старым ключом: пароль расшифруется перебором ключей
+    old_token = Fernet(OLD_KEY).encrypt(b"p" * 32).decode()
+    with SessionLocal() as session:
+        session.execute(update(Secret).values(password=old_token, key_id=None, algorithm=None))
+        session.commit()
+
+
+class Reader(threading.Thread):
+    def __init__(self, rows, interval=0.002):
+        super().__init__(daemon=True)
+        self.rows = rows
+        self.interval = interval
+        self.timings = []
+        self.done = threading.Event()
+
+    def run(self):
+        rng = random.Random(1)
+        while not self.done.is_set():
+            secret_id = rng.randint(1, self.rows)
+            started = time.perf_counter()
+            with SessionLocal() as session:
+                secret = session.execute(select(Secret).where(Secret.id == secret_id)).scalar_one()
+                RING.decrypt(secret.password.encode(), secret.key_id, secret.algorithm)
+            self.timings.append((time.perf_counter() - started) * 1000)
+            time.sleep(self.interval)
+
+
+def report(label, reader, elapsed=None, job=None):
+    timings = sorted(reader.timings)
+    line = (f"{label:<22} чтение p50 {statistics.median(timings):6.2f} мс  "
+            f"p99 {timings[int(len(timings) * 0.99)]:7.2f} мс")
+    if job is not None:
+        progress = job.progress()
+        line += f"  {progress['rotated']} строк за {elapsed:.1f} с ({progress['rotated'] / elapsed:.0f}/с)"
+    print(line)
+
+
+def rotate(label, rows, **options):
+    reset()
+    job = KeyRotationJob(RING, checkpoint_path=None, **options)
+    reader = Reader(rows)
+    reader.start()
+    started = time.perf_counter()
+    job.run()
+    elapsed = time.perf_counter() - started
+    reader.done.set()
+    reader.join()
+    assert job.status == "completed" and job.rotated == rows, job.progress()
+    report(label, reader, elapsed, job)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--budget-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    seed(args.rows)
+
+    reader = Reader(args.rows)
+    reader.start()
+    time.sleep(2)
+    reader.done.set()
+    reader.join()
+    report("без ротации", reader)
+
+    rotate("ротация без бюджета", args.rows, workers=args.workers, read_budget_ms=float("inf"),
+           batch_size=5000)
+    rotate(f"бюджет {args.budget_ms:g} мс", args.rows, workers=args.workers, read_budget_ms=args.budget_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Пропускная способность клиента OpenBao против локальной заглушки.
+
+Сравнивает прежний вариант (requests.get без Session в пуле потоков) и
+асинхронный OpenBaoService с пулом keep-alive соединений.
+
+Запуск из каталога backend:
+    python benchmarks/bench_openbao_client.py [--requests 5000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_openbao import start_stub  # noqa: E402
+
+STUB_PORT = int(os.getenv("STUB_PORT", "18200"))
+STUB_URL = f"http://127.0.0.1:{STUB_PORT}"
+os.environ["OPENBAO_URL"] = STUB_URL
+
+import requests  # noqa: E402
+
+from app.services.openbao_service import OpenBaoService  # noqa: E402
+
+NAMES = [f"svc-{i}" for i in range(100)]
+
+
+def run_stub(latency):
+    # Заглушка в отдельном процессе, чтобы не делить GIL с измеряемым клиентом
+    server, _ = start_stub(STUB_PORT, latency)
+    for name in NAMES:
+        server.secrets[name] = {"name": name, "username": "u", "password": "p", "host": ""}
+    threading.Event().wait()
+
+
+def bench_legacy(total, concurrency):
+    def fetch(i):
+        response = requests.get(f"{STUB_URL}/secrets/{NAMES[i % len(NAMES)]}")
+        return response.status_code == 200
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        ok = sum(pool.map(fetch, range(total)))
+    return ok, time.perf_counter() - started
+
+
+async def bench_async(total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(i):
+        async with semaphore:
+            return await OpenBaoService.get_secret(NAMES[i % len(NAMES)]) is not None
+
+    await OpenBaoService.get_secret(NAMES[0])  # прогрев пула
+    started = time.perf_counter()
+    results = await asyncio.gather(*(fetch(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    await OpenBaoService.close()
+    return sum(results), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stub = multiprocessing.Process(target=run_stub, args=(args.latency_ms / 1000,), daemon=True)
+    stub.start()
+    for _ in range(100):
+        try:
+            requests.get(f"{STUB_URL}/secrets/{NAMES[0]}", timeout=1)
+            break
+        except requests.ConnectionError:
+            time.sleep(0.05)
+
+    ok, elapsed = bench_legacy(args.requests, args.concurrency)
+    print(f"requests.get, no session : {args.requests / elapsed:8.0f} req/s ({ok} ok)")
+    ok, elapsed = asyncio.run(bench_async(args.requests, args.concurrency))
+    print(f"OpenBaoService (async)   : {args.requests / elapsed:8.0f} req/s ({ok} ok)")
+    stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Латентность чтения GET /api/secrets/{name} с кэшем расшифровки и без.
+
+Запуск из каталога backend:
+    python benchmarks/bench_secret_cache.py [--reads 20000] [--hot 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bench-cache-"), "secrets.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["FERNET_KEY_FILE"] = os.path.join(os.path.dirname(DB_PATH), "fernet.keys")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.api.secrets import get_secret  # noqa: E402
+from app.database import AsyncSessionLocal, Base, SessionLocal, engine  # noqa: E402
+from app.models.secret import Secret  # noqa: E402
+from app.services.keyring import keyring  # noqa: E402
+from app.services.secret_cache import secret_cache  # noqa: E402
+
+ROWS = 10_000
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    algorithm, key_id, token = keyring.encrypt(b"p" * 32)
+    with SessionLocal() as session:
+        session.execute(insert(Secret), [
+            {"name": f"svc-{i:06d}", "description": "bench", "type": "database",
+             "username": "user", "password": token.decode(), "key_id": key_id, "algorithm": algorithm,
+             "host": "db.local"}
+            for i in range(ROWS)
+        ])
+        session.commit()
+
+
+async def measure(reads, hot):
+    names = [f"svc-{i:06d}" for i in range(hot)]
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(reads):
+            name = random.choice(names)
+            started = time.perf_counter()
+            await get_secret(name, db=db)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+            db.expunge_all()
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reads", type=int, default=20000)
+    parser.add_argument("--hot", type=int, default=50)
+    args = parser.parse_args()
+    seed()
+
+    for enabled in (False, True):
+        secret_cache.enabled = enabled
+        secret_cache.clear()
+        p50, p99 = asyncio.run(measure(args.reads, args.hot))
+        label = "cache on " if enabled else "cache off"
+        print(f"{label}: p50 {p50:8.1f} us  p99 {p99:8.1f} us  {secret_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
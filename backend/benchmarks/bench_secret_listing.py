@@ -0,0 +1,100 @@
+"""Латентность GET /api/secrets на SQLite при росте таблицы.
+
+Запуск из каталога backend:
+    python benchmarks/bench_secret_listing.py [--sizes 1000,10000,100000,1000000]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix="bench-secrets-")
+DB_PATH = os.path.join(WORK_DIR, "secrets.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("FERNET_KEY_FILE", os.path.join(WORK_DIR, "fernet.keys"))
+
+from fastapi import Request, Response  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import AsyncSessionLocal, Base, SessionLocal, engine  # noqa: E402
+from app.models.secret import Secret  # noqa: E402
+from app.api.secrets import get_secrets  # noqa: E402
+
+TYPES = ("database", "api", "ssh")
+BATCH = 10_000
+
+
+def fill(session, start, stop):
+    for offset in range(start, stop, BATCH):
+        rows = [
+            {
+                "name": f"svc-{i:08d}",
+                "description": f"secret {i}",
+                "type": TYPES[i % len(TYPES)],
+                "username": "user",
+                "password": "x" * 100,
+                "host": "db.local",
+            }
+            for i in range(offset, min(offset + BATCH, stop))
+        ]
+        session.execute(insert(Secret), rows)
+        session.commit()
+
+
+async def measure(session, runs, **params):
+    params.setdefault("limit", 50)
+    params.setdefault("cursor", None)
+    params.setdefault("secret_type", None)
+    params.setdefault("prefix", None)
+    # Без If-None-Match: каждый прогон проходит весь путь до выборки страницы
+    request = Request({"type": "http", "method": "GET", "path": "/api/secrets/", "headers": []})
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await get_secrets(request=request, response=Response(), db=session, **params)
+        timings.append((time.perf_counter() - started) * 1000)
+        session.expunge_all()
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return p50, p99
+
+
+async def run(sizes, runs):
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    reader = AsyncSessionLocal()
+    filled = 0
+    print(f"{'rows':>9} {'scenario':<14} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in sizes:
+        fill(session, filled, size)
+        filled = size
+        scenarios = {
+            "first page": {},
+            "deep cursor": {"cursor": f"svc-{size * 9 // 10:08d}"},
+            "type filter": {"secret_type": "api"},
+            "name prefix": {"prefix": f"svc-{size // 2:08d}"[:-2]},
+        }
+        for label, params in scenarios.items():
+            p50, p99 = await measure(reader, runs, **params)
+            print(f"{size:>9} {label:<14} {p50:>8.3f} {p99:>8.3f}")
+    session.close()
+    await reader.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--runs", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(sorted(int(size) for size in args.sizes.split(",")), args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Стоимость AuthService.validate_token против локального фейкового IdP.
+
+Сценарии: без кэша (каждый вызов - userinfo), с кэшем токенов, локальная
+проверка JWT по JWKS.
+
+Запуск из каталога backend:
+    python benchmarks/bench_token_cache.py [--calls 5000] [--tokens 200] [--latency-ms 2]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_idp import issue_keypair, issue_token, start_idp  # noqa: E402
+
+IDP_PORT = int(os.getenv("IDP_PORT", "18400"))
+os.environ["KEYCLOAK_URL"] = f"http://127.0.0.1:{IDP_PORT}"
+
+import requests  # noqa: E402
+
+from app.services import auth_service  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+
+
+def run_idp(public_pem, latency):
+    # IdP в отдельном процессе, чтобы не делить GIL с измеряемым клиентом
+    start_idp(public_pem, IDP_PORT, latency)
+    threading.Event().wait()
+
+
+def run(tokens, calls, mode, cached):
+    auth_service.AUTH_VERIFY_MODE = mode
+    AuthService.cache.clear()
+    AuthService.cache.hits = AuthService.cache.misses = 0
+    started = time.perf_counter()
+    for _ in range(calls):
+        if not cached:
+            AuthService.cache.clear()
+        assert AuthService.validate_token(random.choice(tokens)) is not None
+    elapsed = time.perf_counter() - started
+    stats = AuthService.cache.stats()
+    return elapsed / calls * 1_000_000, stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    private_pem, public_pem = issue_keypair()
+    idp = multiprocessing.Process(target=run_idp, args=(public_pem, args.latency_ms / 1000), daemon=True)
+    idp.start()
+    for _ in range(100):
+        try:
+            requests.get(auth_service.JWKS_URL, timeout=1)
+            break
+        except requests.ConnectionError:
+            time.sleep(0.05)
+
+    tokens = [issue_token(private_pem, f"user-{i}", auth_service.AUTH_ISSUER) for i in range(args.tokens)]
+    # Как на старте приложения с AUTH_VERIFY_MODE=jwks
+    AuthService.jwks.start()
+    scenarios = [
+        ("userinfo, no cache", "userinfo", False),
+        ("userinfo + cache", "userinfo", True),
+        ("jwks, no cache", "jwks", False),
+        ("jwks + cache", "jwks", True),
+    ]
+    for label, mode, cached in scenarios:
+        per_call, stats = run(tokens, args.calls, mode, cached)
+        print(f"{label:<20} {per_call:10.1f} us/call  hits={stats['hits']} misses={stats['misses']}")
+    idp.terminate()
+
+
+if __name__ == "__main__":
+    main()
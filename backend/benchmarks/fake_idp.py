@@ -0,0 +1,81 @@
+"""Локальный фейковый Keycloak: userinfo и JWKS для одного realm.
+
+Токены подписываются RSA-ключом, который генерирует issue_keypair(); тот же
+PEM передается серверу, чтобы userinfo и JWKS сходились с выданными токенами.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt, JWTError
+
+KID = "bench-key"
+REALM_PATH = "/realms/master/protocol/openid-connect"
+
+
+def issue_keypair():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    return private_pem, public_pem
+
+
+def issue_token(private_pem: str, subject: str, issuer: str, ttl: int = 300) -> str:
+    now = int(time.time())
+    claims = {"sub": subject, "preferred_username": subject, "iss": issuer, "iat": now, "exp": now + ttl}
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": KID})
+
+
+class FakeIdPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        if self.path == f"{REALM_PATH}/certs":
+            self._reply(200, {"keys": [self.server.jwk]})
+        elif self.path == f"{REALM_PATH}/userinfo":
+            token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+            try:
+                claims = jwt.decode(token, self.server.public_pem, algorithms=["RS256"])
+            except JWTError:
+                self._reply(401, {"error": "invalid_token"})
+                return
+            self._reply(200, {"sub": claims["sub"], "preferred_username": claims["preferred_username"]})
+        else:
+            self._reply(404, {"error": "not_found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeIdPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def start_idp(public_pem: str, port: int = 0, latency: float = 0.0):
+    server = FakeIdPServer(("127.0.0.1", port), FakeIdPHandler)
+    server.public_pem = public_pem
+    server.jwk = dict(jwk.construct(public_pem, "RS256").to_dict(), kid=KID, alg="RS256", use="sig")
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,126 @@
+"""Нагрузочный тест: синхронный и асинхронный доступ к БД при 200 клиентах.
+
+Сервер (uvicorn) поднимается в отдельном процессе. Асинхронный путь - это
+боевой GET /api/secrets на AsyncSession; для сравнения к тому же приложению
+добавляется GET /bench/sync-secrets - тот же запрос через синхронную Session
+в пуле потоков FastAPI.
+
+Запуск из каталога backend (по умолчанию SQLite во временном каталоге,
+для Postgres передайте DATABASE_URL):
+    python benchmarks/loadtest_db.py [--clients 200] [--duration 10]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+if "DATABASE_URL" not in os.environ:
+    db_dir = tempfile.mkdtemp(prefix="loadtest-db-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'secrets.db')}"
+    os.environ.setdefault("FERNET_KEY_FILE", os.path.join(db_dir, "fernet.keys"))
+
+import httpx  # noqa: E402
+
+PORT = int(os.getenv("LOADTEST_PORT", "18500"))
+BASE_URL = f"http://127.0.0.1:{PORT}"
+ROWS = 1000
+
+
+def seed():
+    from sqlalchemy import func, insert, select
+
+    from app.database import Base, SessionLocal, engine
+    from app.models.secret import Secret
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        if session.execute(select(func.count()).select_from(Secret)).scalar():
+            return
+        session.execute(insert(Secret), [
+            {"name": f"svc-{i:06d}", "description": "loadtest", "type": "database",
+             "username": "user", "password": "x" * 100, "host": "db.local"}
+            for i in range(ROWS)
+        ])
+        session.commit()
+
+
+def serve():
+    import uvicorn
+    from fastapi import Depends
+    from sqlalchemy import select
+
+    from app.database import get_sync_db
+    from app.main import app
+    from app.models.secret import Secret
+
+    @app.get("/bench/sync-secrets")
+    def sync_secrets(db=Depends(get_sync_db)):
+        rows = db.execute(select(Secret).order_by(Secret.name).limit(50)).scalars().all()
+        return {"items": [{"id": row.id, "name": row.name} for row in rows]}
+
+    uvicorn.run(app, host="127.0.0.1", port=PORT, log_level="warning")
+
+
+async def hammer(path, clients, duration):
+    completed = 0
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=30) as client:
+        async def worker():
+            nonlocal completed, errors
+            while time.perf_counter() < deadline:
+                try:
+                    response = await client.get(path)
+                    if response.status_code == 200:
+                        completed += 1
+                    else:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+    return completed / elapsed, errors
+
+
+async def wait_for_server():
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        for _ in range(100):
+            try:
+                await client.get("/health")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    seed()
+    server = multiprocessing.Process(target=serve, daemon=True)
+    server.start()
+    try:
+        asyncio.run(wait_for_server())
+        for label, path in (("sync Session", "/bench/sync-secrets"),
+                            ("AsyncSession", "/api/secrets/?limit=50")):
+            rps, errors = asyncio.run(hammer(path, args.clients, args.duration))
+            print(f"{label:<13} {args.clients} clients: {rps:8.1f} req/s, {errors} errors")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Локальная заглушка OpenBao для бенчмарков без сети.
+
+Повторяет контракт, который использует OpenBaoService:
+    GET  /secrets/{name} -> 200 + JSON или 404
+    POST /secrets/       -> 200
+
+Запуск отдельно: python benchmarks/stub_openbao.py --port 5000 --latency-ms 2
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubOpenBaoHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1, чтобы клиент мог держать keep-alive соединения
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        name = self.path.rstrip("/").rsplit("/", 1)[-1]
+        secret = self.server.secrets.get(name)
+        if secret is None:
+            self._reply(404, {"detail": "not found"})
+        else:
+            self._reply(200, secret)
+
+    def do_POST(self):
+        time.sleep(self.server.latency)
+        length = int(self.headers.get("Content-Length", 0))
+        secret = json.loads(self.rfile.read(length))
+        self.server.secrets[secret["name"]] = secret
+        self._reply(200, {"status": "ok"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubOpenBaoServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def start_stub(port: int = 0, latency: float = 0.0):
+    server = StubOpenBaoServer(("127.0.0.1", port), StubOpenBaoHandler)
+    server.secrets = {}
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server, url = start_stub(args.port, args.latency_ms / 1000)
+    print(f"Stub OpenBao listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
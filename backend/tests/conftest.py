@@ -0,0 +1,121 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+import pytest
+from cryptography.fernet import Fernet
+
+# Окружение задается до импорта app: движки, кольцо ключей и кэш читают его при импорте
+TEST_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'secrets.db')}"
+os.environ["FERNET_KEYS"] = Fernet.generate_key().decode()
+os.environ.pop("ADMIN_TOKEN", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.request import AccessRequest  # noqa: E402
+from app.models.revision import CollectionRevision  # noqa: E402
+from app.models.secret import Secret  # noqa: E402
+from app.services.openbao_service import OpenBaoService  # noqa: E402
+from app.services.secret_cache import secret_cache  # noqa: E402
+
+
+class FakeOpenBao:
+    """OpenBao в памяти: что сохранено, то и читается; имена из fail_names не сохраняются"""
+
+    def __init__(self):
+        self.secrets = {}
+        self.fail_names = set()
+        self.delay = 0.0
+
+    async def save_secret(self, secret_name, username, password, host=""):
+        await asyncio.sleep(self.delay)
+        if secret_name in self.fail_names:
+            return False
+        self.secrets[secret_name] = {"username": username, "password": password, "host": host}
+        return True
+
+    async def get_secret(self, secret_name):
+        return self.secrets.get(secret_name)
+
+
+class MockOpenBaoHTTP:
+    """Обработчик для httpx.MockTransport: запоминает запросы, отвечает функцией handler"""
+
+    def __init__(self):
+        self.requests = []
+        self.handler = lambda request: httpx.Response(404)
+
+    def __call__(self, request):
+        self.requests.append(request)
+        return self.handler(request)
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    with SessionLocal() as db:
+        for model in (Secret, AccessRequest, CollectionRevision):
+            db.execute(delete(model))
+        db.commit()
+    secret_cache.clear()
+    yield
+    secret_cache.clear()
+
+
+@pytest.fixture
+def openbao(monkeypatch):
+    fake = FakeOpenBao()
+    monkeypatch.setattr(OpenBaoService, "save_secret", fake.save_secret)
+    monkeypatch.setattr(OpenBaoService, "get_secret", fake.get_secret)
+    return fake
+
+
+@pytest.fixture
+def openbao_http(monkeypatch):
+    """Настоящий OpenBaoService поверх MockTransport вместо сети"""
+    mock = MockOpenBaoHTTP()
+    transport_client = httpx.AsyncClient(base_url="http://openbao", transport=httpx.MockTransport(mock))
+    monkeypatch.setattr(OpenBaoService, "_client", transport_client)
+    monkeypatch.setattr(OpenBaoService, "_semaphore", asyncio.Semaphore(4))
+    return mock
+
+
+@pytest.fixture
+def client(openbao):
+    # Без with: startup/shutdown приложения (потоки метрик, закрытие клиентов) тестам не нужны
+    return TestClient(app)
+
+
+@pytest.fixture
+def create_secret(client):
+    def create(name, password="pw", type="database", description="test secret"):
+        response = client.post("/api/secrets/", json={
+            "name": name,
+            "description": description,
+            "type": type,
+            "username": "user",
+            "password": password,
+            "host": "db.local",
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["secret_id"]
+    return create
+
+
+@pytest.fixture
+def create_request(client):
+    def create(secret_name, user_id="alice"):
+        response = client.post("/api/requests/", json={
+            "user_id": user_id,
+            "secret_name": secret_name,
+            "description": "need access",
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+    return create
@@ -0,0 +1,128 @@
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.services import auth_service
+from app.services.auth_service import AUTH_ISSUER, AuthService, JWKSCache, TokenCache
+
+
+def keypair(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    public_jwk = dict(jwk.construct(public_pem, "RS256").to_dict(), kid=kid, alg="RS256", use="sig")
+    return private_pem, public_jwk
+
+
+OLD_PRIVATE, OLD_JWK = keypair("old")
+NEW_PRIVATE, NEW_JWK = keypair("new")
+
+
+def issue(private_pem, kid, issuer=AUTH_ISSUER, ttl=300, subject="alice"):
+    claims = {"sub": subject, "iss": issuer, "iat": int(time.time()), "exp": int(time.time()) + ttl}
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+class FakeJWKSResponse:
+    status_code = 200
+
+    def __init__(self, keys):
+        self._keys = keys
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"keys": list(self._keys)}
+
+
+@pytest.fixture
+def idp(monkeypatch):
+    """JWKS-эндпоинт в памяти: keys можно менять, fetches считает загрузки"""
+    state = {"keys": [OLD_JWK], "fetches": 0}
+
+    def get(url, timeout=None):
+        state["fetches"] += 1
+        return FakeJWKSResponse(state["keys"])
+
+    monkeypatch.setattr(auth_service.requests, "get", get)
+    monkeypatch.setattr(auth_service, "AUTH_VERIFY_MODE", "jwks")
+    monkeypatch.setattr(AuthService, "jwks", JWKSCache(url="http://idp/certs"))
+    monkeypatch.setattr(AuthService, "cache", TokenCache())
+    return state
+
+
+def test_cache_entry_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth_service.time, "time", lambda: now[0])
+    cache = TokenCache(ttl=60)
+    cache.put("token", {"sub": "alice"})
+    assert cache.get("token") == {"sub": "alice"}
+    now[0] += 61
+    assert cache.get("token") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+
+def test_cache_ttl_never_outlives_token_exp(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth_service.time, "time", lambda: now[0])
+    cache = TokenCache(ttl=60)
+    cache.put("short", {"sub": "alice", "exp": 1010})
+    cache.put("expired", {"sub": "bob", "exp": 999})
+    now[0] += 11
+    assert cache.get("short") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TokenCache(max_size=2, ttl=60)
+    cache.put("a", {"sub": "a"})
+    cache.put("b", {"sub": "b"})
+    cache.get("a")
+    cache.put("c", {"sub": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"sub": "a"}
+
+
+def test_start_prefetches_keys(idp):
+    AuthService.jwks.refresh_interval = 3600
+    AuthService.jwks.start()
+    assert idp["fetches"] == 1
+    assert AuthService.validate_token(issue(OLD_PRIVATE, "old"))["sub"] == "alice"
+    assert idp["fetches"] == 1
+
+
+def test_valid_token_is_verified_once_and_cached(idp):
+    token = issue(OLD_PRIVATE, "old")
+    assert AuthService.validate_token(token)["sub"] == "alice"
+    assert AuthService.validate_token(token)["sub"] == "alice"
+    assert AuthService.cache.stats()["hits"] == 1
+
+
+def test_rejects_token_from_another_issuer(idp):
+    assert AuthService.validate_token(issue(OLD_PRIVATE, "old", issuer="http://evil/realms/master")) is None
+    assert AuthService.cache.stats()["size"] == 0
+
+
+def test_rejects_token_signed_by_unknown_key(idp):
+    # kid совпадает с известным ключом, подпись - чужим
+    assert AuthService.validate_token(issue(NEW_PRIVATE, "old")) is None
+
+
+def test_unknown_kid_refreshes_keys_after_rotation(idp):
+    AuthService.jwks.refresh()
+    idp["keys"] = [NEW_JWK, OLD_JWK]
+    # Ключи загружены только что: неизвестный kid не дергает IdP чаще раза в 30 с
+    assert AuthService.validate_token(issue(NEW_PRIVATE, "new")) is None
+    assert idp["fetches"] == 1
+
+    AuthService.jwks._fetched_at -= 31
+    assert AuthService.validate_token(issue(NEW_PRIVATE, "new", subject="bob"))["sub"] == "bob"
+    assert idp["fetches"] == 2
@@ -0,0 +1,69 @@
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.main import app
+from app.models.secret import Secret
+
+
+def batch_get(client, names):
+    response = client.post("/api/secrets/batch-get", json={"names": names})
+    assert response.status_code == 200, response.text
+    return {item["name"]: item for item in response.json()["items"]}
+
+
+def test_returns_found_missing_and_undecryptable_separately(client, create_secret, openbao):
+    create_secret("db-main", password="s3cret")
+    create_secret("broken")
+    with SessionLocal() as db:
+        db.execute(update(Secret).where(Secret.name == "broken").values(password="garbage"))
+        db.commit()
+    openbao.secrets["bao-only"] = {"username": "u", "password": "from-bao", "host": ""}
+
+    items = batch_get(client, ["db-main", "broken", "bao-only", "nowhere"])
+
+    assert items["db-main"]["secret"]["password"] == "s3cret"
+    assert items["db-main"]["error"] is None
+    assert items["broken"] == {"name": "broken", "secret": None, "error": "Secret cannot be decrypted"}
+    assert items["bao-only"]["secret"]["password"] == "from-bao"
+    assert items["nowhere"] == {"name": "nowhere", "secret": None, "error": "Secret not found"}
+
+
+def test_keeps_request_order_and_duplicates(client, create_secret):
+    create_secret("a")
+    create_secret("b")
+    response = client.post("/api/secrets/batch-get", json={"names": ["b", "a", "b"]})
+    assert [item["name"] for item in response.json()["items"]] == ["b", "a", "b"]
+
+
+def test_rejects_empty_and_oversized_batches(client):
+    assert client.post("/api/secrets/batch-get", json={"names": []}).status_code == 422
+    names = [f"s{i}" for i in range(501)]
+    assert client.post("/api/secrets/batch-get", json={"names": names}).status_code == 422
+
+
+def test_names_are_sent_to_openbao_as_one_path_segment(openbao_http):
+    items = batch_get(TestClient(app), ["../sys/seal-status", "a?b#c", "..", "ok"])
+    assert all(item["error"] == "Secret not found" for item in items.values())
+    assert [request.url.raw_path for request in openbao_http.requests] == [
+        b"/secrets/..%2Fsys%2Fseal-status",
+        b"/secrets/a%3Fb%23c",
+        b"/secrets/ok",
+    ]
+
+
+def test_bad_openbao_response_fails_only_its_item(openbao_http):
+    def handler(request):
+        name = request.url.path.rsplit("/", 1)[-1]
+        if name == "boom":
+            raise RuntimeError("unexpected")
+        body = {"not-json": b"<html>", "list": b"[1, 2]"}.get(name, b'{"username": "u", "password": "p"}')
+        return httpx.Response(200, content=body)
+
+    openbao_http.handler = handler
+    items = batch_get(TestClient(app), ["not-json", "list", "boom", "ok"])
+
+    assert items["ok"]["secret"] == {"username": "u", "password": "p"}
+    for name in ("not-json", "list", "boom"):
+        assert items[name] == {"name": name, "secret": None, "error": "Secret storage error"}
@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.secret import Secret
+
+
+def test_changes_feed_pages_by_revision(client, create_secret):
+    for name in ("b", "a", "c"):
+        create_secret(name)
+    first = client.get("/api/secrets/changes", params={"limit": 2}).json()
+    assert [item["name"] for item in first["items"]] == ["b", "a"]
+    assert first["has_more"] is True
+
+    rest = client.get("/api/secrets/changes", params={"since": first["next_cursor"]}).json()
+    assert [item["name"] for item in rest["items"]] == ["c"]
+    assert rest["has_more"] is False
+
+    idle = client.get("/api/secrets/changes", params={"since": rest["next_cursor"]}).json()
+    assert idle["items"] == []
+    assert idle["next_cursor"] == rest["next_cursor"]
+
+    create_secret("d")
+    new = client.get("/api/secrets/changes", params={"since": rest["next_cursor"]}).json()
+    assert [item["name"] for item in new["items"]] == ["d"]
+
+def test_changes_feed_sees_rows_with_older_timestamps(client, create_secret):
+    create_secret("early")
+    cursor = client.get("/api/secrets/changes").json()["next_cursor"]
+    create_secret("late-commit")
+    # Транзакция началась раньше: updated_at меньше, чем у уже прочитанной строки
+    with SessionLocal() as db:
+        db.execute(update(Secret).where(Secret.name == "late-commit").values(updated_at=datetime(2000, 1, 1)))
+        db.commit()
+    page = client.get("/api/secrets/changes", params={"since": cursor}).json()
+    assert [item["name"] for item in page["items"]] == ["late-commit"]
+
+def test_changes_feed_restarts_on_legacy_cursor(client, create_secret):
+    create_secret("a")
+    create_secret("b")
+    legacy = base64.urlsafe_b64encode(json.dumps(["2030-01-01T00:00:00", 99]).encode()).decode().rstrip("=")
+    page = client.get("/api/secrets/changes", params={"since": legacy}).json()
+    assert [item["name"] for item in page["items"]] == ["a", "b"]
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/secrets/changes", params={"since": "not-a-cursor"}).status_code == 400
+
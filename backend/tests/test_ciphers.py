@@ -0,0 +1,33 @@
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.services.ciphers import AES_GCM, CIPHERS, FERNET
+
+KEY = Fernet.generate_key()
+
+
+@pytest.mark.parametrize("algorithm", [FERNET, AES_GCM])
+def test_roundtrip_produces_ascii_tokens(algorithm):
+    cipher = CIPHERS[algorithm](KEY)
+    token = cipher.encrypt(b"s3cret")
+    token.decode("ascii")
+    assert cipher.algorithm == algorithm
+    assert cipher.decrypt(token) == b"s3cret"
+
+
+def test_aes_gcm_uses_a_fresh_nonce():
+    cipher = CIPHERS[AES_GCM](KEY)
+    assert cipher.encrypt(b"same") != cipher.encrypt(b"same")
+
+
+@pytest.mark.parametrize("algorithm", [FERNET, AES_GCM])
+def test_wrong_key_raises_invalid_token(algorithm):
+    token = CIPHERS[algorithm](KEY).encrypt(b"s3cret")
+    with pytest.raises(InvalidToken):
+        CIPHERS[algorithm](Fernet.generate_key()).decrypt(token)
+
+
+@pytest.mark.parametrize("token", [b"", b"not base64!", b"AAAA", b"A" * 64])
+def test_aes_gcm_damaged_token_raises_invalid_token(token):
+    with pytest.raises(InvalidToken):
+        CIPHERS[AES_GCM](KEY).decrypt(token)
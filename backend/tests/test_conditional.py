@@ -0,0 +1,40 @@
+def test_etag_returns_304_until_collection_changes(client, create_secret):
+    create_secret("svc-1")
+    response = client.get("/api/secrets/")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    cached = client.get("/api/secrets/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert client.get("/api/secrets/", headers={"If-None-Match": f"W/\"other\", {etag}"}).status_code == 304
+
+    create_secret("svc-2")
+    changed = client.get("/api/secrets/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [item["name"] for item in changed.json()["items"]] == ["svc-1", "svc-2"]
+
+def test_etag_differs_per_page_and_filter(client, create_secret):
+    create_secret("svc-1")
+    etags = {
+        client.get("/api/secrets/", params=params).headers["ETag"]
+        for params in ({}, {"limit": 10}, {"type": "api"}, {"prefix": "svc"}, {"cursor": "svc-0"})
+    }
+    assert len(etags) == 5
+
+def test_pending_etag_changes_on_approve_and_reject(client, create_request):
+    first = create_request("a")
+    second = create_request("b")
+    etag = client.get("/api/requests/pending").headers["ETag"]
+    assert client.get("/api/requests/pending", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(f"/api/requests/{first}/approve")
+    response = client.get("/api/requests/pending", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    client.post(f"/api/requests/{second}/reject")
+    response = client.get("/api/requests/pending", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["items"] == []
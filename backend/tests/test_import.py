@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from app.api import secrets as secrets_api
+
+
+def ndjson(*records):
+    return b"".join(
+        (record if isinstance(record, bytes) else json.dumps(record).encode()) + b"\n" for record in records
+    )
+
+
+def secret(name, **fields):
+    return dict({"name": name, "description": "imported", "username": "u", "password": "p"}, **fields)
+
+
+def report(response):
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return lines[:-1], lines[-1]
+
+
+def test_reports_every_line_and_a_summary(client, create_secret, monkeypatch):
+    monkeypatch.setattr(secrets_api, "IMPORT_BATCH_SIZE", 2)
+    create_secret("exists")
+    body = ndjson(
+        secret("a"),
+        {"name": "no-fields"},
+        b"",
+        secret("exists"),
+        secret("b"),
+        secret("b"),
+        b"{not json",
+    )
+    response = client.post("/api/secrets/import", content=body)
+    assert response.status_code == 200
+    records, summary = report(response)
+
+    by_line = {record["line"]: record for record in records}
+    assert by_line[1]["status"] == "created"
+    assert by_line[2]["status"] == "failed" and by_line[2]["name"] is None
+    assert 3 not in by_line
+    assert by_line[4] == {"line": 4, "name": "exists", "status": "failed", "error": "Secret already exists"}
+    assert by_line[5]["status"] == "created"
+    assert by_line[6]["error"] == "Duplicate name in import"
+    assert by_line[7]["status"] == "failed"
+    assert summary == {"summary": {"created": 2, "failed": 4, "mirror_failed": 0}}
+
+    names = [item["name"] for item in client.get("/api/secrets/").json()["items"]]
+    assert names == ["a", "b", "exists"]
+
+
+def test_mirror_failures_are_reported(client, openbao):
+    openbao.fail_names.add("b")
+    response = client.post("/api/secrets/import", content=ndjson(secret("a"), secret("b")))
+    records, summary = report(response)
+    assert {"line": 2, "name": "b", "status": "mirror_failed"} in records
+    assert summary["summary"] == {"created": 2, "failed": 0, "mirror_failed": 1}
+    assert set(openbao.secrets) == {"a"}
+
+
+def test_too_long_line_returns_report_for_committed_batches(client, monkeypatch, openbao):
+    monkeypatch.setattr(secrets_api, "IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(secrets_api, "IMPORT_MAX_LINE_BYTES", 256)
+    openbao.fail_names.add("a1")
+
+    def body():
+        yield ndjson(secret("a1"), secret("a2"))
+        yield ndjson(secret("a3"))
+        yield b"x" * 1024
+
+    response = client.post("/api/secrets/import", content=body())
+    assert response.status_code == 413
+    records, summary = report(response)
+    assert {"line": 1, "name": "a1", "status": "mirror_failed"} in records
+    assert {"line": 3, "name": "a3", "status": "failed", "error": "Import aborted: Line 4 is too long"} in records
+    assert summary == {"summary": {"created": 2, "failed": 1, "mirror_failed": 1}, "error": "Line 4 is too long"}
+    assert [item["name"] for item in client.get("/api/secrets/").json()["items"]] == ["a1", "a2"]
+
+
+def test_unexpected_error_propagates_after_mirror_drains(client, monkeypatch, openbao):
+    monkeypatch.setattr(secrets_api, "IMPORT_BATCH_SIZE", 1)
+    openbao.fail_names.add("a")
+    # Отказ зеркала приходит уже после ошибки второй пачки
+    openbao.delay = 0.05
+    calls = 0
+    insert_secret_batch = secrets_api.insert_secret_batch
+
+    async def failing_insert(db, batch):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("database went away")
+        return await insert_secret_batch(db, batch)
+
+    monkeypatch.setattr(secrets_api, "insert_secret_batch", failing_insert)
+    # Ошибка доходит как есть, а не как ValueError от записи в закрытый файл отчета
+    with pytest.raises(RuntimeError, match="database went away"):
+        client.post("/api/secrets/import", content=ndjson(secret("a"), secret("b")))
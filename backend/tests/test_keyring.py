@@ -0,0 +1,84 @@
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.services import keyring as keyring_module
+from app.services.ciphers import AES_GCM, FERNET
+from app.services.keyring import KeyRing, key_id, load_key_file, rotate_rows
+
+OLD_KEY = Fernet.generate_key()
+NEW_KEY = Fernet.generate_key()
+
+
+@pytest.mark.parametrize("algorithm", [FERNET, AES_GCM])
+def test_encrypt_decrypt_roundtrip(algorithm):
+    ring = KeyRing([NEW_KEY], algorithm)
+    token_algorithm, token_key_id, token = ring.encrypt(b"s3cret")
+    assert token_algorithm == algorithm
+    assert token_key_id == key_id(NEW_KEY)
+    assert ring.decrypt(token, token_key_id, token_algorithm) == b"s3cret"
+    assert ring.is_current(token_key_id, token_algorithm)
+
+
+def test_decrypts_rows_of_older_keys_and_legacy_rows_without_tags():
+    old_ring = KeyRing([OLD_KEY], AES_GCM)
+    _, old_key_id, old_token = old_ring.encrypt(b"from-old-key")
+    legacy_token = Fernet(OLD_KEY).encrypt(b"legacy")
+
+    ring = KeyRing([NEW_KEY, OLD_KEY], AES_GCM)
+    assert ring.decrypt(old_token, old_key_id, AES_GCM) == b"from-old-key"
+    # Строка до появления ротации: ни key_id, ни алгоритма - Fernet перебором ключей
+    assert ring.decrypt(legacy_token) == b"legacy"
+    assert not ring.is_current(None, None)
+
+
+def test_unknown_key_raises_invalid_token():
+    token = KeyRing([OLD_KEY]).encrypt(b"x")[2]
+    with pytest.raises(InvalidToken):
+        KeyRing([NEW_KEY]).decrypt(token, key_id(OLD_KEY), AES_GCM)
+
+
+def test_rotate_reencrypts_with_primary_key_and_algorithm():
+    _, old_key_id, old_token = KeyRing([OLD_KEY], FERNET).encrypt(b"s3cret")
+    ring = KeyRing([NEW_KEY, OLD_KEY], AES_GCM)
+    algorithm, new_key_id, new_token = ring.rotate(old_token, old_key_id, FERNET)
+    assert (algorithm, new_key_id) == (AES_GCM, key_id(NEW_KEY))
+    assert KeyRing([NEW_KEY], AES_GCM).decrypt(new_token, new_key_id, algorithm) == b"s3cret"
+
+
+def test_rotate_rows_reports_undecryptable_rows():
+    _, old_key_id, old_token = KeyRing([OLD_KEY], FERNET).encrypt(b"s3cret")
+    ring = KeyRing([NEW_KEY, OLD_KEY], AES_GCM)
+    rotated, broken = rotate_rows([(1, old_token.decode(), old_key_id, FERNET), (2, "garbage", None, None)], ring)
+    assert rotated[:2] == (1, old_token.decode())
+    assert rotated[2] is not None and rotated[3:] == (key_id(NEW_KEY), AES_GCM)
+    assert broken == (2, "garbage", None, None, None)
+
+
+def test_rejects_empty_ring_and_unknown_cipher():
+    with pytest.raises(ValueError):
+        KeyRing([])
+    with pytest.raises(ValueError):
+        KeyRing([NEW_KEY], "rot13")
+
+
+def test_from_env_prefers_key_list(monkeypatch):
+    monkeypatch.setattr(keyring_module, "FERNET_KEYS", f"{NEW_KEY.decode()}, {OLD_KEY.decode()}")
+    assert KeyRing.from_env().key_ids == [key_id(NEW_KEY), key_id(OLD_KEY)]
+
+
+def test_from_env_requires_configured_key(monkeypatch):
+    monkeypatch.setattr(keyring_module, "FERNET_KEYS", "")
+    monkeypatch.setattr(keyring_module, "FERNET_KEY", "")
+    monkeypatch.setattr(keyring_module, "FERNET_KEY_FILE", "")
+    with pytest.raises(RuntimeError, match="No encryption key configured"):
+        KeyRing.from_env()
+    monkeypatch.setattr(keyring_module, "FERNET_KEY_FILE", "fernet.keys")
+    with pytest.raises(RuntimeError, match="absolute path"):
+        KeyRing.from_env()
+
+
+def test_key_file_is_created_once_and_reused(tmp_path):
+    path = str(tmp_path / "fernet.keys")
+    keys = load_key_file(path)
+    assert len(keys) == 1
+    assert load_key_file(path) == keys
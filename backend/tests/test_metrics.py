@@ -0,0 +1,73 @@
+import json
+import logging
+import os
+
+import pytest
+
+from app import metrics
+from app.metrics import Registry, render
+
+# pid больше pid_max Linux: такого процесса точно нет
+DEAD_PID = 2 ** 22 + 1
+
+
+def worker_snapshot(jobs, durations, in_flight):
+    registry = Registry()
+    registry.counter("jobs_total", "Jobs done", ("kind",)).labels("sync").inc(jobs)
+    histogram = registry.histogram("job_seconds", "Job time", ("kind",), buckets=(0.1, 1)).labels("sync")
+    for value in durations:
+        histogram.observe(value)
+    registry.gauge("jobs_in_progress", "Jobs running").labels().inc(in_flight)
+    return registry.snapshot()
+
+
+@pytest.fixture
+def multiproc_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    # Текущий процесс тоже пишет снимок; пустой реестр ничего не добавляет
+    monkeypatch.setattr(metrics, "REGISTRY", Registry())
+    return tmp_path
+
+
+def write(directory, pid, snapshot):
+    (directory / f"{pid}.json").write_text(json.dumps(snapshot))
+
+
+def test_render_merges_worker_snapshots(multiproc_dir):
+    write(multiproc_dir, os.getppid(), worker_snapshot(3, [0.0625, 0.5], in_flight=2))
+    write(multiproc_dir, DEAD_PID, worker_snapshot(4, [0.1, 4.0], in_flight=5))
+
+    assert render().splitlines() == [
+        "# HELP job_seconds Job time",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{kind="sync",le="0.1"} 2',
+        'job_seconds_bucket{kind="sync",le="1"} 3',
+        'job_seconds_bucket{kind="sync",le="+Inf"} 4',
+        'job_seconds_sum{kind="sync"} 4.6625',
+        'job_seconds_count{kind="sync"} 4',
+        "# HELP jobs_in_progress Jobs running",
+        "# TYPE jobs_in_progress gauge",
+        # gauge умершего воркера не учитывается, счетчики и гистограммы - да
+        "jobs_in_progress 2",
+        "# HELP jobs_total Jobs done",
+        "# TYPE jobs_total counter",
+        'jobs_total{kind="sync"} 7',
+    ]
+    assert (multiproc_dir / f"{os.getpid()}.json").exists()
+
+
+def test_broken_snapshot_is_logged_and_skipped(multiproc_dir, caplog):
+    write(multiproc_dir, os.getppid(), worker_snapshot(3, [], in_flight=0))
+    (multiproc_dir / f"{DEAD_PID}.json").write_text('{"jobs_total": ')
+
+    with caplog.at_level(logging.WARNING, logger="app.metrics"):
+        text = render()
+
+    assert 'jobs_total{kind="sync"} 3' in text.splitlines()
+    assert f"{DEAD_PID}.json" in caplog.text
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.counter("errors_total", "Errors", ("route",)).labels('/a"b\\c\nd').inc()
+    assert 'errors_total{route="/a\\"b\\\\c\\nd"} 1' in render(registry.snapshot()).splitlines()
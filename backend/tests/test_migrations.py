@@ -0,0 +1,35 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrations import upgrade
+
+OLD_SCHEMA = (
+    "CREATE TABLE secrets (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL UNIQUE, description TEXT NOT NULL, "
+    "type VARCHAR, username VARCHAR NOT NULL, password VARCHAR NOT NULL, host VARCHAR, created_at DATETIME)",
+    "CREATE TABLE access_requests (id INTEGER PRIMARY KEY, user_id VARCHAR NOT NULL, user_name VARCHAR NOT NULL, "
+    "secret_name VARCHAR NOT NULL, description TEXT NOT NULL, status VARCHAR, duration INTEGER, type VARCHAR, "
+    "approved BOOLEAN, created_at DATETIME, approved_at DATETIME, rejected_at DATETIME)",
+    "INSERT INTO secrets (name, description, type, username, password, created_at) "
+    "VALUES ('legacy', 'd', 'database', 'u', 'token', '2024-01-01 00:00:00')",
+)
+
+
+def test_upgrade_adds_new_columns_and_indexes_to_old_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for statement in OLD_SCHEMA:
+            conn.execute(text(statement))
+
+    upgrade(engine)
+    upgrade(engine)  # повторный запуск ничего не ломает
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("secrets")}
+    assert {"version", "updated_at", "key_id", "algorithm", "revision"} <= columns
+    assert "updated_at" in {column["name"] for column in inspector.get_columns("access_requests")}
+    assert {"ix_secrets_type_name", "ix_secrets_revision"} <= {index["name"] for index in inspector.get_indexes("secrets")}
+    assert "ix_access_requests_status_created" in {index["name"] for index in inspector.get_indexes("access_requests")}
+    assert "collection_revisions" in inspector.get_table_names()
+
+    with engine.connect() as conn:
+        row = conn.execute(text("SELECT version, revision, updated_at, key_id FROM secrets")).one()
+    assert tuple(row) == (1, 0, "2024-01-01 00:00:00", None)
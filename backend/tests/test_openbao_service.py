@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import openbao_service
+from app.services.openbao_service import OPENBAO_RETRIES, OpenBaoService
+
+# openbao_service.asyncio - тот же модуль asyncio: подмена sleep действует везде
+real_sleep = asyncio.sleep
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(openbao_service.asyncio, "sleep", sleep)
+    return sleeps
+
+
+def request(method="GET", path="/secrets/db"):
+    return asyncio.run(OpenBaoService._request(method, path))
+
+
+@pytest.mark.parametrize("status", sorted(openbao_service.RETRY_STATUSES))
+def test_retries_retryable_status_until_success(openbao_http, no_backoff, status):
+    statuses = iter([status, 200])
+    openbao_http.handler = lambda request: httpx.Response(next(statuses), json={})
+    assert request().status_code == 200
+    assert len(openbao_http.requests) == 2
+    assert len(no_backoff) == 1
+
+
+def test_gives_up_after_configured_retries(openbao_http, no_backoff):
+    openbao_http.handler = lambda request: httpx.Response(503)
+    assert request().status_code == 503
+    assert len(openbao_http.requests) == OPENBAO_RETRIES + 1
+    # Пауза только между попытками, с растущим потолком
+    assert len(no_backoff) == OPENBAO_RETRIES
+    assert all(0 <= delay <= openbao_service.OPENBAO_BACKOFF * 2 ** i for i, delay in enumerate(no_backoff))
+
+
+def test_other_statuses_are_not_retried(openbao_http, no_backoff):
+    openbao_http.handler = lambda request: httpx.Response(404)
+    assert request().status_code == 404
+    assert len(openbao_http.requests) == 1
+    assert no_backoff == []
+
+
+def test_transport_errors_return_none_after_last_attempt(openbao_http):
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    openbao_http.handler = handler
+    assert request() is None
+    assert len(openbao_http.requests) == OPENBAO_RETRIES + 1
+
+
+def test_transport_error_then_success(openbao_http):
+    outcomes = iter([httpx.ReadTimeout("slow"), httpx.Response(200, json={"username": "u"})])
+
+    def handler(request):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    openbao_http.handler = handler
+    assert asyncio.run(OpenBaoService.get_secret("db")) == {"username": "u"}
+
+
+def test_semaphore_limits_concurrent_requests(monkeypatch):
+    active = peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await real_sleep(0.01)
+        active -= 1
+        return httpx.Response(200, json={})
+
+    async def run():
+        monkeypatch.setattr(OpenBaoService, "_semaphore", asyncio.Semaphore(3))
+        monkeypatch.setattr(OpenBaoService, "_client", httpx.AsyncClient(
+            base_url="http://openbao", transport=httpx.MockTransport(handler)))
+        responses = await asyncio.gather(*(OpenBaoService._request("GET", f"/secrets/s{i}") for i in range(10)))
+        assert all(response.status_code == 200 for response in responses)
+
+    asyncio.run(run())
+    assert peak == 3
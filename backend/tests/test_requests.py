@@ -0,0 +1,38 @@
+import pytest
+
+from app.api import admin
+
+
+def test_requests_page_newest_first_with_cursor(client, create_request):
+    ids = [create_request(f"s{i}") for i in range(5)]
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/requests/", params=params).json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(reversed(ids))
+
+
+def test_filters_by_user_and_status(client, create_request):
+    alice = create_request("db", user_id="alice")
+    bob = create_request("db", user_id="bob")
+    client.post(f"/api/requests/{bob}/approve")
+    assert [item["id"] for item in client.get("/api/requests/", params={"user_id": "alice"}).json()["items"]] == [alice]
+    assert [item["id"] for item in client.get("/api/requests/pending").json()["items"]] == [alice]
+    approved = client.get("/api/requests/", params={"status": "approved"}).json()["items"]
+    assert [item["id"] for item in approved] == [bob]
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/requests/", params={"cursor": "###"}).status_code == 400
+
+
+@pytest.mark.parametrize("token", ["wrong", b"\xe9t\xe9", b"\xff" * 8])
+def test_admin_api_rejects_invalid_tokens(client, monkeypatch, token):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "s3cret")
+    response = client.get("/api/admin/key-rotation", headers={"X-Admin-Token": token})
+    assert response.status_code == 403
+    assert client.get("/api/admin/key-rotation", headers={"X-Admin-Token": "s3cret"}).status_code == 200
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.secret import Secret
+from app.services.keyring import keyring
+from app.services.secret_cache import SecretCache, secret_cache
+
+PAYLOAD = {"name": "db", "username": "u", "password": "s3cret", "host": "h"}
+
+
+def test_hit_returns_a_copy_with_password():
+    cache = SecretCache(enabled=True, max_entries=10, ttl=60)
+    cache.put("db", 1, PAYLOAD)
+    assert cache.get("db", 1) == PAYLOAD
+    assert cache.get("db") == PAYLOAD
+    assert cache.stats()["hits"] == 2
+
+
+def test_version_mismatch_evicts_and_wipes_password():
+    cache = SecretCache(enabled=True, max_entries=10, ttl=60)
+    cache.put("db", 1, PAYLOAD)
+    entry = cache._entries["db"]
+    assert cache.get("db", 2) is None
+    assert "db" not in cache._entries
+    assert entry.password == bytearray(len("s3cret"))
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = SecretCache(enabled=True, max_entries=10, ttl=5)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.put("db", 1, PAYLOAD)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert cache.get("db", 1) is None
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = SecretCache(enabled=True, max_entries=2, ttl=60)
+    cache.put("a", 1, PAYLOAD)
+    cache.put("b", 1, PAYLOAD)
+    cache.get("a")
+    cache.put("c", 1, PAYLOAD)
+    assert set(cache._entries) == {"a", "c"}
+
+
+def test_disabled_cache_stores_nothing():
+    cache = SecretCache(enabled=False, max_entries=10, ttl=60)
+    cache.put("db", 1, PAYLOAD)
+    assert cache.get("db") is None
+    assert cache.stats()["size"] == 0
+
+
+@pytest.fixture
+def cache_enabled(monkeypatch):
+    monkeypatch.setattr(secret_cache, "enabled", True)
+
+
+def test_get_secret_serves_cache_until_the_row_version_changes(client, create_secret, cache_enabled):
+    create_secret("db", password="old")
+    before = secret_cache.stats()
+    assert client.get("/api/secrets/db").json()["password"] == "old"
+    assert client.get("/api/secrets/db").json()["password"] == "old"
+    assert secret_cache.stats()["hits"] - before["hits"] == 1
+
+    # Запись через ORM в другом процессе: кэш этого процесса о ней не знает
+    with SessionLocal() as db:
+        row = db.execute(select(Secret).where(Secret.name == "db")).scalar_one()
+        row.algorithm, row.key_id, token = keyring.encrypt(b"new")
+        row.password = token.decode()
+        db.commit()
+        assert row.version == 2
+
+    assert client.get("/api/secrets/db").json()["password"] == "new"
+    assert secret_cache.stats()["evictions"] - before["evictions"] == 1
+
+
+def test_create_secret_invalidates_cached_name(client, create_secret, cache_enabled):
+    secret_cache.put("db", 1, dict(PAYLOAD, password="stale"))
+    create_secret("db", password="fresh")
+    assert "db" not in secret_cache._entries
+    assert client.get("/api/secrets/db").json()["password"] == "fresh"
+
+
+def test_batch_get_fills_and_uses_the_cache(client, create_secret, cache_enabled):
+    create_secret("db", password="pw")
+    before = secret_cache.stats()
+    for _ in range(2):
+        response = client.post("/api/secrets/batch-get", json={"names": ["db"]})
+        assert response.json()["items"][0]["secret"]["password"] == "pw"
+    assert secret_cache.stats()["hits"] - before["hits"] == 1
@@ -0,0 +1,36 @@
+def list_all(client, **params):
+    names, cursor = [], None
+    while True:
+        page = client.get("/api/secrets/", params=dict(params, **({"cursor": cursor} if cursor else {}))).json()
+        names.extend(item["name"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return names
+
+
+def test_keyset_pages_cover_all_secrets_in_name_order(client, create_secret):
+    for i in (3, 1, 4, 0, 2, 6, 5):
+        create_secret(f"svc-{i}")
+    first = client.get("/api/secrets/", params={"limit": 3}).json()
+    assert [item["name"] for item in first["items"]] == ["svc-0", "svc-1", "svc-2"]
+    assert first["next_cursor"] == "svc-2"
+    assert list_all(client, limit=3) == [f"svc-{i}" for i in range(7)]
+
+
+def test_last_full_page_has_no_cursor(client, create_secret):
+    for i in range(4):
+        create_secret(f"svc-{i}")
+    page = client.get("/api/secrets/", params={"limit": 4}).json()
+    assert len(page["items"]) == 4
+    assert page["next_cursor"] is None
+
+
+def test_type_and_prefix_filters(client, create_secret):
+    create_secret("db-a", type="database")
+    create_secret("api-a", type="api")
+    create_secret("api-b", type="api")
+    create_secret("api_x", type="api")
+    assert list_all(client, type="api", limit=1) == ["api-a", "api-b", "api_x"]
+    assert list_all(client, prefix="api-") == ["api-a", "api-b"]
+    # _ в префиксе - обычный символ, а не шаблон LIKE
+    assert list_all(client, prefix="api_") == ["api_x"]
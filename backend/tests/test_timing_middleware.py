@@ -0,0 +1,40 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import middleware
+from app.api import admin
+from app.middleware import TimingMiddleware
+
+
+@pytest.fixture
+def timed_client(monkeypatch):
+    monkeypatch.setattr(middleware, "ADMIN_TIMING_ENABLED", True)
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "s3cret")
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    app.add_middleware(TimingMiddleware)
+    return TestClient(app)
+
+
+def test_valid_admin_token_adds_server_timing(timed_client):
+    response = timed_client.get("/ping", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 200
+    assert "server-timing" in response.headers
+
+
+@pytest.mark.parametrize("token", ["wrong", b"\xe9t\xe9", b"\xff" * 8])
+def test_invalid_admin_token_is_ignored(timed_client, token):
+    response = timed_client.get("/ping", headers={"X-Admin-Token": token})
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+
+def test_flag_off_ignores_admin_token(timed_client, monkeypatch):
+    monkeypatch.setattr(middleware, "ADMIN_TIMING_ENABLED", False)
+    response = timed_client.get("/ping", headers={"X-Admin-Token": "s3cret"})
+    assert "server-timing" not in response.headers
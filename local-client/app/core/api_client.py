@@ -2,17 +2,64 @@ import requests
 import json
 from typing import Optional, List, Dict
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .database_models import User, Secret, SecretType, SecretStatus, AuditLog
 
+SYNC_PAGE_SIZE = 500
+# Ответы на вход, означающие отказ в учетных данных, а не недоступность сервера
+AUTH_REJECTED_STATUSES = (401, 403)
+# Максимальная страница GET /secrets на сервере
+LIST_PAGE_SIZE = 500
+API_TAGS = ("api",)
+
 class APIClient:
     def __init__(self, base_url: str):
         self.base_url = base_url
         self.token = None
+        # ETag и результат последнего списка секретов для условного GET
+        self._secrets_etag: Optional[str] = None
+        self._secrets_cache: List[Secret] = []
+        # Курсор инкрементальной синхронизации, выданный сервером
+        self._sync_cursor: Optional[str] = None
+        # Последний вход отклонен сервером (401/403), а не сорвался по сети
+        self.login_rejected = False
+        self.session = self._create_session()
         print(f"APIClient initialized with URL: {base_url}")
     
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Одна keep-alive сессия на клиент: пул соединений, ретраи и gzip"""
+        session = requests.Session()
+        retry = Retry(
+            total=3,
+            connect=3,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        return session
+    
+    @property
+    def sync_cursor(self) -> Optional[str]:
+        return self._sync_cursor
+    
+    def resume_sync(self, cursor: Optional[str]):
+        """Продолжить инкрементальную синхронизацию с курсора из офлайн-кэша"""
+        self._sync_cursor = cursor
+    
+    def _reset_sync(self):
+        self._secrets_etag = None
+        self._secrets_cache = []
+        self._sync_cursor = None
+    
     def test_connection(self) -> bool:
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = self.session.get(f"{self.base_url}/health", timeout=5)
             print(f"Connection test: {response.status_code}")
             return response.status_code == 200
         except Exception as e:
@@ -21,9 +68,10 @@ class APIClient:
     
     def login(self, email: str, password: str) -> bool:
         print(f"API Login attempt: {email}")
+        self.login_rejected = False
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/login",
                 json={"email": email, "password": password},
                 timeout=10
@@ -34,10 +82,13 @@ class APIClient:
             if response.status_code == 200:
                 data = response.json()
                 self.token = data.get("access_token")
+                self.session.headers["Authorization"] = f"Bearer {self.token}"
+                self._reset_sync()
                 print(f"API Login successful")
                 return True
             else:
                 print(f"API Login failed: {response.status_code}")
+                self.login_rejected = response.status_code in AUTH_REJECTED_STATUSES
                 return False
                 
         except Exception as e:
@@ -46,7 +97,7 @@ class APIClient:
     
     def register(self, email: str, password: str) -> bool:
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/register",
                 json={"email": email, "password": password},
                 timeout=10
@@ -57,34 +108,108 @@ class APIClient:
             print(f"Register error: {e}")
             return False
     
-    def get_secrets(self) -> List[Secret]:
+    def sync_secrets(self) -> Optional[List[Secret]]:
+        """Забирает только секреты, измененные после курсора прошлой синхронизации.
+        
+        Возвращает список изменений или None, если синхронизация недоступна.
+        """
+        if not self.token:
+            print("No token for sync_secrets")
+            return None
+        
+        changed: List[Secret] = []
+        cursor = self._sync_cursor
+        try:
+            while True:
+                params = {"limit": SYNC_PAGE_SIZE}
+                if cursor:
+                    params["since"] = cursor
+                response = self.session.get(
+                    f"{self.base_url}/secrets/changes",
+                    params=params,
+                    timeout=10
+                )
+                if response.status_code != 200:
+                    print(f"Sync secrets failed: {response.status_code}")
+                    return None
+                
+                data = response.json()
+                changed.extend(self._convert_api_secrets(data.get("items", [])))
+                cursor = data.get("next_cursor")
+                if not data.get("has_more"):
+                    break
+        except Exception as e:
+            print(f"Sync secrets error: {e}")
+            return None
+        
+        # Курсор сдвигаем только после полностью принятой синхронизации
+        self._sync_cursor = cursor
+        print(f"Synced {len(changed)} changed secrets")
+        return changed
+    
+    def get_secrets(self) -> Optional[List[Secret]]:
+        """Полный список секретов (все страницы); None, если его не удалось получить.
+        
+        If-None-Match отправляется с первой страницей: ETag сервера меняется при
+        любом изменении коллекции, так что 304 на ней значит, что не изменилось ничего.
+        """
         if not self.token:
             print("No token for get_secrets")
-            return []
+            return None
+        
+        headers = {}
+        if self._secrets_etag:
+            headers["If-None-Match"] = self._secrets_etag
         
+        secrets_data: List[Dict] = []
+        etag = None
+        cursor = None
         try:
-            response = requests.get(
-                f"{self.base_url}/secrets",
-                headers={"Authorization": f"Bearer {self.token}"},
-                timeout=10
-            )
-            
-            print(f"Get secrets response: {response.status_code}")
-            
-            if response.status_code == 200:
-                secrets_data = response.json()
-                print(f"Found {len(secrets_data)} secrets")
-                return self._convert_api_secrets(secrets_data)
-            else:
-                print(f"Get secrets failed: {response.status_code}")
-                return []
+            while True:
+                params = {"limit": LIST_PAGE_SIZE}
+                if cursor:
+                    params["cursor"] = cursor
+                response = self.session.get(
+                    f"{self.base_url}/secrets",
+                    params=params,
+                    headers=headers if cursor is None else {},
+                    timeout=10
+                )
+                
+                print(f"Get secrets response: {response.status_code}")
                 
+                if response.status_code == 304 and cursor is None:
+                    print(f"Secrets not modified, reusing {len(self._secrets_cache)} cached")
+                    return list(self._secrets_cache)
+                
+                if response.status_code != 200:
+                    print(f"Get secrets failed: {response.status_code}")
+                    return None
+                
+                page = response.json()
+                # Бэкенд отдает страницу {items, next_cursor}; старый формат - просто список
+                if not isinstance(page, dict):
+                    secrets_data = page
+                    etag = response.headers.get("ETag")
+                    break
+                if cursor is None:
+                    etag = response.headers.get("ETag")
+                secrets_data.extend(page.get("items", []))
+                cursor = page.get("next_cursor")
+                if not cursor:
+                    break
         except Exception as e:
             print(f"Get secrets error: {e}")
-            return []
+            return None
+        
+        # Кэш и ETag обновляем только после того, как получены все страницы
+        print(f"Found {len(secrets_data)} secrets")
+        self._secrets_cache = self._convert_api_secrets(secrets_data)
+        self._secrets_etag = etag
+        return list(self._secrets_cache)
     
     def get_all_secrets(self) -> List[Secret]:
-        return self.get_secrets()
+        return self.get_secrets() or []
     
     def create_secret(self, name: str, value: str) -> bool:
         if not self.token:
@@ -92,10 +217,9 @@ class APIClient:
             return False
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/secrets",
                 json={"name": name, "value": value},
-                headers={"Authorization": f"Bearer {self.token}"},
                 timeout=10
             )
             
@@ -113,6 +237,8 @@ class APIClient:
             print("No secrets data from API")
             return secrets
             
+        # Одна метка времени на всю пачку вместо datetime.now() на каждый секрет
+        received_at = datetime.now()
         for i, secret_data in enumerate(api_secrets):
             try:
                 secret = Secret(
@@ -123,8 +249,8 @@ class APIClient:
                     status=SecretStatus.APPROVED,
                     value=secret_data.get("value", ""),
                     owner=secret_data.get("owner", "current_user"),
-                    created_at=datetime.now(),
-                    tags=["api"]
+                    created_at=received_at,
+                    tags=API_TAGS
                 )
                 secrets.append(secret)
             except Exception as e:
@@ -0,0 +1,212 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from .database_models import AuditLog
+
+# Каталог локальных данных клиента
+VAULT_HOME = os.getenv("SECURE_VAULT_HOME", os.path.join(os.path.expanduser("~"), ".secure_vault"))
+
+AUDIT_RECENT_SIZE = 1000
+AUDIT_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    user TEXT NOT NULL,
+    action TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    status TEXT NOT NULL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_audit_ts ON audit_log (ts, id);
+CREATE INDEX IF NOT EXISTS ix_audit_user_ts ON audit_log (user, ts, id);
+CREATE INDEX IF NOT EXISTS ix_audit_action_ts ON audit_log (action, ts, id);
+CREATE INDEX IF NOT EXISTS ix_audit_status_ts ON audit_log (status, ts, id);
+CREATE INDEX IF NOT EXISTS ix_audit_resource ON audit_log (resource, id);
+"""
+
+# Ключи сортировки таблицы аудита, каждый совпадает с префиксом индекса (ключ..., id):
+# по user/action/status - (колонка, ts, id), внутри значения строки идут по времени.
+# Фильтр по user/action/status с сортировкой по времени идет по тем же индексам
+SORT_KEYS = {
+    "time": ("ts",),
+    "user": ("user", "ts"),
+    "action": ("action", "ts"),
+    "resource": ("resource",),
+    "status": ("status", "ts"),
+}
+
+_STOP = object()
+
+class AuditStore:
+    """Журнал аудита в SQLite (WAL), только на добавление.
+
+    add() кладет запись в кольцевой буфер последних записей и в очередь,
+    которую фоновый поток пишет пачками в одной транзакции. Чтение идет
+    через отдельные соединения и не ждет писателя.
+    """
+
+    def __init__(self, path: Optional[str] = None, recent_size: int = AUDIT_RECENT_SIZE):
+        if path is None:
+            os.makedirs(VAULT_HOME, exist_ok=True)
+            path = os.path.join(VAULT_HOME, "audit.db")
+        self.path = path
+        self._local = threading.local()
+        self._queue: "queue.Queue" = queue.Queue()
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._recent = deque(reversed(self.query(limit=recent_size)), maxlen=recent_size)
+
+        self._writer = threading.Thread(target=self._write_loop, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, log: AuditLog):
+        self._recent.append(log)
+        self._queue.put(log)
+
+    def recent(self, limit: int = 50) -> List[AuditLog]:
+        """Последние записи из памяти, от старых к новым"""
+        if limit >= len(self._recent):
+            return list(self._recent)
+        return list(self._recent)[-limit:]
+
+    def query(self, user: Optional[str] = None, action: Optional[str] = None,
+              status: Optional[str] = None, since: Optional[datetime] = None,
+              until: Optional[datetime] = None, before_id: Optional[int] = None,
+              limit: int = 50) -> List[AuditLog]:
+        """Записи от новых к старым; для следующей страницы передайте before_id последней"""
+        where, params = self._filters(user, action, status, since, until)
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(before_id)
+        sql = "SELECT id, ts, user, action, resource, status, details FROM audit_log"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [self._row_to_log(row) for row in self._connect().execute(sql, params)]
+
+    def page(self, sort: str = "time", descending: bool = True, after: Optional[tuple] = None,
+             limit: int = 200, **filters) -> List[tuple]:
+        """Страница строк для таблицы аудита с keyset-пагинацией по (ключ сортировки, id).
+
+        Строка: (id, ключ сортировки, время строкой, user, action, resource, status);
+        ключ - значение колонки или кортеж (колонка, ts) для составных ключей.
+        Для следующей страницы передайте after=(ключ сортировки, id) последней строки.
+        Время форматирует SQLite, чтобы не создавать datetime на каждую строку.
+        """
+        columns = SORT_KEYS[sort]
+        where, params = self._filters(**filters)
+        if after is not None:
+            key, row_id = after
+            placeholders = ", ".join("?" * (len(columns) + 1))
+            where.append(f"({', '.join(columns)}, id) {'<' if descending else '>'} ({placeholders})")
+            params.extend(key if len(columns) > 1 else (key,))
+            params.append(row_id)
+        order = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT id, {', '.join(columns)}, strftime('%d.%m.%Y %H:%M:%S', ts, 'unixepoch', 'localtime'), "
+            "user, action, resource, status FROM audit_log"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + ", ".join(f"{column} {order}" for column in (*columns, "id")) + " LIMIT ?"
+        params.append(limit)
+        rows = self._connect().execute(sql, params).fetchall()
+        if len(columns) > 1:
+            rows = [(row[0], row[1:3], *row[3:]) for row in rows]
+        return rows
+
+    def count(self, user: Optional[str] = None, action: Optional[str] = None,
+              status: Optional[str] = None, since: Optional[datetime] = None,
+              until: Optional[datetime] = None) -> int:
+        where, params = self._filters(user, action, status, since, until)
+        sql = "SELECT count(*) FROM audit_log"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._connect().execute(sql, params).fetchone()[0]
+
+    def flush(self):
+        """Ждет, пока все добавленные записи окажутся на диске"""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    @staticmethod
+    def _filters(user=None, action=None, status=None, since=None, until=None):
+        where, params = [], []
+        for column, value in (("user", user), ("action", action), ("status", status)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            where.append("ts < ?")
+            params.append(until.timestamp())
+        return where, params
+
+    @staticmethod
+    def _row_to_log(row) -> AuditLog:
+        log_id, ts, user, action, resource, status, details = row
+        return AuditLog(
+            timestamp=datetime.fromtimestamp(ts),
+            user=user,
+            action=action,
+            resource=resource,
+            status=status,
+            details=json.loads(details) if details else None,
+            id=log_id
+        )
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < AUDIT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is _STOP for item in batch)
+            rows = [
+                (log.timestamp.timestamp(), log.user, log.action, log.resource, log.status,
+                 json.dumps(log.details, default=str) if log.details else None)
+                for log in batch if log is not _STOP
+            ]
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO audit_log (ts, user, action, resource, status, details) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+            except sqlite3.Error as e:
+                print(f"❌ Audit write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                conn.close()
+                return
@@ -1,24 +1,67 @@
+import sqlite3
+import time
 from typing import Optional, List, Dict
 from .api_client import APIClient
+from .audit_store import AuditStore
 from .database_models import User, Secret, AuditLog, SecretType, SecretStatus
+from .offline_cache import OfflineCache
+from .secret_store import SecretStore
+
+# Через сколько секунд локальная копия секретов считается устаревшей
+SECRETS_TTL = 30.0
+
+class CredentialsRejected(Exception):
+    """API отклонил учетные данные, с которыми открыт офлайн-кэш; кэш уже удален"""
 
 class Database:
     def __init__(self, api_base_url: str = "http://192.168.0.77:8000"):
         self.api = APIClient(api_base_url)
         self._users = {}
-        self._audit_logs: List[AuditLog] = []
-        
-        # Тестируем подключение при инициализации
+        self._audit = AuditStore()
+        self._secrets = SecretStore()
+        self._secrets_synced_at: Optional[float] = None
+        # Зашифрованный снимок секретов текущего пользователя
+        self._cache: Optional[OfflineCache] = None
+        # После входа из кэша вход в API откладывается до первой синхронизации
+        self._pending_login: Optional[tuple] = None
+        self._cached_cursor: Optional[str] = None
+        self.offline = False
+    
+    def check_connection(self) -> bool:
+        """Проверка доступности API (блокирующая - вызывать вне потока Tk)"""
         print("🔧 Testing API connection...")
         if self.api.test_connection():
             print("✅ API connection successful")
-        else:
-            print("❌ API connection failed - using mock mode")
+            return True
+        print("❌ API connection failed - using mock mode")
+        return False
     
     def authenticate(self, username: str, password: str) -> bool:
         """Аутентификация через API бэкенда"""
         print(f"🔐 Database.authenticate called for: {username}")
         
+        # Новая сессия - локальную копию секретов собираем заново
+        self._secrets.clear()
+        self._secrets_synced_at = None
+        self._pending_login = None
+        self.offline = False
+        
+        # Снимок с диска: если пароль подходит, дашборд строится из него сразу,
+        # а вход в API и синхронизация идут следом в фоне
+        if self._unlock_offline_cache(username, password):
+            self._users[username] = User(
+                username=username,
+                display_name=username,
+                role="user"
+            )
+            self.add_audit_log(
+                user=username,
+                action="login",
+                resource="system",
+                status="offline_cache"
+            )
+            return True
+        
         # Пробуем API аутентификацию
         api_success = self.api.login(username, password)
         
@@ -50,31 +93,118 @@ class Database:
             
             return False
     
+    def _unlock_offline_cache(self, username: str, password: str) -> bool:
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+        try:
+            self._cache = OfflineCache.for_user(self.api.base_url, username, password)
+            snapshot = self._cache.load()
+        except (sqlite3.Error, OSError) as e:
+            print(f"❌ Offline cache unavailable: {e}")
+            return False
+        if snapshot is None:
+            return False
+        
+        secrets, self._cached_cursor = snapshot
+        self._secrets.replace_all(secrets)
+        self._secrets_synced_at = time.monotonic()
+        self._pending_login = (username, password)
+        self.offline = True
+        print(f"💾 Offline cache unlocked: {len(secrets)} secrets")
+        return True
+    
+    def _resume_api_session(self) -> bool:
+        """Вход в API после входа из офлайн-кэша"""
+        username, password = self._pending_login
+        if not self.api.login(username, password):
+            if self.api.login_rejected:
+                # Пароль сменен или доступ отозван - снимок больше не должен открываться
+                self._revoke_offline_session(username)
+                raise CredentialsRejected(f"API rejected credentials for {username}")
+            print("📴 API unavailable - working from offline cache")
+            return False
+        self._pending_login = None
+        self.api.resume_sync(self._cached_cursor)
+        return True
+    
+    def _revoke_offline_session(self, username: str):
+        print("🔒 API rejected credentials - wiping offline cache")
+        if self._cache is not None:
+            try:
+                self._cache.destroy()
+            except OSError as e:
+                print(f"❌ Offline cache removal failed: {e}")
+            self._cache = None
+        self._secrets.clear()
+        self._secrets_synced_at = None
+        self._pending_login = None
+        self._cached_cursor = None
+        self._users.pop(username, None)
+        self.offline = False
+        self.add_audit_log(
+            user=username,
+            action="login",
+            resource="system",
+            status="rejected"
+        )
+    
+    def _save_offline_cache(self):
+        if self._cache is None:
+            return
+        try:
+            self._cache.save(self._secrets.values(), self.api.sync_cursor)
+        except sqlite3.Error as e:
+            print(f"❌ Offline cache write failed: {e}")
+    
     def get_user(self, username: str) -> Optional[User]:
         return self._users.get(username)
     
+    def refresh_secrets(self, force: bool = False):
+        """Обновляет локальную копию секретов, если она устарела (или force)"""
+        if (
+            not force
+            and self._secrets_synced_at is not None
+            and time.monotonic() - self._secrets_synced_at < SECRETS_TTL
+        ):
+            return
+        
+        if self._pending_login is not None and not self._resume_api_session():
+            self._secrets_synced_at = time.monotonic()
+            return
+        
+        changed = self.api.sync_secrets()
+        if changed is not None:
+            self._secrets.upsert(changed)
+        else:
+            # Бэкенд без инкрементальной синхронизации - полный (условный) список
+            secrets = self.api.get_secrets()
+            if secrets is None:
+                # Сеть недоступна - остаемся на том, что уже есть локально
+                self._secrets_synced_at = time.monotonic()
+                return
+            self._secrets.replace_all(secrets)
+        self._secrets_synced_at = time.monotonic()
+        if changed or changed is None or self.offline:
+            self._save_offline_cache()
+        self.offline = False
+        print(f"📁 Local secrets: {len(self._secrets)}")
+    
     def get_user_secrets(self, username: str) -> List[Secret]:
-        """Получаем только ОДОБРЕННЫЕ секреты из API"""
+        """Получаем только ОДОБРЕННЫЕ секреты из локальной копии"""
         print(f"📁 Getting secrets for user: {username}")
-        all_secrets = self.api.get_secrets()
-        # Фильтруем только approved секреты
-        approved_secrets = [s for s in all_secrets if s.status == SecretStatus.APPROVED]
+        self.refresh_secrets()
+        approved_secrets = self._secrets.values(SecretStatus.APPROVED)
         print(f"📁 Approved secrets: {len(approved_secrets)}")
         return approved_secrets
     
     def search_secrets(self, query: str, username: str) -> List[Secret]:
-        """Поиск по одобренным секретам"""
-        secrets = self.get_user_secrets(username)
+        """Поиск по одобренным секретам через инвертированный индекс"""
         if not query:
-            return secrets
+            return self.get_user_secrets(username)
         
-        query_lower = query.lower()
-        found_secrets = [
-            s for s in secrets 
-            if query_lower in s.name.lower() or 
-               query_lower in s.description.lower() or
-               any(query_lower in tag.lower() for tag in s.tags)
-        ]
+        self.refresh_secrets()
+        found_secrets = self._secrets.search(query, SecretStatus.APPROVED)
         print(f"🔍 Search '{query}' found {len(found_secrets)} secrets")
         return found_secrets
     
@@ -93,8 +223,8 @@ class Database:
     
     def get_secret_value(self, secret_id: str, username: str) -> Optional[str]:
         """Получение значения секрета (только для одобренных)"""
-        secrets = self.get_user_secrets(username)
-        secret = next((s for s in secrets if s.id == secret_id), None)
+        # O(1) по индексу локальной копии, без обращения к сети
+        secret = self._secrets.get(secret_id)
         
         if secret and secret.status == SecretStatus.APPROVED:
             print(f"🔓 Accessing secret: {secret.name}")
@@ -119,16 +249,32 @@ class Database:
             status=status,
             details=details
         )
-        self._audit_logs.append(log)
+        self._audit.add(log)
     
     def get_audit_logs(self, limit: int = 50) -> List[AuditLog]:
-        return self._audit_logs[-limit:]
+        return self._audit.recent(limit)
+    
+    def query_audit_logs(self, limit: int = 50, before_id: Optional[int] = None, **filters) -> List[AuditLog]:
+        """Страница журнала аудита с диска, от новых записей к старым"""
+        self._audit.flush()
+        return self._audit.query(limit=limit, before_id=before_id, **filters)
+    
+    def audit_page(self, sort: str = "time", descending: bool = True, after: Optional[tuple] = None,
+                   limit: int = 200, **filters) -> List[tuple]:
+        """Строки журнала аудита для таблицы, страница за страницей"""
+        self._audit.flush()
+        return self._audit.page(sort=sort, descending=descending, after=after, limit=limit, **filters)
+    
+    def close(self):
+        self._audit.close()
+        if self._cache is not None:
+            self._cache.close()
     
     def get_user_stats(self, username: str) -> Dict[str, int]:
-        secrets = self.get_user_secrets(username)
+        self.refresh_secrets()
         return {
-            "total": len(secrets),
-            "approved": len(secrets),
-            "pending": 0,
-            "rejected": 0
+            "total": self._secrets.count(),
+            "approved": self._secrets.count(SecretStatus.APPROVED),
+            "pending": self._secrets.count(SecretStatus.PENDING),
+            "rejected": self._secrets.count(SecretStatus.REJECTED)
         }
\ No newline at end of file
@@ -1,6 +1,7 @@
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from enum import Enum
 
 class SecretType(Enum):
@@ -16,13 +17,16 @@ class SecretStatus(Enum):
     PENDING = "pending"
     REJECTED = "rejected"
 
-@dataclass
+# Модели неизменяемые и со __slots__: у экземпляров нет __dict__, а повторяющиеся
+# строки (теги, пользователи, действия) интернируются и хранятся в одном экземпляре
+
+@dataclass(frozen=True, slots=True)
 class User:
     username: str
     display_name: str
     role: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Secret:
     id: str
     name: str
@@ -33,17 +37,23 @@ class Secret:
     owner: str
     created_at: datetime
     approved_by: Optional[str] = None
-    tags: List[str] = None
+    tags: Tuple[str, ...] = ()
     
     def __post_init__(self):
-        if self.tags is None:
-            self.tags = []
+        object.__setattr__(self, "owner", sys.intern(self.owner))
+        object.__setattr__(self, "tags", tuple(sys.intern(tag) for tag in self.tags or ()))
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AuditLog:
     timestamp: datetime
     user: str
     action: str
     resource: str
     status: str
-    details: Optional[Dict] = None
\ No newline at end of file
+    details: Optional[Dict] = None
+    id: Optional[int] = None
+    
+    def __post_init__(self):
+        object.__setattr__(self, "user", sys.intern(self.user))
+        object.__setattr__(self, "action", sys.intern(self.action))
+        object.__setattr__(self, "status", sys.intern(self.status))
@@ -0,0 +1,117 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from .audit_store import VAULT_HOME
+from .database_models import Secret, SecretStatus, SecretType
+
+OFFLINE_CACHE_KDF_ITERATIONS = int(os.getenv("OFFLINE_CACHE_KDF_ITERATIONS", "600000"))
+
+class OfflineCache:
+    """Зашифрованный снимок секретов пользователя на диске.
+
+    Один файл SQLite на пару (сервер, пользователь). Снимок - сжатый JSON,
+    зашифрованный Fernet ключом из PBKDF2 от пароля; соль и число итераций
+    лежат рядом в открытом виде. Неверный пароль дает InvalidToken, поэтому
+    успешная расшифровка заодно подтверждает пароль для офлайн-входа.
+    """
+
+    def __init__(self, path: str, password: str):
+        self.path = path
+        # Доступ идет из воркера TaskRunner, закрытие - из главного потока при выходе
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB)")
+        if os.name == "posix":
+            os.chmod(path, 0o600)
+
+        salt = self._get("salt")
+        iterations = self._get("iterations")
+        if salt is None:
+            salt = os.urandom(16)
+            iterations = OFFLINE_CACHE_KDF_ITERATIONS
+            self._put(salt=salt, iterations=str(iterations).encode())
+        else:
+            iterations = int(iterations)
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=iterations)
+        self._fernet = Fernet(base64.urlsafe_b64encode(kdf.derive(password.encode())))
+
+    @classmethod
+    def for_user(cls, base_url: str, username: str, password: str) -> "OfflineCache":
+        directory = os.path.join(VAULT_HOME, "offline")
+        os.makedirs(directory, exist_ok=True)
+        # Имя файла не раскрывает ни пользователя, ни сервер
+        name = hashlib.sha256(f"{base_url}\0{username}".encode()).hexdigest()[:32]
+        return cls(os.path.join(directory, f"{name}.db"), password)
+
+    def load(self) -> Optional[Tuple[List[Secret], Optional[str]]]:
+        """Секреты и курсор синхронизации из снимка; None, если снимка нет или пароль не подходит"""
+        token = self._get("snapshot")
+        if token is None:
+            return None
+        try:
+            payload = json.loads(zlib.decompress(self._fernet.decrypt(token)))
+        except InvalidToken:
+            print("🔒 Offline cache: password does not match the snapshot")
+            return None
+
+        secrets = [
+            Secret(
+                id=row[0],
+                name=row[1],
+                description=row[2],
+                type=SecretType(row[3]),
+                status=SecretStatus(row[4]),
+                value=row[5],
+                owner=row[6],
+                created_at=datetime.fromtimestamp(row[7]),
+                approved_by=row[8],
+                tags=row[9]
+            )
+            for row in payload["secrets"]
+        ]
+        return secrets, payload.get("sync_cursor")
+
+    def save(self, secrets: List[Secret], sync_cursor: Optional[str]):
+        payload = {
+            "sync_cursor": sync_cursor,
+            "secrets": [
+                [s.id, s.name, s.description, s.type.value, s.status.value, s.value, s.owner,
+                 s.created_at.timestamp(), s.approved_by, s.tags]
+                for s in secrets
+            ]
+        }
+        token = self._fernet.encrypt(zlib.compress(json.dumps(payload, separators=(",", ":")).encode()))
+        self._put(snapshot=token, saved_at=str(time.time()).encode())
+
+    def close(self):
+        self._conn.close()
+
+    def destroy(self):
+        """Закрывает кэш и удаляет файл со снимком"""
+        self._conn.close()
+        for path in (self.path, f"{self.path}-journal"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _get(self, key: str) -> Optional[bytes]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _put(self, **values: bytes):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                list(values.items())
+            )
@@ -0,0 +1,193 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .database_models import Secret
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Вес совпадения по полю и по типу совпадения терма с токеном
+FIELD_WEIGHTS = (("name", 3.0), ("tags", 2.0), ("description", 1.0))
+EXACT, PREFIX, SUBSTRING = 1.0, 0.6, 0.3
+NAME_PREFIX_BONUS = 2.0
+# Оценка числа токенов в секрете для выбора стратегии пересечения
+AVG_DOC_TOKENS = 12
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def trigrams(token: str) -> Set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class SearchIndex:
+    """Инвертированный индекс по имени, описанию и тегам секретов.
+
+    Терм запроса совпадает с токеном точно, по префиксу (бинарный поиск по
+    отсортированному словарю) или как подстрока (через триграммы токенов).
+    Несколько термов объединяются по И, результат ранжируется по весам.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._names: Dict[str, str] = {}
+        # Отсортированный словарь для префиксного поиска. Новые токены копятся в
+        # _pending и вливаются при поиске; удаленные остаются до перестройки
+        self._vocabulary: List[str] = []
+        self._pending: List[str] = []
+        self._stale = 0
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def add(self, secret: Secret):
+        self.remove(secret.id)
+        weights: Dict[str, float] = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS:
+            value = getattr(secret, field)
+            text = " ".join(value) if field == "tags" else value
+            for token in set(tokenize(text or "")):
+                weights[token] += weight
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._add_token(token)
+            postings[secret.id] = weight
+        self._doc_tokens[secret.id] = set(weights)
+        self._names[secret.id] = secret.name.lower()
+
+    def remove(self, secret_id: str):
+        tokens = self._doc_tokens.pop(secret_id, None)
+        if tokens is None:
+            return
+        del self._names[secret_id]
+        for token in tokens:
+            postings = self._postings[token]
+            del postings[secret_id]
+            if not postings:
+                del self._postings[token]
+                self._remove_token(token)
+
+    def clear(self):
+        self.__init__()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Возвращает id секретов, отсортированные по убыванию релевантности"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        # Сначала самый избирательный терм: он задает кандидатов, остальные
+        # термы проверяются только по токенам этих кандидатов
+        expanded = sorted(
+            (list(self._expand(term)) for term in terms),
+            key=lambda tokens: sum(len(self._postings[token]) for token, _ in tokens),
+        )
+        scores = self._score_tokens(expanded[0])
+        for tokens in expanded[1:]:
+            if len(scores) * AVG_DOC_TOKENS > sum(len(self._postings[token]) for token, _ in tokens):
+                # Кандидатов много - дешевле пересечь со списками следующего терма
+                term_scores = self._score_tokens(tokens)
+                scores = {
+                    secret_id: score + term_scores[secret_id]
+                    for secret_id, score in scores.items()
+                    if secret_id in term_scores
+                }
+                if not scores:
+                    return []
+                continue
+            factors = dict(tokens)
+            narrowed = {}
+            for secret_id, score in scores.items():
+                best = 0.0
+                postings = self._postings
+                for token in self._doc_tokens[secret_id]:
+                    factor = factors.get(token)
+                    if factor is not None:
+                        best = max(best, postings[token][secret_id] * factor)
+                if best:
+                    narrowed[secret_id] = score + best
+            scores = narrowed
+            if not scores:
+                return []
+
+        query_lower = query.strip().lower()
+        names = self._names
+        for secret_id in scores:
+            if names[secret_id].startswith(query_lower):
+                scores[secret_id] += NAME_PREFIX_BONUS
+
+        # Две устойчивые сортировки со встроенными ключами быстрее сортировки
+        # по кортежу (-score, name) через lambda
+        ranked = sorted(scores, key=names.__getitem__)
+        ranked.sort(key=scores.__getitem__, reverse=True)
+        if limit is not None:
+            del ranked[limit:]
+        return ranked
+
+    def _score_tokens(self, tokens: List[Tuple[str, float]]) -> Dict[str, float]:
+        if len(tokens) == 1:
+            token, factor = tokens[0]
+            postings = self._postings[token]
+            return dict(postings) if factor == EXACT else {k: w * factor for k, w in postings.items()}
+        scores: Dict[str, float] = {}
+        for token, factor in tokens:
+            for secret_id, weight in self._postings[token].items():
+                score = weight * factor
+                if score > scores.get(secret_id, 0.0):
+                    scores[secret_id] = score
+        return scores
+
+    def _expand(self, term: str) -> Iterable[Tuple[str, float]]:
+        self._merge_vocabulary()
+        seen = set()
+        vocabulary = self._vocabulary
+        index = bisect_left(vocabulary, term)
+        while index < len(vocabulary) and vocabulary[index].startswith(term):
+            token = vocabulary[index]
+            index += 1
+            if token in self._postings:
+                seen.add(token)
+                yield token, EXACT if token == term else PREFIX
+
+        if len(term) < 3:
+            return
+        term_grams = trigrams(term)
+        candidates = set.intersection(*(self._trigrams.get(gram, set()) for gram in term_grams))
+        for token in candidates:
+            if token not in seen and term in token:
+                yield token, SUBSTRING
+
+    def _merge_vocabulary(self):
+        if not self._pending:
+            return
+        if len(self._pending) > len(self._vocabulary) // 8 or self._stale > len(self._vocabulary) // 4:
+            # Массовая загрузка или много удалений - дешевле пересортировать целиком
+            self._vocabulary = sorted(self._postings)
+            self._stale = 0
+        else:
+            for token in self._pending:
+                index = bisect_left(self._vocabulary, token)
+                if index == len(self._vocabulary) or self._vocabulary[index] != token:
+                    self._vocabulary.insert(index, token)
+        self._pending = []
+
+    def _add_token(self, token: str):
+        self._pending.append(token)
+        for gram in trigrams(token):
+            self._trigrams[gram].add(token)
+
+    def _remove_token(self, token: str):
+        self._stale += 1
+        for gram in trigrams(token):
+            tokens = self._trigrams[gram]
+            tokens.discard(token)
+            if not tokens:
+                del self._trigrams[gram]
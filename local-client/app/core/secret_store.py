@@ -0,0 +1,82 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from .database_models import Secret, SecretStatus
+from .search_index import SearchIndex
+
+class SecretStore:
+    """Локальная копия секретов с индексами по id и имени и счетчиками статусов"""
+    
+    def __init__(self):
+        self._by_id: Dict[str, Secret] = {}
+        self._by_name: Dict[str, Secret] = {}
+        self._status_counts: Counter = Counter()
+        self._index = SearchIndex()
+        # Изменения, еще не внесенные в индекс: id -> секрет (None - удален).
+        # Индекс догоняет их при поиске, так что массовая загрузка не ждет индексации
+        self._unindexed: Dict[str, Optional[Secret]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._by_id)
+    
+    def upsert(self, secrets: Iterable[Secret]):
+        for secret in secrets:
+            self._discard(secret.id)
+            self._by_id[secret.id] = secret
+            self._by_name[secret.name] = secret
+            self._status_counts[secret.status] += 1
+            self._unindexed[secret.id] = secret
+    
+    def replace_all(self, secrets: Iterable[Secret]):
+        self.clear()
+        self.upsert(secrets)
+    
+    def remove(self, secret_id: str):
+        self._discard(secret_id)
+    
+    def clear(self):
+        self._by_id.clear()
+        self._by_name.clear()
+        self._status_counts.clear()
+        self._index.clear()
+        self._unindexed.clear()
+    
+    def get(self, secret_id: str) -> Optional[Secret]:
+        return self._by_id.get(secret_id)
+    
+    def get_by_name(self, name: str) -> Optional[Secret]:
+        return self._by_name.get(name)
+    
+    def values(self, status: Optional[SecretStatus] = None) -> List[Secret]:
+        if status is None:
+            return list(self._by_id.values())
+        return [s for s in self._by_id.values() if s.status == status]
+    
+    def search(self, query: str, status: Optional[SecretStatus] = None) -> List[Secret]:
+        """Поиск по индексу; результат отсортирован по релевантности"""
+        self._catch_up_index()
+        found = map(self._by_id.__getitem__, self._index.search(query))
+        if status is None:
+            return list(found)
+        return [s for s in found if s.status == status]
+    
+    def count(self, status: Optional[SecretStatus] = None) -> int:
+        if status is None:
+            return len(self._by_id)
+        return self._status_counts[status]
+    
+    def _discard(self, secret_id: str):
+        old = self._by_id.pop(secret_id, None)
+        if old is None:
+            return
+        if self._by_name.get(old.name) is old:
+            del self._by_name[old.name]
+        self._status_counts[old.status] -= 1
+        self._unindexed[secret_id] = None
+    
+    def _catch_up_index(self):
+        for secret_id, secret in self._unindexed.items():
+            if secret is None:
+                self._index.remove(secret_id)
+            else:
+                self._index.add(secret)
+        self._unindexed.clear()
@@ -64,5 +64,12 @@ class AuditService:
     def get_logs(self, limit: int = 50) -> List[AuditLog]:
         return self.db.get_audit_logs(limit)
     
+    def query_logs(self, limit: int = 50, before_id: Optional[int] = None, **filters) -> List[AuditLog]:
+        return self.db.query_audit_logs(limit=limit, before_id=before_id, **filters)
+    
+    def get_page(self, sort: str = "time", descending: bool = True, after: Optional[tuple] = None,
+                 limit: int = 200, **filters) -> list:
+        return self.db.audit_page(sort=sort, descending=descending, after=after, limit=limit, **filters)
+    
     def get_user_stats(self, username: str) -> dict:
         return self.db.get_user_stats(username)
\ No newline at end of file
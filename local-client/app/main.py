@@ -6,8 +6,12 @@ Secure Vault - Enterprise Secret Management Platform
 
 import os
 import sys
+import time
 import traceback
 
+# Отсчет для замера "запуск -> интерактивное окно"
+STARTED_AT = time.perf_counter()
+
 # Добавляем корневую директорию в путь для импортов
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
@@ -30,7 +34,7 @@ def main():
     
     try:
         from ui.app import SecureVaultApp
-        app = SecureVaultApp()
+        app = SecureVaultApp(started_at=STARTED_AT)
         print("✅ Приложение инициализировано успешно!")
         print("🖥️  Запуск в полноэкранном режиме...")
         app.run()
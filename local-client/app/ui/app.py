@@ -1,13 +1,24 @@
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import webbrowser
-from core.database import Database, SecretType
+from core.database import CredentialsRejected, Database, SecretType
 from core.services import AuthService, SecretService, AuditService
 from .themes import ThemeManager
-from .components.widgets import ModernButton, SecretCard
+from .components.widgets import AuditTable, LoadingIndicator, ModernButton, VirtualSecretList
+from .tasks import TaskRunner
+
+# Пауза после последнего нажатия клавиши перед поиском
+SEARCH_DEBOUNCE_MS = 200
+# Сколько последних записей аудита смотреть для вариантов фильтров
+AUDIT_FILTER_SAMPLE = 1000
 
 class SecureVaultApp:
-    def __init__(self):
+    def __init__(self, started_at=None):
+        # Точки отсчета для замеров "запуск -> окно" и "вход -> дашборд"
+        self._started_at = started_at if started_at is not None else time.perf_counter()
+        self._login_started_at = None
+        
         self.root = tk.Tk()
         self.theme = ThemeManager.get_theme()
         
@@ -17,8 +28,25 @@ class SecureVaultApp:
         self.secret_service = SecretService(self.database, self.auth_service)
         self.audit_service = AuditService(self.database)
         
+        # Все обращения к API идут через фоновый поток, окно не блокируется
+        self.tasks = TaskRunner(self.root)
+        # Страницы аудита читаются из SQLite (AuditStore потокобезопасен) в своем
+        # потоке: открытие журнала не ждет долгого входа или синхронизации
+        self.audit_tasks = TaskRunner(self.root, thread_name_prefix="vault-audit")
+        self.stats_holder = None
+        self.secrets_holder = None
+        self.secret_list = None
+        self._search_job = None
+        self._shown_query = ""
+        
         self._setup_window()
         self.show_login()
+        self.tasks.submit(self.database.check_connection, on_done=self._on_connection_checked)
+        self.root.after_idle(self._report_startup)
+    
+    def _report_startup(self):
+        elapsed = (time.perf_counter() - self._started_at) * 1000
+        print(f"⏱️ Startup to interactive: {elapsed:.0f} ms")
     
     def _setup_window(self):
         self.root.title("🔐 Secure Vault - Enterprise Secret Management")
@@ -201,6 +229,15 @@ class SecureVaultApp:
         )
         hint_label.pack(side='bottom', pady=20)
     
+    def _on_connection_checked(self, connected):
+        # Сообщаем только на экране входа и только если там нет другого статуса
+        if connected or not self.status_label.winfo_exists() or self.status_label.cget("text"):
+            return
+        self.status_label.config(
+            text="⚠️ Сервер недоступен - будет использован демо-режим",
+            fg=self.theme.colors.warning
+        )
+    
     def login(self):
         username = self.username_entry.get().strip()
         password = self.password_entry.get()
@@ -209,20 +246,40 @@ class SecureVaultApp:
             self.status_label.config(text="❌ Введите логин и пароль")
             return
         
-        self.status_label.config(text="⏳ Проверка учетных данных...")
-        self.root.update()
+        self.status_label.config(text="⏳ Проверка учетных данных...", fg=self.theme.colors.text_secondary)
+        self._login_started_at = time.perf_counter()
         
-        # Simulate network delay
-        self.root.after(1000, lambda: self._perform_login(username, password))
+        self.tasks.submit(
+            self.auth_service.login, username, password,
+            on_done=self._on_login_result,
+            on_error=lambda e: self.status_label.config(
+                text=f"❌ Ошибка входа: {e}", fg=self.theme.colors.error
+            ),
+            key="login"
+        )
+        # Список секретов требует токена, поэтому загрузка встает в очередь
+        # воркера сразу за входом: пока главный поток строит дашборд, она уже идет
+        self._submit_dashboard_load(force=False)
     
-    def _perform_login(self, username, password):
-        if self.auth_service.login(username, password):
-            self.status_label.config(text="✅ Успешный вход! Загрузка...", fg=self.theme.colors.success)
-            self.root.after(1500, self.show_dashboard)
+    def _on_login_result(self, success):
+        if not self.status_label.winfo_exists():
+            return
+        if success:
+            self.show_dashboard()
         else:
+            self.tasks.cancel("dashboard")
             self.status_label.config(text="❌ Неверный логин или пароль", fg=self.theme.colors.error)
     
-    def show_dashboard(self):
+    def show_dashboard(self, force=False):
+        # Загрузка стартует до построения виджетов и идет параллельно с ним
+        self.tasks.cancel("search")
+        self.tasks.cancel("sync")
+        self.secret_list = None
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+            self._search_job = None
+        if force or not self.tasks.is_pending("dashboard"):
+            self._submit_dashboard_load(force)
         self.clear_window()
         
         # Header
@@ -270,7 +327,7 @@ class SecureVaultApp:
         ModernButton(
             controls_frame,
             "🔄 Обновить",
-            lambda: self.show_dashboard(),
+            lambda: self.show_dashboard(force=True),
             width=120,
             height=45,
             bg_color="#333333",
@@ -291,21 +348,96 @@ class SecureVaultApp:
         content = tk.Frame(self.root, bg=self.theme.colors.background)
         content.pack(fill='both', expand=True, padx=40, pady=20)
         
-        # Stats
-        self.show_stats(content)
+        # Stats и список секретов заполняются, когда загрузка в фоне завершится
+        self.stats_holder = tk.Frame(content, bg=self.theme.colors.background)
+        self.stats_holder.pack(fill='x')
         
         # Search
         self.show_search(content)
         
         # Secrets
-        self.show_secrets(content)
+        self.secrets_holder = tk.Frame(content, bg=self.theme.colors.background)
+        self.secrets_holder.pack(fill='both', expand=True)
+        self.show_loading("Загрузка секретов...")
     
-    def show_stats(self, parent):
-        stats_frame = tk.Frame(parent, bg=self.theme.colors.surface, relief='raised', bd=1)
-        stats_frame.pack(fill='x', pady=(0, 30))
-        
+    def _submit_dashboard_load(self, force):
+        self.tasks.submit(
+            self._load_dashboard, force,
+            on_done=self._fill_dashboard,
+            on_error=self.show_load_error,
+            key="dashboard"
+        )
+    
+    def _load_dashboard(self, force):
+        """Выполняется в фоновом потоке: одна синхронизация на статистику и список"""
         user = self.auth_service.get_current_user()
+        if user is None:
+            return None
+        self.database.refresh_secrets(force=force)
         stats = self.audit_service.get_user_stats(user.username)
+        secrets = self.secret_service.get_user_secrets()
+        return stats, secrets
+    
+    def _fill_dashboard(self, data):
+        if data is None or self.stats_holder is None or not self.stats_holder.winfo_exists():
+            return
+        stats, secrets = data
+        self.show_stats(self.stats_holder, stats)
+        self._clear_secrets_holder()
+        self.show_secrets(self.secrets_holder, secrets)
+        
+        if self._login_started_at is not None:
+            self.root.update_idletasks()
+            elapsed = (time.perf_counter() - self._login_started_at) * 1000
+            print(f"⏱️ Login to interactive dashboard: {elapsed:.0f} ms")
+            self._login_started_at = None
+        
+        # Дашборд показан из офлайн-кэша - сверяемся с API в фоне
+        if self.database.offline:
+            self.tasks.submit(
+                self._load_dashboard, True,
+                on_done=self._apply_sync,
+                on_error=self.show_load_error,
+                key="sync"
+            )
+    
+    def _apply_sync(self, data):
+        if data is None or self.secret_list is None or not self.stats_holder.winfo_exists():
+            return
+        stats, secrets = data
+        for widget in self.stats_holder.winfo_children():
+            widget.destroy()
+        self.show_stats(self.stats_holder, stats)
+        # Пока пользователь что-то ищет, его результаты не подменяем
+        if not self._shown_query:
+            self.show_secrets_after_search(secrets)
+    
+    def _clear_secrets_holder(self):
+        for widget in self.secrets_holder.winfo_children():
+            widget.destroy()
+    
+    def show_loading(self, text):
+        self._clear_secrets_holder()
+        LoadingIndicator(self.secrets_holder, text).pack(pady=60)
+    
+    def show_load_error(self, error):
+        if isinstance(error, CredentialsRejected):
+            self._on_credentials_rejected()
+            return
+        if not self.secrets_holder.winfo_exists():
+            return
+        self._clear_secrets_holder()
+        tk.Label(
+            self.secrets_holder,
+            text=f"❌ Не удалось загрузить данные: {error}",
+            font=("Arial", 16),
+            fg=self.theme.colors.error,
+            bg=self.theme.colors.background
+        ).pack(pady=60)
+    
+    def show_stats(self, parent, stats):
+        stats_frame = tk.Frame(parent, bg=self.theme.colors.surface, relief='raised', bd=1)
+        stats_frame.pack(fill='x', pady=(0, 30))
         
         stats_data = [
             (f"📊 Всего секретов: {stats['total']}", self.theme.colors.text_primary),
@@ -373,23 +505,53 @@ class SecureVaultApp:
             hover_color="#2980b9"
         ).pack(side='left')
         
-        # Bind Enter key to search
+        # Enter и кнопка ищут сразу, ввод - с задержкой после последнего нажатия
         search_entry.bind('<Return>', lambda e: self.perform_search())
+        search_entry.bind('<KeyRelease>', self._schedule_search)
+    
+    def _schedule_search(self, event=None):
+        if event is not None and event.keysym == 'Return':
+            return
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(SEARCH_DEBOUNCE_MS, self.perform_search)
     
     def perform_search(self, event=None):
         """Выполняет поиск секретов"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+            self._search_job = None
+        if self.secret_list is None:
+            return  # дашборд еще загружается
+        
         query = self.search_var.get().strip()
+        if query == self._shown_query:
+            # Запрос вернулся к показанному - результат еще не пришедшего поиска не нужен
+            self.tasks.cancel("search")
+            return
         
         if not query:
             # Если поиск пустой, показываем все секреты
-            self.show_secrets_after_search(self.secret_service.get_user_secrets())
+            self.tasks.submit(
+                self.secret_service.get_user_secrets,
+                on_done=lambda secrets: self._on_search_result(query, secrets),
+                on_error=self.show_load_error,
+                key="search"
+            )
             return
         
-        # Ищем секреты
+        # Ищем секреты; новый запрос отменяет еще не завершенный предыдущий
         user = self.auth_service.get_current_user()
-        found_secrets = self.database.search_secrets(query, user.username)
-        
-        if not found_secrets:
+        self.tasks.submit(
+            self.database.search_secrets, query, user.username,
+            on_done=lambda found: self._on_search_result(query, found),
+            on_error=self.show_load_error,
+            key="search"
+        )
+    
+    def _on_search_result(self, query, found_secrets):
+        self._shown_query = query
+        if query and not found_secrets:
             # Если ничего не найдено, показываем сообщение
             self.show_search_no_results(query)
         else:
@@ -398,147 +560,93 @@ class SecureVaultApp:
     
     def show_search_no_results(self, query):
         """Показывает сообщение когда секрет не найден"""
-        # Очищаем текущие секреты
-        for widget in self.root.winfo_children():
-            if hasattr(widget, '_name') and widget._name == 'secrets_container':
-                widget.destroy()
-        
-        # Создаем контейнер для сообщения
-        container = tk.Frame(self.root, bg=self.theme.colors.background, name='secrets_container')
-        container.pack(fill='both', expand=True, padx=40, pady=20)
-        
-        message_frame = tk.Frame(
-            container,
-            bg=self.theme.colors.surface,
-            relief='raised',
-            bd=1
-        )
-        message_frame.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.6, relheight=0.4)
-        
-        tk.Label(
-            message_frame,
-            text=f"🔍 Секрет '{query}' не найден",
-            font=("Arial", 20, "bold"),
-            fg=self.theme.colors.text_secondary,
-            bg=self.theme.colors.surface
-        ).pack(expand=True, pady=(80, 20))
+        self.secrets_title.config(text="📁 РЕЗУЛЬТАТЫ ПОИСКА")
+        self.secret_list.set_secrets([])
+        self.empty_frame.place_forget()
         
-        tk.Label(
-            message_frame,
-            text="Запросите доступ к этому секрету через веб-портал",
-            font=("Arial", 16),
-            fg=self.theme.colors.text_secondary,
-            bg=self.theme.colors.surface
-        ).pack(pady=(0, 40))
-        
-        ModernButton(
-            message_frame,
-            f"🌐 Запросить доступ к '{query}'",
-            self.show_request_dialog,
-            width=350,
-            height=60
-        ).pack(pady=20)
+        self.no_results_label.config(text=f"🔍 Секрет '{query}' не найден")
+        self.no_results_button.set_text(f"🌐 Запросить доступ к '{query}'")
+        self.no_results_frame.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.6, relheight=0.4)
     
     def show_secrets_after_search(self, secrets):
-        """Показывает секреты после поиска"""
-        # Очищаем текущие секреты
-        for widget in self.root.winfo_children():
-            if hasattr(widget, '_name') and widget._name == 'secrets_container':
-                widget.destroy()
-        
-        # Создаем новый контейнер
-        container = tk.Frame(self.root, bg=self.theme.colors.background, name='secrets_container')
-        container.pack(fill='both', expand=True, padx=40, pady=20)
-        
-        # Заголовок
-        title_frame = tk.Frame(container, bg=self.theme.colors.background)
-        title_frame.pack(fill='x', pady=(0, 20))
-        
-        tk.Label(
-            title_frame,
-            text="📁 РЕЗУЛЬТАТЫ ПОИСКА" if self.search_var.get() else "📁 МОИ СЕКРЕТЫ",
-            font=("Arial", 24, "bold"),
-            fg=self.theme.colors.primary,
-            bg=self.theme.colors.background
-        ).pack(anchor='w')
+        """Показывает секреты после поиска, переиспользуя уже показанные карточки"""
+        self.secrets_title.config(
+            text="📁 РЕЗУЛЬТАТЫ ПОИСКА" if self._shown_query else "📁 МОИ СЕКРЕТЫ"
+        )
+        self.no_results_frame.place_forget()
+        self.secret_list.set_secrets(secrets)
         
-        # Показываем секреты
-        if not secrets:
-            self.show_empty_state(container)
+        if secrets:
+            self.empty_frame.place_forget()
         else:
-            # Код для отображения списка секретов
-            secrets_container = tk.Frame(container, bg=self.theme.colors.background)
-            secrets_container.pack(fill='both', expand=True)
-            
-            canvas = tk.Canvas(secrets_container, bg=self.theme.colors.background, highlightthickness=0)
-            scrollbar = ttk.Scrollbar(secrets_container, orient="vertical", command=canvas.yview)
-            scrollable_frame = tk.Frame(canvas, bg=self.theme.colors.background)
-            
-            scrollable_frame.bind(
-                "<Configure>",
-                lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-            )
-            
-            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-            canvas.configure(yscrollcommand=scrollbar.set)
-            
-            for secret in secrets:
-                from .components.widgets import SecretCard
-                SecretCard(
-                    scrollable_frame,
-                    secret,
-                    on_copy=self.copy_secret,
-                    on_view=self.view_secret
-                ).pack(fill='x', pady=10, padx=5)
-            
-            canvas.pack(side="left", fill="both", expand=True)
-            scrollbar.pack(side="right", fill="y")
+            self.empty_frame.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.6, relheight=0.4)
     
-    def show_secrets(self, parent):
+    def show_secrets(self, parent, secrets):
         # Title
         title_frame = tk.Frame(parent, bg=self.theme.colors.background)
         title_frame.pack(fill='x', pady=(0, 20))
         
-        tk.Label(
+        self.secrets_title = tk.Label(
             title_frame,
             text="📁 МОИ СЕКРЕТЫ",
             font=("Arial", 24, "bold"),
             fg=self.theme.colors.primary,
             bg=self.theme.colors.background
-        ).pack(anchor='w')
+        )
+        self.secrets_title.pack(anchor='w')
         
-        # Secrets container with scroll
+        # Secrets container with virtualized scroll
         container = tk.Frame(parent, bg=self.theme.colors.background, name='secrets_container')
         container.pack(fill='both', expand=True)
         
-        canvas = tk.Canvas(container, bg=self.theme.colors.background, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg=self.theme.colors.background)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        # Один список на дашборд: поиск только меняет его содержимое
+        self.secret_list = VirtualSecretList(
+            container,
+            secrets,
+            on_copy=self.copy_secret,
+            on_view=self.view_secret
         )
+        self.secret_list.pack(fill='both', expand=True)
+        self._shown_query = ""
         
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        self.empty_frame = self.show_empty_state(container)
+        if secrets:
+            self.empty_frame.place_forget()
+        self._create_no_results(container)
+    
+    def _create_no_results(self, parent):
+        """Сообщение "не найдено" создается один раз и только показывается/скрывается"""
+        self.no_results_frame = tk.Frame(
+            parent,
+            bg=self.theme.colors.surface,
+            relief='raised',
+            bd=1
+        )
         
-        # Load secrets
-        secrets = self.secret_service.get_user_secrets()
+        self.no_results_label = tk.Label(
+            self.no_results_frame,
+            font=("Arial", 20, "bold"),
+            fg=self.theme.colors.text_secondary,
+            bg=self.theme.colors.surface
+        )
+        self.no_results_label.pack(expand=True, pady=(80, 20))
         
-        if not secrets:
-            self.show_empty_state(scrollable_frame)
-        else:
-            for secret in secrets:
-                SecretCard(
-                    scrollable_frame,
-                    secret,
-                    on_copy=self.copy_secret,
-                    on_view=self.view_secret
-                ).pack(fill='x', pady=10, padx=5)
+        tk.Label(
+            self.no_results_frame,
+            text="Запросите доступ к этому секрету через веб-портал",
+            font=("Arial", 16),
+            fg=self.theme.colors.text_secondary,
+            bg=self.theme.colors.surface
+        ).pack(pady=(0, 40))
         
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.no_results_button = ModernButton(
+            self.no_results_frame,
+            "🌐 Запросить доступ",
+            self.show_request_dialog,
+            width=350,
+            height=60
+        )
+        self.no_results_button.pack(pady=20)
     
     def show_empty_state(self, parent):
         empty_frame = tk.Frame(
@@ -572,9 +680,15 @@ class SecureVaultApp:
             width=350,
             height=60
         ).pack(pady=20)
+        return empty_frame
     
     def copy_secret(self, secret):
-        value = self.secret_service.get_secret_value(secret.id)
+        self.tasks.submit(
+            self.secret_service.get_secret_value, secret.id,
+            on_done=lambda value: self._show_copied(secret, value)
+        )
+    
+    def _show_copied(self, secret, value):
         if value:
             messagebox.showinfo(
                 "✅ Секрет скопирован!", 
@@ -589,7 +703,12 @@ class SecureVaultApp:
             )
     
     def view_secret(self, secret):
-        value = self.secret_service.get_secret_value(secret.id)
+        self.tasks.submit(
+            self.secret_service.get_secret_value, secret.id,
+            on_done=lambda value: self._show_secret_value(secret, value)
+        )
+    
+    def _show_secret_value(self, secret, value):
         if value:
             dialog = tk.Toplevel(self.root)
             dialog.title(f"🔐 {secret.name}")
@@ -747,34 +866,66 @@ class SecureVaultApp:
             bg=self.theme.colors.background
         ).pack(anchor='w', pady=(0, 30))
         
-        # Logs table
-        columns = ("Время", "Пользователь", "Действие", "Объект", "Статус")
-        tree = ttk.Treeview(main_frame, columns=columns, show="headings", height=20)
+        # Filters
+        filter_frame = tk.Frame(main_frame, bg=self.theme.colors.background)
+        filter_frame.pack(fill='x', pady=(0, 20))
+        
+        # Варианты фильтров берутся из последних записей в памяти, без обхода журнала
+        recent = self.audit_service.get_logs(AUDIT_FILTER_SAMPLE)
+        user = self.auth_service.get_current_user()
+        filter_values = {
+            "user": sorted({log.user for log in recent} | ({user.username} if user else set())),
+            "action": sorted({log.action for log in recent}),
+            "status": sorted({log.status for log in recent})
+        }
+        filter_vars = {}
+        for key, title in (("user", "Пользователь:"), ("action", "Действие:"), ("status", "Статус:")):
+            tk.Label(
+                filter_frame,
+                text=title,
+                font=("Arial", 14, "bold"),
+                fg=self.theme.colors.text_primary,
+                bg=self.theme.colors.background
+            ).pack(side='left', padx=(0, 10))
+            
+            filter_vars[key] = tk.StringVar()
+            combo = ttk.Combobox(
+                filter_frame,
+                textvariable=filter_vars[key],
+                values=[""] + filter_values[key],
+                font=("Arial", 12),
+                width=18
+            )
+            combo.pack(side='left', padx=(0, 25))
+            combo.bind("<<ComboboxSelected>>", lambda e: apply_filters())
+            combo.bind("<Return>", lambda e: apply_filters())
         
         # Увеличиваем размер шрифта и колонок для полноэкранного режима
         style = ttk.Style()
         style.configure("Treeview", font=("Arial", 12), rowheight=30)
         style.configure("Treeview.Heading", font=("Arial", 14, "bold"))
         
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=200)
-        
-        tree.column("Время", width=250)
-        tree.column("Действие", width=180)
-        tree.column("Статус", width=150)
+        # Logs table: страницы подгружаются с диска по мере прокрутки
+        table = AuditTable(main_frame, self.audit_service.get_page, self.audit_tasks)
+        table.pack(fill='both', expand=True)
         
-        # Add data
-        logs = self.audit_service.get_logs()
-        for log in logs:
-            time = log.timestamp.strftime("%d.%m.%Y %H:%M:%S")
-            tree.insert("", "end", values=(time, log.user, log.action, log.resource, log.status))
+        def apply_filters():
+            table.set_filters(**{key: var.get().strip() for key, var in filter_vars.items()})
         
-        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
+        def reset_filters():
+            for var in filter_vars.values():
+                var.set("")
+            apply_filters()
         
-        tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        ModernButton(
+            filter_frame,
+            "Сбросить",
+            reset_filters,
+            width=120,
+            height=40,
+            bg_color="#333333",
+            hover_color="#555555"
+        ).pack(side='left')
         
         # Close button
         btn_frame = tk.Frame(main_frame, bg=self.theme.colors.background)
@@ -790,7 +941,18 @@ class SecureVaultApp:
             hover_color="#555555"
         ).pack(side='right')
     
+    def _on_credentials_rejected(self):
+        # Вход был из офлайн-кэша, а сервер отказал: кэш удален, сессию закрываем
+        self.logout()
+        self.status_label.config(
+            text="❌ Учетные данные отклонены сервером, войдите заново",
+            fg=self.theme.colors.error
+        )
+    
     def logout(self):
+        self.tasks.cancel("dashboard")
+        self.tasks.cancel("sync")
+        self.tasks.cancel("search")
         self.auth_service.logout()
         self.show_login()
     
@@ -799,4 +961,8 @@ class SecureVaultApp:
             self.root.mainloop()
         except Exception as e:
             messagebox.showerror("Ошибка", f"Произошла ошибка: {e}")
-            self.root.quit()
\ No newline at end of file
+            self.root.quit()
+        finally:
+            self.tasks.shutdown()
+            self.audit_tasks.shutdown()
+            self.database.close()
\ No newline at end of file
@@ -1,4 +1,6 @@
 import tkinter as tk
+from functools import partial
+from tkinter import ttk
 from ..themes import ThemeManager
 
 class ModernButton(tk.Canvas):
@@ -66,6 +68,10 @@ class ModernButton(tk.Canvas):
             font=("Arial", 12, "bold")
         )
     
+    def set_text(self, text):
+        self._text = text
+        self._draw_normal()
+    
     def _on_enter(self, event):
         self._draw_hover()
     
@@ -79,7 +85,40 @@ class ModernButton(tk.Canvas):
         self._draw_hover()
         self.command()
 
+class LoadingIndicator(tk.Label):
+    """Анимированная надпись, пока фоновая задача не вернула результат"""
+    
+    FRAMES = ("◐", "◓", "◑", "◒")
+    
+    def __init__(self, parent, text="Загрузка..."):
+        self.theme = ThemeManager.get_theme()
+        self._text = text
+        self._frame = 0
+        self._job = None
+        
+        super().__init__(
+            parent,
+            font=("Arial", 16),
+            fg=self.theme.colors.text_secondary,
+            bg=self.theme.colors.background
+        )
+        self._tick()
+    
+    def _tick(self):
+        self.configure(text=f"{self.FRAMES[self._frame % len(self.FRAMES)]} {self._text}")
+        self._frame += 1
+        self._job = self.after(150, self._tick)
+    
+    def destroy(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        super().destroy()
+
 class SecretCard(tk.Frame):
+    # Описание обрезается, чтобы карточка всегда помещалась в строку VirtualSecretList
+    DESCRIPTION_LIMIT = 150
+    
     def __init__(self, parent, secret, on_copy, on_view):
         self.theme = ThemeManager.get_theme()
         self.secret = secret
@@ -94,6 +133,7 @@ class SecretCard(tk.Frame):
         )
         
         self._setup_ui()
+        self.update_secret(secret)
     
     def _setup_ui(self):
         content = tk.Frame(self, bg=self.theme.colors.surface)
@@ -107,92 +147,107 @@ class SecretCard(tk.Frame):
         header_frame = tk.Frame(info_frame, bg=self.theme.colors.surface)
         header_frame.pack(fill='x')
         
-        tk.Label(
+        self.name_label = tk.Label(
             header_frame,
-            text=self.secret.name,
             font=("Arial", 16, "bold"),  # Увеличили шрифт
             fg=self.theme.colors.text_primary,
             bg=self.theme.colors.surface
-        ).pack(side='left')
+        )
+        self.name_label.pack(side='left')
         
         # Type badge
-        type_config = self._get_type_config()
-        tk.Label(
+        self.type_label = tk.Label(
             header_frame,
-            text=type_config["text"],
             font=("Arial", 12, "bold"),  # Увеличили шрифт
-            fg=type_config["color"],
             bg=self.theme.colors.surface
-        ).pack(side='left', padx=(15, 0))
+        )
+        self.type_label.pack(side='left', padx=(15, 0))
         
         # Description
-        tk.Label(
+        self.description_label = tk.Label(
             info_frame,
-            text=self.secret.description,
             font=("Arial", 14),  # Увеличили шрифт
             fg=self.theme.colors.text_secondary,
             bg=self.theme.colors.surface,
             wraplength=600,  # Увеличили ширину обертки
             justify='left'
-        ).pack(anchor='w', pady=(12, 0))
+        )
+        self.description_label.pack(anchor='w', pady=(12, 0))
         
         # Metadata
         meta_frame = tk.Frame(info_frame, bg=self.theme.colors.surface)
         meta_frame.pack(anchor='w', pady=(15, 0))
         
-        tk.Label(
+        self.owner_label = tk.Label(
             meta_frame,
-            text=f"👤 {self.secret.owner}",
             font=("Arial", 12),  # Увеличили шрифт
             fg=self.theme.colors.text_secondary,
             bg=self.theme.colors.surface
-        ).pack(side='left', padx=(0, 20))
+        )
+        self.owner_label.pack(side='left', padx=(0, 20))
         
-        created_date = self.secret.created_at.strftime("%d.%m.%Y")
-        tk.Label(
+        self.date_label = tk.Label(
             meta_frame,
-            text=f"📅 {created_date}",
             font=("Arial", 12),  # Увеличили шрифт
             fg=self.theme.colors.text_secondary,
             bg=self.theme.colors.surface
-        ).pack(side='left')
+        )
+        self.date_label.pack(side='left')
         
         # Actions section
         action_frame = tk.Frame(content, bg=self.theme.colors.surface)
         action_frame.pack(side='right')
         
         # Status
-        status_config = self._get_status_config()
-        tk.Label(
+        self.status_label = tk.Label(
             action_frame,
-            text=status_config["text"],
             font=("Arial", 14, "bold"),  # Увеличили шрифт
-            fg=status_config["color"],
             bg=self.theme.colors.surface
-        ).pack(anchor='e')
+        )
+        self.status_label.pack(anchor='e')
         
         # Action buttons for approved secrets
-        if self.secret.status.value == 'approved':
-            btn_frame = tk.Frame(action_frame, bg=self.theme.colors.surface)
-            btn_frame.pack(anchor='e', pady=(12, 0))
-            
-            ModernButton(
-                btn_frame,
-                "📋 Копировать",
-                lambda: self.on_copy(self.secret),
-                width=140,
-                height=40
-            ).pack(side='left', padx=(8, 0))
-            
-            ModernButton(
-                btn_frame,
-                "👁️ Показать",
-                lambda: self.on_view(self.secret),
-                width=130,
-                height=40,
-                bg_color="#3498db",
-                hover_color="#2980b9"
-            ).pack(side='left', padx=(8, 0))
+        self.btn_frame = tk.Frame(action_frame, bg=self.theme.colors.surface)
+        
+        ModernButton(
+            self.btn_frame,
+            "📋 Копировать",
+            lambda: self.on_copy(self.secret),
+            width=140,
+            height=40
+        ).pack(side='left', padx=(8, 0))
+        
+        ModernButton(
+            self.btn_frame,
+            "👁️ Показать",
+            lambda: self.on_view(self.secret),
+            width=130,
+            height=40,
+            bg_color="#3498db",
+            hover_color="#2980b9"
+        ).pack(side='left', padx=(8, 0))
+    
+    def update_secret(self, secret):
+        """Перенастраивает карточку на другой секрет без пересоздания виджетов"""
+        self.secret = secret
+        
+        description = secret.description
+        if len(description) > self.DESCRIPTION_LIMIT:
+            description = description[:self.DESCRIPTION_LIMIT - 1] + "…"
+        
+        type_config = self._get_type_config()
+        status_config = self._get_status_config()
+        self.name_label.configure(text=secret.name)
+        self.type_label.configure(text=type_config["text"], fg=type_config["color"])
+        self.description_label.configure(text=description)
+        self.owner_label.configure(text=f"👤 {secret.owner}")
+        self.date_label.configure(text=f"📅 {secret.created_at.strftime('%d.%m.%Y')}")
+        self.status_label.configure(text=status_config["text"], fg=status_config["color"])
+        
+        if secret.status.value == 'approved':
+            self.btn_frame.pack(anchor='e', pady=(12, 0))
+        else:
+            self.btn_frame.pack_forget()
     
     def _get_type_config(self):
         configs = {
@@ -211,4 +266,239 @@ class SecretCard(tk.Frame):
             "pending": {"text": "⏳ ОЖИДАНИЕ", "color": self.theme.colors.warning},
             "rejected": {"text": "❌ ОТКЛОНЕНО", "color": self.theme.colors.error}
         }
-        return configs.get(self.secret.status.value, {"text": "❓ НЕИЗВЕСТНО", "color": self.theme.colors.text_secondary})
\ No newline at end of file
+        return configs.get(self.secret.status.value, {"text": "❓ НЕИЗВЕСТНО", "color": self.theme.colors.text_secondary})
+
+class VirtualSecretList(tk.Frame):
+    """Прокручиваемый список секретов, создающий карточки только для видимых строк.
+    
+    Все строки одной высоты, поэтому видимый диапазон вычисляется по позиции
+    прокрутки. Карточки, ушедшие за край окна, перенастраиваются на новые
+    секреты через SecretCard.update_secret, а не создаются заново.
+    """
+    
+    ROW_HEIGHT = 190
+    ROW_GAP = 20
+    
+    def __init__(self, parent, secrets, on_copy, on_view):
+        self.theme = ThemeManager.get_theme()
+        self.on_copy = on_copy
+        self.on_view = on_view
+        self.secrets = []
+        
+        super().__init__(parent, bg=self.theme.colors.background)
+        
+        self.canvas = tk.Canvas(self, bg=self.theme.colors.background, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        # Пул карточек: (card, id окна на canvas); _visible - индекс строки -> элемент пула
+        self._pool = []
+        self._visible = {}
+        # Видимые карточки предыдущего списка по id секрета, пока идет set_secrets
+        self._reusable = {}
+        self._width = 1
+        
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.bind("<Enter>", self._bind_wheel)
+        self.bind("<Leave>", self._unbind_wheel)
+        
+        self.set_secrets(secrets)
+    
+    def set_secrets(self, secrets):
+        """Заменяет список; карточки секретов, оставшихся на экране, не пересоздаются
+        и не перенастраиваются - меняются только строки, которые действительно изменились"""
+        self.secrets = list(secrets)
+        self._reusable = {entry[0].secret.id: entry for entry in self._visible.values()}
+        self._visible = {}
+        self.canvas.configure(scrollregion=(0, 0, self._width, len(self.secrets) * self.ROW_HEIGHT))
+        self.canvas.yview_moveto(0)
+        self._render()
+        # Карточки, которые не понадобились, уходят в пул
+        for card, window in self._reusable.values():
+            self.canvas.itemconfigure(window, state='hidden')
+            self._pool.append((card, window))
+        self._reusable = {}
+    
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._render()
+    
+    def _on_resize(self, event):
+        self._width = event.width
+        self.canvas.configure(scrollregion=(0, 0, self._width, len(self.secrets) * self.ROW_HEIGHT))
+        for _, window in self._pool + list(self._visible.values()):
+            self.canvas.itemconfigure(window, width=self._width - 10)
+        self._render()
+    
+    def _render(self):
+        top = max(int(self.canvas.canvasy(0)) // self.ROW_HEIGHT, 0)
+        bottom = int(self.canvas.canvasy(self.canvas.winfo_height())) // self.ROW_HEIGHT
+        wanted = range(top, min(bottom + 1, len(self.secrets)))
+        
+        for index in [i for i in self._visible if i not in wanted]:
+            self._pool.append(self._visible.pop(index))
+        
+        for index in wanted:
+            if index in self._visible:
+                continue
+            y = index * self.ROW_HEIGHT + self.ROW_GAP // 2
+            secret = self.secrets[index]
+            reused = self._reusable.pop(secret.id, None)
+            if reused is not None:
+                card, window = reused
+                if card.secret is not secret:
+                    card.update_secret(secret)
+                self.canvas.coords(window, 5, y)
+            elif self._pool:
+                card, window = self._pool.pop()
+                card.update_secret(secret)
+                self.canvas.coords(window, 5, y)
+                self.canvas.itemconfigure(window, state='normal')
+            else:
+                card = SecretCard(self.canvas, secret, self.on_copy, self.on_view)
+                window = self.canvas.create_window(
+                    5, y, window=card, anchor="nw",
+                    width=self._width - 10, height=self.ROW_HEIGHT - self.ROW_GAP
+                )
+            self._visible[index] = (card, window)
+        
+        for _, window in self._pool:
+            self.canvas.itemconfigure(window, state='hidden')
+    
+    def _bind_wheel(self, event):
+        self.bind_all("<MouseWheel>", self._on_wheel)
+        self.bind_all("<Button-4>", self._on_wheel)
+        self.bind_all("<Button-5>", self._on_wheel)
+    
+    def _unbind_wheel(self, event):
+        self.unbind_all("<MouseWheel>")
+        self.unbind_all("<Button-4>")
+        self.unbind_all("<Button-5>")
+    
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-1, "units")
+        else:
+            self.canvas.yview_scroll(1, "units")
+
+class AuditTable(tk.Frame):
+    """Таблица журнала аудита, подгружающая страницы по мере прокрутки.
+    
+    Фильтры и сортировка выполняются запросом fetch_page по индексам хранилища:
+    при их смене таблица очищается и получает только первую страницу.
+    fetch_page (сброс очереди аудита и запрос SQLite) идет через переданный
+    TaskRunner - отдельный от сетевого, чтобы страница не ждала синхронизацию;
+    главный поток Tk только вставляет готовые строки.
+    """
+    
+    COLUMNS = (
+        ("time", "Время", 250),
+        ("user", "Пользователь", 200),
+        ("action", "Действие", 180),
+        ("resource", "Объект", 200),
+        ("status", "Статус", 150)
+    )
+    PAGE_SIZE = 200
+    TASK_KEY = "audit-page"
+    
+    def __init__(self, parent, fetch_page, tasks):
+        self.theme = ThemeManager.get_theme()
+        self.fetch_page = fetch_page
+        self.tasks = tasks
+        
+        super().__init__(parent, bg=self.theme.colors.background)
+        
+        self.tree = ttk.Treeview(self, columns=[key for key, _, _ in self.COLUMNS], show="headings", height=20)
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title, command=lambda column=key: self.sort_by(column))
+            self.tree.column(key, width=width)
+        
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_scroll)
+        
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self._sort = "time"
+        self._descending = True
+        self._filters = {}
+        self._after = None
+        self._exhausted = False
+        self._load_job = None
+        self._loading = False
+        self.bind("<Destroy>", lambda e: self.tasks.cancel(self.TASK_KEY) if e.widget is self else None)
+        
+        self._update_headings()
+        self.reload()
+    
+    def set_filters(self, **filters):
+        self._filters = {key: value for key, value in filters.items() if value}
+        self.reload()
+    
+    def sort_by(self, column):
+        if column == self._sort:
+            self._descending = not self._descending
+        else:
+            self._sort = column
+            self._descending = column == "time"
+        self._update_headings()
+        self.reload()
+    
+    def reload(self):
+        if self._load_job is not None:
+            self.after_cancel(self._load_job)
+            self._load_job = None
+        # Страница для прежних фильтров и сортировки больше не нужна
+        self.tasks.cancel(self.TASK_KEY)
+        self._loading = False
+        self.tree.delete(*self.tree.get_children())
+        self._after = None
+        self._exhausted = False
+        self._load_page()
+        self.tree.yview_moveto(0)
+    
+    def _update_headings(self):
+        for key, title, _ in self.COLUMNS:
+            if key == self._sort:
+                title = f"{title} {'▼' if self._descending else '▲'}"
+            self.tree.heading(key, text=title)
+    
+    def _load_page(self):
+        self._load_job = None
+        if self._exhausted or self._loading:
+            return
+        self._loading = True
+        self.tasks.submit(
+            partial(
+                self.fetch_page,
+                sort=self._sort,
+                descending=self._descending,
+                after=self._after,
+                limit=self.PAGE_SIZE,
+                **self._filters
+            ),
+            on_done=self._on_page,
+            on_error=self._on_page_error,
+            key=self.TASK_KEY
+        )
+    
+    def _on_page(self, rows):
+        self._loading = False
+        for row in rows:
+            self.tree.insert("", "end", iid=row[0], values=row[2:])
+        if rows:
+            self._after = (rows[-1][1], rows[-1][0])
+        self._exhausted = len(rows) < self.PAGE_SIZE
+    
+    def _on_page_error(self, error):
+        # Следующая прокрутка попробует загрузить страницу снова
+        self._loading = False
+    
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Близко к концу загруженного - следующая страница, вне колбэка прокрутки
+        if float(last) > 0.9 and not self._exhausted and not self._loading and self._load_job is None:
+            self._load_job = self.after_idle(self._load_page)
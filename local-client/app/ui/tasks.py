@@ -0,0 +1,82 @@
+import queue
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+class TaskRunner:
+    """Выполняет блокирующие вызовы (сеть, Database) вне главного потока Tk.
+
+    Результаты возвращаются в главный поток через очередь, которую опрашивает
+    root.after, поэтому колбэки могут свободно трогать виджеты. По умолчанию
+    воркер один: Database и SecretStore не потокобезопасны, а так все
+    обращения к ним идут последовательно. Потокобезопасным локальным чтениям,
+    которые не должны ждать сеть, нужен отдельный TaskRunner.
+
+    Задачи с одинаковым key вытесняют друг друга: еще не начатая предыдущая
+    отменяется, а результат уже начатой отбрасывается.
+    """
+
+    POLL_INTERVAL_MS = 30
+
+    def __init__(self, root, max_workers: int = 1, thread_name_prefix: str = "vault-io"):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._done: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._latest: Dict[str, Future] = {}
+        self._pending = 0
+        self._poll_job = None
+
+    def submit(self, fn: Callable, *args, on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, key: Optional[str] = None) -> Future:
+        if key is not None:
+            self.cancel(key)
+        future = self._executor.submit(fn, *args)
+        if key is not None:
+            self._latest[key] = future
+        self._pending += 1
+        future.add_done_callback(lambda f: self._done.put((f, key, on_done, on_error)))
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.POLL_INTERVAL_MS, self._poll)
+        return future
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._latest
+
+    def cancel(self, key: str):
+        """Отменяет задачу с этим ключом; ее колбэки уже не будут вызваны"""
+        future = self._latest.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self):
+        self._latest.clear()
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try:
+                future, key, on_done, on_error = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if key is not None:
+                if self._latest.get(key) is not future:
+                    continue  # устаревший результат
+                del self._latest[key]
+            try:
+                result = future.result()
+            except CancelledError:
+                continue
+            except Exception as e:
+                print(f"❌ Background task failed: {e}")
+                if on_error is not None:
+                    on_error(e)
+                continue
+            if on_done is not None:
+                on_done(result)
+
+        if self._pending:
+            self._poll_job = self.root.after(self.POLL_INTERVAL_MS, self._poll)
@@ -0,0 +1,95 @@
+"""Журнал аудита на 1M записей: открытие хранилища и страницы для таблицы.
+
+Открытие диалога аудита - это открытие AuditStore (кольцевой буфер
+дочитывается с диска) и первая страница AuditTable; дальше страницы
+подгружаются при прокрутке, смене фильтра или сортировки.
+
+Запуск из каталога local-client:
+    python benchmarks/bench_audit.py [--rows 1000000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from core.audit_store import SCHEMA, AuditStore  # noqa: E402
+
+USERS = [f"user{i}" for i in range(50)]
+ACTIONS = ("login", "logout", "access_secret", "request_access")
+STATUSES = ("success", "accessed", "redirected_to_web")
+PAGE = 200
+
+
+def fill(path, rows):
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    started = time.time() - rows
+    batch = 50_000
+    for offset in range(0, rows, batch):
+        conn.executemany(
+            "INSERT INTO audit_log (ts, user, action, resource, status, details) VALUES (?, ?, ?, ?, ?, NULL)",
+            [
+                (started + i, rng.choice(USERS), rng.choice(ACTIONS), f"svc-{rng.randrange(5000)}",
+                 rng.choice(STATUSES))
+                for i in range(offset, min(offset + batch, rows))
+            ]
+        )
+        conn.commit()
+    conn.close()
+
+
+def timed(fn, runs=20):
+    timings = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def deep_page(store, pages, **params):
+    after = None
+    for _ in range(pages):
+        rows = store.page(after=after, limit=PAGE, **params)
+        after = (rows[-1][1], rows[-1][0])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-audit-"), "audit.db")
+    started = time.perf_counter()
+    fill(path, args.rows)
+    print(f"Заполнение {args.rows} записей: {time.perf_counter() - started:.1f} с")
+
+    started = time.perf_counter()
+    store = AuditStore(path)
+    print(f"Открытие AuditStore: {(time.perf_counter() - started) * 1000:.1f} мс")
+
+    scenarios = {
+        "первая страница": lambda: store.page(limit=PAGE),
+        "фильтр по user": lambda: store.page(limit=PAGE, user="user7"),
+        "фильтр по action": lambda: store.page(limit=PAGE, action="access_secret"),
+        "сортировка по объекту": lambda: store.page(sort="resource", descending=False, limit=PAGE),
+        "user + status": lambda: store.page(limit=PAGE, user="user7", status="accessed"),
+        "50-я страница": lambda: deep_page(store, 50),
+    }
+    for label, fn in scenarios.items():
+        p50, rows = timed(fn)
+        print(f"{label:<24} {len(rows):>4} строк  p50 {p50:8.2f} мс")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
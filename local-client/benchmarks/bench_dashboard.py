@@ -0,0 +1,106 @@
+"""Загрузка дашборда и просмотр секретов на кошельке из 5k секретов.
+
+Сравнивает прежнюю схему (каждый вызов Database заново скачивает весь
+список) с локальной индексированной копией. Сеть эмулирует FakeAPI с
+задержкой на запрос.
+
+Запуск из каталога local-client:
+    python benchmarks/bench_dashboard.py [--secrets 5000] [--latency-ms 30]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from core import database  # noqa: E402
+from core.database import Database  # noqa: E402
+from core.database_models import Secret, SecretStatus, SecretType  # noqa: E402
+
+
+class FakeAPI:
+    def __init__(self, count, latency):
+        self.latency = latency
+        self.requests = 0
+        self.payload = [
+            {"id": i, "name": f"svc-{i}", "description": f"secret {i}", "value": "p" * 32}
+            for i in range(count)
+        ]
+        self._synced = False
+
+    def _convert(self, items):
+        return [
+            Secret(
+                id=str(item["id"]), name=item["name"], description=item["description"],
+                type=SecretType.CUSTOM, status=SecretStatus.APPROVED, value=item["value"],
+                owner="current_user", created_at=datetime.now(), tags=["api"],
+            )
+            for item in items
+        ]
+
+    def get_secrets(self):
+        self.requests += 1
+        time.sleep(self.latency)
+        return self._convert(self.payload)
+
+    def sync_secrets(self):
+        self.requests += 1
+        time.sleep(self.latency)
+        changed = [] if self._synced else self.payload
+        self._synced = True
+        return self._convert(changed)
+
+
+def legacy_dashboard(api, views):
+    # Прежний Database: stats, список и каждый просмотр - отдельная полная загрузка
+    stats = len(api.get_secrets())
+    secrets = api.get_secrets()
+    for secret in secrets[:views]:
+        next(s for s in api.get_secrets() if s.id == secret.id)
+    return stats
+
+
+def current_dashboard(db, views):
+    stats = db.get_user_stats("demo")
+    secrets = db.get_user_secrets("demo")
+    for secret in secrets[:views]:
+        db.get_secret_value(secret.id, "demo")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--secrets", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--views", type=int, default=10)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database("http://127.0.0.1:9")
+
+    api = FakeAPI(args.secrets, latency)
+    started = time.perf_counter()
+    legacy_dashboard(api, args.views)
+    print(f"legacy  : {(time.perf_counter() - started) * 1000:8.1f} ms, {api.requests} full downloads")
+
+    api = FakeAPI(args.secrets, latency)
+    db.api = api
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        current_dashboard(db, args.views)
+        first = time.perf_counter() - started
+        database.SECRETS_TTL = 0
+        started = time.perf_counter()
+        current_dashboard(db, args.views)
+        refresh = time.perf_counter() - started
+    print(f"store   : {first * 1000:8.1f} ms first load, {refresh * 1000:8.1f} ms forced refresh, "
+          f"{api.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Память на один Secret и одну запись AuditLog: прежние dataclass-модели
+против неизменяемых моделей со __slots__ и интернированными строками.
+
+Прежние модели воспроизведены здесь как были: обычный @dataclass с __dict__,
+теги - новый список на каждый секрет, datetime.now() на каждый секрет.
+Строки создаются заново для каждого объекта, как при разборе JSON или
+чтении из SQLite.
+
+Запуск из каталога local-client:
+    python benchmarks/bench_memory.py [--count 100000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from core.database_models import AuditLog, Secret, SecretStatus, SecretType  # noqa: E402
+
+
+@dataclass
+class LegacySecret:
+    id: str
+    name: str
+    description: str
+    type: SecretType
+    status: SecretStatus
+    value: str
+    owner: str
+    created_at: datetime
+    approved_by: Optional[str] = None
+    tags: List[str] = None
+
+    def __post_init__(self):
+        if self.tags is None:
+            self.tags = []
+
+
+@dataclass
+class LegacyAuditLog:
+    timestamp: datetime
+    user: str
+    action: str
+    resource: str
+    status: str
+    details: Optional[Dict] = None
+
+
+def fresh(text):
+    # Новый объект строки с тем же содержимым, как после json.loads
+    return "".join(list(text))
+
+
+def legacy_secrets(count):
+    return [
+        LegacySecret(
+            id=str(i), name=f"svc-{i}", description=f"secret {i}", type=SecretType.CUSTOM,
+            status=SecretStatus.APPROVED, value="p" * 32, owner=fresh("current_user"),
+            created_at=datetime.now(), tags=[fresh("api")]
+        )
+        for i in range(count)
+    ]
+
+
+def slotted_secrets(count):
+    received_at = datetime.now()
+    return [
+        Secret(
+            id=str(i), name=f"svc-{i}", description=f"secret {i}", type=SecretType.CUSTOM,
+            status=SecretStatus.APPROVED, value="p" * 32, owner=fresh("current_user"),
+            created_at=received_at, tags=(fresh("api"),)
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_logs(count):
+    return [
+        LegacyAuditLog(
+            timestamp=datetime.now(), user=fresh("demo"), action=fresh("access_secret"),
+            resource=f"svc-{i}", status=fresh("accessed")
+        )
+        for i in range(count)
+    ]
+
+
+def slotted_logs(count):
+    return [
+        AuditLog(
+            timestamp=datetime.now(), user=fresh("demo"), action=fresh("access_secret"),
+            resource=f"svc-{i}", status=fresh("accessed")
+        )
+        for i in range(count)
+    ]
+
+
+def bytes_per_object(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    objects = factory(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'model':<10} {'before B/obj':>13} {'after B/obj':>12} {'saved':>7}")
+    for label, before, after in (
+        ("Secret", legacy_secrets, slotted_secrets),
+        ("AuditLog", legacy_logs, slotted_logs),
+    ):
+        legacy = bytes_per_object(before, args.count)
+        slotted = bytes_per_object(after, args.count)
+        print(f"{label:<10} {legacy:>13.0f} {slotted:>12.0f} {1 - slotted / legacy:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Холодный старт из офлайн-кэша: от входа до данных для первой отрисовки.
+
+Создает зашифрованный снимок на N секретов, затем в новом Database
+выполняет вход (PBKDF2 + расшифровка + разбор) и получает статистику и
+список одобренных секретов - ровно то, что нужно дашборду. Сеть не
+используется: API указывает на закрытый порт.
+
+Запуск из каталога local-client:
+    python benchmarks/bench_offline_cache.py [--secrets 10000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ["SECURE_VAULT_HOME"] = tempfile.mkdtemp(prefix="bench-vault-")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from core.database import Database  # noqa: E402
+from core.database_models import Secret, SecretStatus, SecretType  # noqa: E402
+from core.offline_cache import OfflineCache  # noqa: E402
+
+API_URL = "http://127.0.0.1:9"
+USERNAME, PASSWORD = "demo", "demo123"
+
+
+def make_secrets(count):
+    created_at = datetime.now()
+    return [
+        Secret(
+            id=str(i), name=f"svc-{i:05d}", description=f"Service credential number {i}",
+            type=SecretType.DATABASE, status=SecretStatus.APPROVED if i % 10 else SecretStatus.PENDING,
+            value="p" * 32, owner="current_user", created_at=created_at, tags=("api", "prod")
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--secrets", type=int, default=10_000)
+    args = parser.parse_args()
+
+    cache = OfflineCache.for_user(API_URL, USERNAME, PASSWORD)
+    started = time.perf_counter()
+    cache.save(make_secrets(args.secrets), "cursor")
+    print(f"Сохранение снимка {args.secrets} секретов: {(time.perf_counter() - started) * 1000:.0f} мс, "
+          f"файл {os.path.getsize(cache.path) / 1024:.0f} КБ")
+    cache.close()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        database = Database(API_URL)
+        started = time.perf_counter()
+        assert database.authenticate(USERNAME, PASSWORD)
+        unlocked = time.perf_counter()
+        stats = database.get_user_stats(USERNAME)
+        secrets = database.get_user_secrets(USERNAME)
+        finished = time.perf_counter()
+        database.close()
+
+    print(f"Вход из кэша (PBKDF2 + расшифровка): {(unlocked - started) * 1000:.0f} мс")
+    print(f"Статистика и список ({stats['total']} / {len(secrets)}): {(finished - unlocked) * 1000:.0f} мс")
+    print(f"Итого до данных первой отрисовки: {(finished - started) * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
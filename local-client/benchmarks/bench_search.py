@@ -0,0 +1,119 @@
+"""Поиск по секретам: линейный просмотр против инвертированного индекса.
+
+Генерирует кошелек из N секретов со случайными именами, описаниями и тегами,
+меряет p50/p99 для точных, префиксных, подстрочных и составных запросов,
+а также стоимость построения и инкрементного обновления индекса.
+
+Запуск из каталога local-client:
+    python benchmarks/bench_search.py [--secrets 50000] [--runs 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from core.database_models import Secret, SecretStatus, SecretType  # noqa: E402
+from core.secret_store import SecretStore  # noqa: E402
+
+ENVS = ("prod", "staging", "dev", "qa")
+COMPONENTS = ("db", "api", "cache", "queue", "worker", "gateway", "backup", "replica")
+TAGS = ("db", "api", "ssh", "cloud", "cert", "team-a", "team-b", "critical")
+SYLLABLES = ("pay", "bill", "auth", "data", "log", "mail", "geo", "shop", "user", "ord",
+             "rep", "ana", "mon", "sync", "file", "media", "chat", "push", "fin", "risk")
+
+QUERIES = {
+    "exact": "payrisk",
+    "prefix": "payr",
+    "substring": "yris",
+    "two terms": "prod payrisk",
+    "broad tag": "critical",
+    "rare": "svc-0049999",
+}
+
+
+def vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.sample(SYLLABLES, 2)) + rng.choice(("", "er", "ing", "s")))
+    return sorted(words)
+
+
+def make_secret(i, rng, created_at, services, words):
+    return Secret(
+        id=str(i),
+        name=f"{rng.choice(ENVS)}-{rng.choice(services)}-{rng.choice(COMPONENTS)}-svc-{i:07d}",
+        description=" ".join(rng.sample(words, 6)),
+        type=SecretType.CUSTOM,
+        status=SecretStatus.APPROVED,
+        value="",
+        owner="current_user",
+        created_at=created_at,
+        tags=rng.sample(TAGS, 2),
+    )
+
+
+def linear_search(secrets, query):
+    # Прежняя реализация Database.search_secrets
+    query_lower = query.lower()
+    return [
+        s for s in secrets
+        if query_lower in s.name.lower() or
+           query_lower in s.description.lower() or
+           any(query_lower in tag.lower() for tag in s.tags)
+    ]
+
+
+def percentiles(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--secrets", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    created_at = datetime.now()
+    words = vocabulary(rng, 1500)
+    services = words[::5]
+    secrets = [make_secret(i, rng, created_at, services, words) for i in range(args.secrets)]
+
+    store = SecretStore()
+    started = time.perf_counter()
+    store.upsert(secrets)
+    store.search("warmup")
+    print(f"Построение индекса для {args.secrets} секретов: {time.perf_counter() - started:.2f} с")
+
+    print(f"{'query':<11} {'hits':>6} {'linear p50':>11} {'index p50':>10} {'index p99':>10}")
+    for label, query in QUERIES.items():
+        hits = len(store.search(query))
+        linear_p50, _ = percentiles(lambda: linear_search(secrets, query), max(args.runs // 20, 5))
+        p50, p99 = percentiles(lambda: store.search(query), args.runs)
+        print(f"{label:<11} {hits:>6} {linear_p50:>9.2f}ms {p50:>8.3f}ms {p99:>8.3f}ms")
+
+    # Инкрементная синхронизация: пачка измененных секретов и следующий поиск
+    changed = [make_secret(rng.randrange(args.secrets), rng, created_at, services, words)
+               for _ in range(500)]
+    started = time.perf_counter()
+    store.upsert(changed)
+    updated = time.perf_counter()
+    store.search(QUERIES["exact"])
+    finished = time.perf_counter()
+    print(f"Обновление 500 секретов: {(updated - started) * 1000:.2f} мс, "
+          f"первый поиск после него: {(finished - updated) * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Данные клиента (аудит, офлайн-кэш) - во временном каталоге, KDF - быстрый
+os.environ["SECURE_VAULT_HOME"] = tempfile.mkdtemp(prefix="vault-tests-")
+os.environ["OFFLINE_CACHE_KDF_ITERATIONS"] = "1000"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Подменяет requests.Session: отвечает заданными функциями и запоминает запросы"""
+
+    def __init__(self):
+        self.headers = {}
+        self.calls = []
+        self.routes = {}
+
+    def route(self, method, path, handler):
+        self.routes[(method, path)] = handler
+
+    def _call(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        path = url.split("://", 1)[-1].split("/", 1)[-1]
+        return self.routes[(method, "/" + path)](**kwargs)
+
+    def get(self, url, **kwargs):
+        return self._call("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._call("POST", url, **kwargs)
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
@@ -0,0 +1,104 @@
+from conftest import FakeResponse
+from core.api_client import LIST_PAGE_SIZE, APIClient
+
+
+def secret(i):
+    return {"id": i, "name": f"svc-{i:04d}", "description": "d"}
+
+
+def paged_listing(total, etag="W/\"v1\""):
+    items = [secret(i) for i in range(total)]
+
+    def handler(params=None, headers=None, **_):
+        if headers and headers.get("If-None-Match") == etag:
+            return FakeResponse(304, headers={"ETag": etag})
+        start = int(params.get("cursor", -1)) + 1
+        page = items[start:start + params["limit"]]
+        more = start + params["limit"] < len(items)
+        return FakeResponse(200, {"items": page, "next_cursor": str(start + len(page) - 1) if more else None},
+                            {"ETag": etag} if "cursor" not in params else {})
+    return handler
+
+
+def make_client(session):
+    client = APIClient("http://api")
+    client.session = session
+    client.token = "token"
+    return client
+
+
+def test_get_secrets_follows_next_cursor(session):
+    total = LIST_PAGE_SIZE * 2 + 7
+    session.route("GET", "/secrets", paged_listing(total))
+    client = make_client(session)
+
+    secrets = client.get_secrets()
+
+    assert [s.name for s in secrets] == [f"svc-{i:04d}" for i in range(total)]
+    assert len(session.calls) == 3
+    assert all(call[2]["params"]["limit"] == LIST_PAGE_SIZE for call in session.calls)
+    assert client._secrets_etag == "W/\"v1\""
+
+
+def test_changed_collection_sends_etag_with_first_page_only(session):
+    session.route("GET", "/secrets", paged_listing(LIST_PAGE_SIZE + 1, etag="W/\"v2\""))
+    client = make_client(session)
+    client._secrets_etag = "W/\"v1\""
+
+    assert len(client.get_secrets()) == LIST_PAGE_SIZE + 1
+    assert [call[2]["headers"] for call in session.calls] == [{"If-None-Match": "W/\"v1\""}, {}]
+    assert client._secrets_etag == "W/\"v2\""
+
+
+def test_not_modified_first_page_reuses_the_full_cache(session):
+    total = LIST_PAGE_SIZE + 1
+    session.route("GET", "/secrets", paged_listing(total))
+    client = make_client(session)
+    client.get_secrets()
+    session.calls.clear()
+
+    secrets = client.get_secrets()
+
+    assert len(secrets) == total
+    assert len(session.calls) == 1
+    assert session.calls[0][2]["headers"] == {"If-None-Match": "W/\"v1\""}
+
+
+def test_failed_page_keeps_previous_cache_and_etag(session):
+    session.route("GET", "/secrets", paged_listing(3, etag="W/\"old\""))
+    client = make_client(session)
+    assert len(client.get_secrets()) == 3
+
+    listing = paged_listing(LIST_PAGE_SIZE + 5, etag="W/\"new\"")
+
+    def flaky(params=None, **kwargs):
+        if "cursor" in params:
+            return FakeResponse(503)
+        return listing(params=params, **kwargs)
+
+    session.route("GET", "/secrets", flaky)
+    assert client.get_secrets() is None
+    assert client._secrets_etag == "W/\"old\""
+    assert len(client._secrets_cache) == 3
+
+
+def test_accepts_legacy_plain_list(session):
+    session.route("GET", "/secrets", lambda **_: FakeResponse(200, [secret(1), secret(2)], {"ETag": "W/\"x\""}))
+    client = make_client(session)
+    assert [s.name for s in client.get_secrets()] == ["svc-0001", "svc-0002"]
+    assert client._secrets_etag == "W/\"x\""
+
+
+def test_login_distinguishes_rejection_from_network_failure(session):
+    client = APIClient("http://api")
+    client.session = session
+    session.route("POST", "/login", lambda **_: FakeResponse(401))
+    assert client.login("u", "p") is False
+    assert client.login_rejected is True
+
+    def unreachable(**_):
+        raise ConnectionError("down")
+
+    session.route("POST", "/login", unreachable)
+    assert client.login("u", "p") is False
+    assert client.login_rejected is False
@@ -0,0 +1,48 @@
+import sqlite3
+
+import pytest
+
+from core.audit_store import SORT_KEYS, AuditStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "audit.db")
+    store = AuditStore(path)
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO audit_log (ts, user, action, resource, status) VALUES (?, ?, ?, ?, ?)",
+            [(1000 + i % 37, f"user{i % 5}", f"action{i % 3}", f"res{i}", "ok" if i % 2 else "denied")
+             for i in range(300)],
+        )
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("sort", sorted(SORT_KEYS))
+@pytest.mark.parametrize("descending", [True, False])
+def test_keyset_pages_match_a_single_query(store, sort, descending):
+    expected = [row[0] for row in store.page(sort=sort, descending=descending, limit=1000)]
+    seen, after = [], None
+    while True:
+        rows = store.page(sort=sort, descending=descending, after=after, limit=23)
+        seen.extend(row[0] for row in rows)
+        if len(rows) < 23:
+            break
+        after = (rows[-1][1], rows[-1][0])
+    assert seen == expected
+    assert len(seen) == 300
+
+
+def test_user_sort_orders_by_time_inside_a_user(store):
+    rows = store.page(sort="user", descending=True, limit=1000)
+    keys = [row[1] for row in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert rows[0][3] == "user4"
+
+
+@pytest.mark.parametrize("sort", sorted(SORT_KEYS))
+def test_every_sort_is_index_backed(store, sort):
+    columns = ", ".join(f"{column} DESC" for column in (*SORT_KEYS[sort], "id"))
+    plan = store._connect().execute(f"EXPLAIN QUERY PLAN SELECT id FROM audit_log ORDER BY {columns}").fetchall()
+    assert not any("TEMP B-TREE" in row[-1] for row in plan)
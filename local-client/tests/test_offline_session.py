@@ -0,0 +1,62 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from core.database import CredentialsRejected, Database
+from core.database_models import Secret, SecretStatus, SecretType
+
+
+def api_secret(name):
+    return Secret(id=name, name=name, description="d", type=SecretType.CUSTOM, status=SecretStatus.APPROVED,
+                  value="v", owner="o", created_at=datetime.now())
+
+
+@pytest.fixture
+def database(monkeypatch):
+    db = Database(f"http://api-{os.urandom(4).hex()}")
+    status = {"login": 200}
+
+    def login(username, password):
+        db.api.login_rejected = status["login"] in (401, 403)
+        if status["login"] != 200:
+            return False
+        db.api.token = "token"
+        return True
+
+    monkeypatch.setattr(db.api, "login", login)
+    monkeypatch.setattr(db.api, "sync_secrets", lambda: [api_secret("db-main")])
+    db.login_status = status
+    yield db
+    db.close()
+
+
+def open_offline_session(database):
+    # Первый вход онлайн сохраняет снимок, второй открывает его без сети
+    assert database.authenticate("alice", "pw")
+    database.refresh_secrets(force=True)
+    assert database.authenticate("alice", "pw")
+    assert database.offline
+
+
+def test_network_failure_keeps_working_from_cache(database):
+    open_offline_session(database)
+    database.login_status["login"] = 503
+    database.refresh_secrets(force=True)
+    assert database.offline
+    assert [s.name for s in database.get_user_secrets("alice")] == ["db-main"]
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_rejected_credentials_wipe_the_cache(database, status):
+    open_offline_session(database)
+    cache_path = database._cache.path
+    database.login_status["login"] = status
+
+    with pytest.raises(CredentialsRejected):
+        database.refresh_secrets(force=True)
+
+    assert not os.path.exists(cache_path)
+    assert len(database._secrets) == 0
+    assert database.get_user("alice") is None
+    assert not database.offline
@@ -0,0 +1,124 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from core.database_models import Secret, SecretStatus, SecretType
+from core.search_index import SearchIndex, tokenize
+
+WORDS = ["db", "prod", "postgres", "post", "redis", "api", "key", "gres", "stage", "mail", "main", "ssh", "s3"]
+
+
+def make_secret(secret_id, name, description="", tags=()):
+    return Secret(id=secret_id, name=name, description=description, type=SecretType.CUSTOM,
+                  status=SecretStatus.APPROVED, value="v", owner="o", created_at=datetime(2024, 1, 1), tags=tags)
+
+
+def naive_search(secrets, query):
+    """Эталон перебором: каждый терм - префикс токена, а от 3 символов - и подстрока"""
+    terms = tokenize(query)
+    found = set()
+    for secret in secrets.values():
+        tokens = tokenize(" ".join([secret.name, secret.description, *secret.tags]))
+        if terms and all(any(token.startswith(term) or (len(term) >= 3 and term in token) for token in tokens)
+                         for term in terms):
+            found.add(secret.id)
+    return found
+
+
+def random_name(rng):
+    return rng.choice("-_ ").join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+
+
+def random_query(rng, secrets):
+    name = rng.choice(list(secrets.values())).name.lower() if secrets else "db"
+    start = rng.randrange(len(name))
+    return name[start:start + rng.randint(1, 6)]
+
+
+@pytest.fixture
+def rng():
+    return random.Random(1234)
+
+
+def test_matches_plain_substring_filter_on_single_word_names(rng):
+    letters = "abcde"
+    index = SearchIndex()
+    secrets = {}
+    for i in range(300):
+        name = "".join(rng.choice(letters) for _ in range(rng.randint(3, 10)))
+        secrets[str(i)] = make_secret(str(i), name)
+        index.add(secrets[str(i)])
+    for _ in range(300):
+        query = "".join(rng.choice(letters) for _ in range(rng.randint(3, 5)))
+        assert set(index.search(query)) == {s.id for s in secrets.values() if query in s.name}
+
+
+def test_short_terms_match_only_token_prefixes():
+    index = SearchIndex()
+    index.add(make_secret("1", "postgres"))
+    index.add(make_secret("2", "mongo-db"))
+    assert index.search("po") == ["1"]
+    assert index.search("gr") == []
+    assert index.search("gre") == ["1"]
+    assert index.search("d") == ["2"]
+
+
+def test_ranks_exact_over_prefix_over_substring():
+    index = SearchIndex()
+    index.add(make_secret("exact", "zz post"))
+    index.add(make_secret("prefix", "zz postgres"))
+    index.add(make_secret("substring", "zz repost"))
+    assert index.search("post") == ["exact", "prefix", "substring"]
+
+
+def test_rename_and_remove_update_all_lookups():
+    index = SearchIndex()
+    index.add(make_secret("1", "postgres-main"))
+    index.add(make_secret("2", "redis-cache"))
+    assert index.search("gres") == ["1"]
+
+    index.add(make_secret("1", "mysql-main"))
+    assert index.search("gres") == []
+    assert index.search("pos") == []
+    assert index.search("mys") == ["1"]
+    assert index.search("main") == ["1"]
+
+    index.remove("2")
+    assert index.search("redis") == []
+    assert index.search("cac") == []
+    assert len(index) == 1
+
+    # Токен, удаленный из словаря, снова находится после повторного добавления
+    index.add(make_secret("3", "redis"))
+    assert index.search("red") == ["3"]
+
+
+def test_random_updates_match_naive_filter(rng):
+    index = SearchIndex()
+    secrets = {}
+    for step in range(2000):
+        action = rng.random()
+        if action < 0.5 or not secrets:
+            secret_id = str(rng.randrange(200))
+            secret = make_secret(secret_id, random_name(rng), random_name(rng) if rng.random() < 0.3 else "",
+                                 tuple(rng.sample(WORDS, rng.randint(0, 2))))
+            secrets[secret_id] = secret
+            index.add(secret)
+        elif action < 0.65:
+            secret_id = rng.choice(list(secrets))
+            del secrets[secret_id]
+            index.remove(secret_id)
+        else:
+            query = random_query(rng, secrets)
+            if rng.random() < 0.3:
+                query += " " + random_query(rng, secrets)
+            assert set(index.search(query)) == naive_search(secrets, query), (step, query)
+    assert len(index) == len(secrets)
+
+
+def test_limit_keeps_best_results():
+    index = SearchIndex()
+    for i, name in enumerate(["key", "key-a", "api_key", "keyring"]):
+        index.add(make_secret(str(i), name))
+    assert index.search("key", limit=2) == index.search("key")[:2]